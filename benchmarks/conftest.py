@@ -0,0 +1,159 @@
+"""Fixtures and result reporting for the benchmark suite.
+
+Run with ``pytest benchmarks`` from the repository root. ``--bench-shape``
+picks the synthetic trash size, ``--bench-rounds`` the number of timed
+rounds, and ``--bench-json`` where the results are written.
+"""
+
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from jupyterlab_trash_mgmt_extension import __version__, directorysizes, trashinfo
+
+from .synthetic import SHAPES
+
+RESULTS = pytest.StashKey[list]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('trash benchmarks')
+    group.addoption('--bench-shape', choices=sorted(SHAPES), default='small',
+                    help='size of the synthetic trash (default: small)')
+    group.addoption('--bench-rounds', type=int, default=5,
+                    help='timed rounds per benchmark (default: 5)')
+    group.addoption('--bench-json', default='benchmark-results.json',
+                    help='file the JSON results are written to')
+
+
+def pytest_configure(config):
+    config.stash[RESULTS] = []
+
+
+class Benchmark:
+    """Times a callable over several rounds and records the statistics.
+
+    ``setup`` runs untimed before every round, so destructive operations
+    (restore, delete, empty) can be measured on a fresh trash each time.
+    """
+
+    def __init__(self, name: str, rounds: int, shape: str, results: list):
+        self.name = name
+        self.rounds = rounds
+        self.shape = shape
+        self._results = results
+
+    def _record(self, label: str, timings: list, extra: dict) -> dict:
+        record = {
+            'name': f'{self.name}[{label}]' if label else self.name,
+            'shape': self.shape,
+            'rounds': len(timings),
+            'min': min(timings),
+            'max': max(timings),
+            'mean': statistics.fmean(timings),
+            'median': statistics.median(timings),
+            'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            **extra
+        }
+        self._results.append(record)
+        return record
+
+    def measure(self, func, setup=None, label: str = '', rounds: int = None, **extra) -> dict:
+        timings = []
+        for _ in range(rounds or self.rounds):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return self._record(label, timings, extra)
+
+    async def measure_async(self, func, setup=None, label: str = '', rounds: int = None, **extra) -> dict:
+        timings = []
+        for _ in range(rounds or self.rounds):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            await func()
+            timings.append(time.perf_counter() - start)
+        return self._record(label, timings, extra)
+
+
+@pytest.fixture
+def trash_dir(tmp_path, monkeypatch):
+    """An empty home trash under ``tmp_path``."""
+    trash = tmp_path / "Trash"
+    (trash / "files").mkdir(parents=True)
+    (trash / "info").mkdir()
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path))
+    return trash
+
+
+@pytest.fixture
+def origin(tmp_path):
+    """Directory the synthetic items were trashed from."""
+    path = tmp_path / "origin"
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def shape(request):
+    return SHAPES[request.config.getoption('--bench-shape')]
+
+
+@pytest.fixture
+def benchmark(request):
+    return Benchmark(
+        request.node.name,
+        request.config.getoption('--bench-rounds'),
+        request.config.getoption('--bench-shape'),
+        request.config.stash[RESULTS]
+    )
+
+
+def reset_caches() -> None:
+    """Forget every in-process cache so the next measurement starts cold."""
+    trashinfo._cache = trashinfo.TrashInfoCache()
+    directorysizes._caches.clear()
+    directorysizes._subtree_cache = directorysizes.SubtreeSizeCache()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = config.stash.get(RESULTS, [])
+    if not results:
+        return
+    terminalreporter.section('trash benchmarks')
+    width = max(len(record['name']) for record in results)
+    terminalreporter.write_line(f"{'name':<{width}}  {'min (ms)':>10}  {'median (ms)':>12}  {'max (ms)':>10}")
+    for record in results:
+        terminalreporter.write_line(
+            f"{record['name']:<{width}}  {record['min'] * 1000:>10.2f}  "
+            f"{record['median'] * 1000:>12.2f}  {record['max'] * 1000:>10.2f}"
+        )
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    results = config.stash.get(RESULTS, [])
+    if not results:
+        return
+    shape_name = config.getoption('--bench-shape')
+    output = {
+        'machine': {
+            'python': sys.version.split()[0],
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+        },
+        'version': __version__,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'shape': {'name': shape_name, **SHAPES[shape_name].to_dict()},
+        'benchmarks': results
+    }
+    Path(config.getoption('--bench-json')).write_text(json.dumps(output, indent=2) + '\n')
@@ -0,0 +1,119 @@
+"""Synthetic trash directories for the benchmark suite.
+
+A :class:`TrashShape` describes how many items of each kind to generate;
+:func:`populate_trash` writes them, with their ``.trashinfo`` files, into a
+FreeDesktop trash directory. Original paths point below ``origin`` so that
+restores stay inside the temporary directory.
+"""
+
+import dataclasses
+import os
+from pathlib import Path
+from typing import Dict, List
+
+DELETION_DATE = '2024-01-15T10:30:00'
+
+
+@dataclasses.dataclass(frozen=True)
+class TrashShape:
+    """Number and size of the generated trash items."""
+
+    # Single files of ``file_size`` bytes
+    small_items: int = 200
+    # Directory trees ``tree_depth`` levels deep with ``tree_fanout``
+    # subdirectories per level and ``files_per_dir`` files in each directory
+    huge_trees: int = 1
+    tree_fanout: int = 4
+    tree_depth: int = 3
+    files_per_dir: int = 10
+    # One directory chain this many levels deep
+    deep_nesting: int = 64
+    # Symlinks to ``origin``, half of them dangling
+    symlinks: int = 20
+    file_size: int = 1024
+
+    def to_dict(self) -> dict:
+        return dataclasses.asdict(self)
+
+
+SHAPES = {
+    'small': TrashShape(),
+    'medium': TrashShape(small_items=2000, huge_trees=2, tree_fanout=6, tree_depth=3,
+                         files_per_dir=20, deep_nesting=256, symlinks=100),
+    'large': TrashShape(small_items=20000, huge_trees=4, tree_fanout=8, tree_depth=4,
+                        files_per_dir=20, deep_nesting=1024, symlinks=500),
+}
+
+
+def write_trashinfo(trash_dir: Path, name: str, original: Path) -> None:
+    (trash_dir / 'info' / f'{name}.trashinfo').write_text(
+        f'[Trash Info]\nPath={original}\nDeletionDate={DELETION_DATE}\n'
+    )
+
+
+def _write_tree(root: Path, shape: TrashShape, depth: int, payload: bytes) -> None:
+    root.mkdir()
+    for i in range(shape.files_per_dir):
+        (root / f'file{i}.dat').write_bytes(payload)
+    if depth < shape.tree_depth:
+        for i in range(shape.tree_fanout):
+            _write_tree(root / f'dir{i}', shape, depth + 1, payload)
+
+
+def populate_small_items(trash_dir: Path, shape: TrashShape, origin: Path) -> List[str]:
+    """Write ``shape.small_items`` trashed files and return their names."""
+    payload = b'x' * shape.file_size
+    names = []
+    for i in range(shape.small_items):
+        name = f'small-{i:06d}.txt'
+        (trash_dir / 'files' / name).write_bytes(payload)
+        write_trashinfo(trash_dir, name, origin / name)
+        names.append(name)
+    return names
+
+
+def populate_trash(trash_dir: Path, shape: TrashShape, origin: Path) -> Dict[str, List[str]]:
+    """Fill ``trash_dir`` according to ``shape``.
+
+    Returns the generated item names grouped by kind: ``small``, ``trees``,
+    ``deep`` and ``symlinks``.
+    """
+    files_dir = trash_dir / 'files'
+    payload = b'x' * shape.file_size
+    names = {'small': populate_small_items(trash_dir, shape, origin), 'trees': [],
+             'deep': [], 'symlinks': []}
+
+    for i in range(shape.huge_trees):
+        name = f'tree-{i}'
+        _write_tree(files_dir / name, shape, 1, payload)
+        write_trashinfo(trash_dir, name, origin / name)
+        names['trees'].append(name)
+
+    if shape.deep_nesting:
+        name = 'deep'
+        path = files_dir / name
+        path.mkdir()
+        # Build the chain relative to each level to stay below PATH_MAX
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            for _ in range(shape.deep_nesting):
+                os.mkdir('d', dir_fd=fd)
+                next_fd = os.open('d', os.O_RDONLY | os.O_DIRECTORY, dir_fd=fd)
+                os.close(fd)
+                fd = next_fd
+            leaf = os.open('leaf.dat', os.O_WRONLY | os.O_CREAT, 0o644, dir_fd=fd)
+            os.write(leaf, payload)
+            os.close(leaf)
+        finally:
+            os.close(fd)
+        write_trashinfo(trash_dir, name, origin / name)
+        names['deep'].append(name)
+
+    for i in range(shape.symlinks):
+        name = f'link-{i}'
+        target = origin / 'missing' if i % 2 else origin
+        os.symlink(target, files_dir / name)
+        write_trashinfo(trash_dir, name, origin / name)
+        names['symlinks'].append(name)
+
+    return names
@@ -0,0 +1,138 @@
+"""Benchmarks of listing, sizing, parsing, restore, delete and empty.
+
+Operations go through the real HTTP handlers where one exists, on a
+synthetic trash shaped by ``--bench-shape``.
+"""
+
+import json
+import shutil
+
+from jupyterlab_trash_mgmt_extension.scan import ScanStats
+from jupyterlab_trash_mgmt_extension.trash import get_dir_size, list_trash, parse_trashinfo
+
+from .conftest import reset_caches
+from .synthetic import populate_small_items, populate_trash
+
+API = "jupyterlab-trash-mgmt-extension"
+
+
+def clear_trash(trash_dir, origin):
+    for path in (trash_dir / "files", trash_dir / "info", origin):
+        shutil.rmtree(path)
+        path.mkdir()
+    (trash_dir / "directorysizes").unlink(missing_ok=True)
+
+
+def get_manager(jp_serverapp):
+    return jp_serverapp.web_app.settings["trash_mgmt_manager"]
+
+
+async def test_list_handler(jp_fetch, jp_serverapp, trash_dir, origin, shape, benchmark):
+    """GET /list on an indexed trash, with every entry re-described and with none."""
+    names = populate_trash(trash_dir, shape, origin)
+    item_count = sum(len(group) for group in names.values())
+    index = get_manager(jp_serverapp).get_index(trash_dir)
+
+    async def fetch():
+        response = await jp_fetch(API, "list", params={"limit": "100"})
+        assert json.loads(response.body)["item_count"] == item_count
+
+    def invalidate_all():
+        reset_caches()
+        for group in names.values():
+            for name in group:
+                index.invalidate(name)
+
+    await benchmark.measure_async(fetch, setup=invalidate_all, label="cold", items=item_count)
+    await benchmark.measure_async(fetch, label="warm", items=item_count)
+
+
+def test_list_trash(trash_dir, origin, shape, benchmark):
+    """Full list_trash scan without any cached sizes or parsed trashinfo."""
+    names = populate_trash(trash_dir, shape, origin)
+    item_count = sum(len(group) for group in names.values())
+
+    def cold():
+        reset_caches()
+        (trash_dir / "directorysizes").unlink(missing_ok=True)
+
+    # System calls of one scan, the same in every round
+    stats = ScanStats()
+    list_trash(trash_dir, stats)
+    benchmark.measure(lambda: list_trash(trash_dir), setup=cold, label="cold", items=item_count,
+                      syscalls=stats.to_dict())
+    benchmark.measure(lambda: list_trash(trash_dir), label="warm", items=item_count,
+                      syscalls=stats.to_dict())
+
+
+def test_get_dir_size(trash_dir, origin, shape, benchmark):
+    """Recursive sizing of a huge tree and of the deeply nested chain."""
+    names = populate_trash(trash_dir, shape, origin)
+    for name in names["trees"][:1] + names["deep"]:
+        benchmark.measure(lambda: get_dir_size(trash_dir / "files" / name), label=name)
+
+
+def test_parse_trashinfo(trash_dir, origin, shape, benchmark):
+    """Parsing every .trashinfo of the small items, uncached and memoized."""
+    names = populate_small_items(trash_dir, shape, origin)
+    info_files = [trash_dir / "info" / f"{name}.trashinfo" for name in names]
+
+    def parse_all():
+        for info_file in info_files:
+            parse_trashinfo(info_file)
+
+    benchmark.measure(parse_all, setup=reset_caches, label="cold", items=len(info_files))
+    benchmark.measure(parse_all, label="warm", items=len(info_files))
+
+
+async def test_restore_handler(jp_fetch, trash_dir, origin, shape, benchmark):
+    """POST /batch/restore of every small item, renamed back into place."""
+    names = []
+
+    def setup():
+        clear_trash(trash_dir, origin)
+        names[:] = populate_small_items(trash_dir, shape, origin)
+
+    async def restore():
+        response = await jp_fetch(API, "batch", "restore", method="POST",
+                                  body=json.dumps({"trash_paths": names}))
+        assert json.loads(response.body)["success_count"] == len(names)
+
+    await benchmark.measure_async(restore, setup=setup, items=shape.small_items)
+
+
+async def test_delete_handlers(jp_fetch, trash_dir, origin, shape, benchmark):
+    """POST /batch/delete of every small item and POST /delete of a huge tree."""
+    names = {}
+
+    def setup():
+        clear_trash(trash_dir, origin)
+        names.update(populate_trash(trash_dir, shape, origin))
+
+    async def delete_small():
+        response = await jp_fetch(API, "batch", "delete", method="POST",
+                                  body=json.dumps({"trash_paths": names["small"]}))
+        assert json.loads(response.body)["success_count"] == len(names["small"])
+
+    async def delete_tree():
+        await jp_fetch(API, "delete", method="POST",
+                       body=json.dumps({"trash_path": names["trees"][0]}))
+        assert not (trash_dir / "files" / names["trees"][0]).exists()
+
+    await benchmark.measure_async(delete_small, setup=setup, label="small", items=shape.small_items)
+    if shape.huge_trees:
+        await benchmark.measure_async(delete_tree, setup=setup, label="tree")
+
+
+async def test_empty_handler(jp_fetch, trash_dir, origin, shape, benchmark):
+    """POST /empty of the whole synthetic trash."""
+
+    def setup():
+        clear_trash(trash_dir, origin)
+        populate_trash(trash_dir, shape, origin)
+
+    async def empty():
+        await jp_fetch(API, "empty", method="POST", body=json.dumps({"volume": "home"}))
+        assert not any((trash_dir / "files").iterdir())
+
+    await benchmark.measure_async(empty, setup=setup)
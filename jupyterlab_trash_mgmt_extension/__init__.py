@@ -7,7 +7,11 @@ except ImportError:
     import warnings
     warnings.warn("Importing 'jupyterlab_trash_mgmt_extension' outside a proper installation.")
     __version__ = "dev"
+import atexit
+
+from .manager import TrashManager
 from .routes import setup_route_handlers
+from .trash import get_trash_dir
 
 
 def _jupyter_labextension_paths():
@@ -31,6 +35,13 @@ def _load_jupyter_server_extension(server_app):
     server_app: jupyterlab.labapp.LabApp
         JupyterLab application instance
     """
-    setup_route_handlers(server_app.web_app)
+    manager = TrashManager(parent=server_app, log=server_app.log)
+    setup_route_handlers(server_app.web_app, manager)
+    manager.start_index(get_trash_dir())
+    manager.start_retention()
+    manager.start_reconcile()
+    # jupyter_server has no unload hook for module extensions; release the
+    # watchers, index stores and worker threads when the process exits
+    atexit.register(manager.shutdown)
     name = "jupyterlab_trash_mgmt_extension"
     server_app.log.info(f"Registered {name} server extension")
@@ -0,0 +1,104 @@
+"""Space usage breakdowns of the trash, for finding what to reclaim.
+
+Everything is computed in one pass over the index listing, whose sizes come
+from the size cache, so no file is touched. Only bounded heaps are kept for
+the largest items and groups; nothing sorts the full listing.
+"""
+
+import datetime
+import heapq
+import os
+from typing import Dict, List
+
+from .trash import format_size
+
+# Upper bounds (in days) of the age histogram buckets
+AGE_BUCKETS = (
+    ('Today', 1),
+    ('This week', 7),
+    ('This month', 30),
+    ('Last 3 months', 90),
+    ('This year', 365),
+    ('Older', None)
+)
+
+FOLDER_GROUP = '(folder)'
+NO_EXTENSION_GROUP = '(none)'
+
+
+def item_extension(item: dict) -> str:
+    """Return the lower-cased extension of an item's name, or a group label."""
+    if item.get('is_dir'):
+        return FOLDER_GROUP
+    ext = os.path.splitext(item['name'])[1].lower()
+    return ext or NO_EXTENSION_GROUP
+
+
+def _group(totals: Dict[str, List[int]], key: str, size: int) -> None:
+    entry = totals.get(key)
+    if entry is None:
+        totals[key] = [1, size]
+    else:
+        entry[0] += 1
+        entry[1] += size
+
+
+def _largest_groups(totals: Dict[str, List[int]], limit: int, label: str) -> List[dict]:
+    largest = heapq.nlargest(limit, totals.items(), key=lambda pair: (pair[1][1], pair[0]))
+    return [
+        {label: key, 'count': count, 'size': size, 'size_formatted': format_size(size)}
+        for key, (count, size) in largest
+    ]
+
+
+def analyze_trash(listing: dict, top: int = 20, groups: int = 20, now: datetime.datetime = None) -> dict:
+    """Summarize where the trash's space goes.
+
+    Returns the ``top`` largest items, the ``groups`` largest original parent
+    directories and extensions, and a histogram of item age by deletion date.
+    """
+    now_timestamp = (now or datetime.datetime.now()).timestamp()
+    by_directory: Dict[str, List[int]] = {}
+    by_extension: Dict[str, List[int]] = {}
+    ages = [[0, 0] for _ in AGE_BUCKETS]
+    unknown_age = [0, 0]
+
+    for item in listing['items']:
+        size = item['size']
+        _group(by_directory, os.path.dirname(item.get('original_path', '')) or '(unknown)', size)
+        _group(by_extension, item_extension(item), size)
+
+        timestamp = item.get('deletion_timestamp')
+        if timestamp is None:
+            bucket = unknown_age
+        else:
+            age_days = (now_timestamp - timestamp) / 86400
+            bucket = next(
+                ages[i] for i, (_label, limit) in enumerate(AGE_BUCKETS)
+                if limit is None or age_days < limit
+            )
+        bucket[0] += 1
+        bucket[1] += size
+
+    largest = heapq.nlargest(top, listing['items'], key=lambda item: item['size'])
+    histogram = [
+        {'label': label, 'max_age_days': limit, 'count': count, 'size': size,
+         'size_formatted': format_size(size)}
+        for (label, limit), (count, size) in zip(AGE_BUCKETS, ages)
+    ]
+    if unknown_age[0]:
+        histogram.append({
+            'label': 'Unknown', 'max_age_days': None, 'count': unknown_age[0],
+            'size': unknown_age[1], 'size_formatted': format_size(unknown_age[1])
+        })
+
+    return {
+        'largest': largest,
+        'by_directory': _largest_groups(by_directory, groups, 'directory'),
+        'by_extension': _largest_groups(by_extension, groups, 'extension'),
+        'age_histogram': histogram,
+        'total_size': listing['total_size'],
+        'total_size_formatted': listing['total_size_formatted'],
+        'item_count': listing['item_count'],
+        'version': listing.get('version')
+    }
@@ -0,0 +1,71 @@
+"""Lazy browsing inside trashed directories.
+
+Each request lists one directory level with ``os.scandir``; the sizes of
+child directories come from the subtree size cache and are computed only
+for directories that have not been measured yet.
+"""
+
+import os
+from pathlib import Path
+
+from .directorysizes import get_subtree_cache
+from .transfer import tree_size
+from .trash import TrashError, format_size, resolve_sub_path
+
+
+def _child_size(entry: os.DirEntry, st: os.stat_result) -> int:
+    if not entry.is_dir(follow_symlinks=False):
+        return st.st_size
+    cache = get_subtree_cache()
+    size = cache.get(entry.path, st)
+    if size is None:
+        try:
+            size = tree_size(Path(entry.path))
+        except OSError:
+            size = 0
+        cache.set(entry.path, st, size)
+    return size
+
+
+def list_children(trash_dir: Path, trash_path: str, sub_path: str = '') -> dict:
+    """List the immediate children of ``sub_path`` inside a trashed directory.
+
+    Children are returned folders first, then by name; each ``path`` is
+    relative to the trashed item and can be passed back as ``sub_path`` to
+    browse further, restore or delete.
+    """
+    directory = resolve_sub_path(trash_dir / 'files', trash_path, sub_path)
+    if directory.is_symlink() or not directory.is_dir():
+        raise TrashError('Not a directory', 400)
+
+    prefix = '/'.join(part for part in sub_path.split('/') if part)
+    children = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                    size = _child_size(entry, st)
+                except OSError:
+                    continue
+                children.append({
+                    'name': entry.name,
+                    'path': f'{prefix}/{entry.name}' if prefix else entry.name,
+                    'is_dir': entry.is_dir(follow_symlinks=False),
+                    'is_symlink': entry.is_symlink(),
+                    'size': size,
+                    'size_formatted': format_size(size),
+                    'mtime': st.st_mtime
+                })
+    except PermissionError as e:
+        raise TrashError(str(e), 403) from e
+
+    children.sort(key=lambda child: (not child['is_dir'], child['name'].lower()))
+    total_size = sum(child['size'] for child in children)
+    return {
+        'trash_path': trash_path,
+        'path': prefix,
+        'children': children,
+        'total_size': total_size,
+        'total_size_formatted': format_size(total_size)
+    }
@@ -0,0 +1,201 @@
+"""Directory size cache backed by the FreeDesktop ``Trash/directorysizes`` file.
+
+The Trash specification (version 1.0) defines an optional ``directorysizes``
+file at the root of a trash directory. Each line has the form::
+
+    [size] [mtime] [percent-encoded-directory-name]
+
+where ``mtime`` is the modification time of the matching ``.trashinfo`` file
+in seconds since the epoch. A trashed directory cannot change while it sits in
+the trash, so an entry stays valid for as long as its ``.trashinfo`` mtime is
+unchanged.
+"""
+
+import collections
+import os
+import tempfile
+import threading
+import urllib.parse
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from .metrics import record_cache_lookup
+
+DIRECTORYSIZES_FILENAME = 'directorysizes'
+
+
+class DirectorySizesCache:
+    """Read-through cache of trashed directory sizes.
+
+    Entries are keyed on the trashed directory name and validated against the
+    mtime of its ``.trashinfo`` file. The cache is reloaded whenever another
+    application rewrites the file, and written back atomically (temporary
+    file plus rename) as the specification requires.
+    """
+
+    def __init__(self, trash_dir: Path):
+        self.path = Path(trash_dir) / DIRECTORYSIZES_FILENAME
+        self._entries: Dict[str, Tuple[int, int]] = {}
+        self._file_mtime_ns: Optional[int] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Reload entries from disk if the file changed since the last read."""
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except OSError:
+            return
+        with self._lock:
+            if mtime_ns == self._file_mtime_ns:
+                return
+            entries = {}
+            try:
+                with open(self.path, 'rb') as f:
+                    for line in f:
+                        parsed = _parse_line(line)
+                        if parsed is not None:
+                            name, size, mtime = parsed
+                            entries[name] = (size, mtime)
+            except OSError:
+                return
+            # Keep sizes computed since the last save, they are not on disk yet
+            if self._dirty:
+                entries.update(self._entries)
+            self._entries = entries
+            self._file_mtime_ns = mtime_ns
+
+    def get(self, name: str, info_mtime: int) -> Optional[int]:
+        """Return the cached size of ``name`` if it is still valid."""
+        with self._lock:
+            entry = self._entries.get(name)
+        hit = entry is not None and entry[1] == info_mtime
+        record_cache_lookup('directorysizes', hit)
+        return entry[0] if hit else None
+
+    def set(self, name: str, info_mtime: int, size: int) -> None:
+        """Record the size of ``name`` for the given ``.trashinfo`` mtime."""
+        with self._lock:
+            if self._entries.get(name) != (size, info_mtime):
+                self._entries[name] = (size, info_mtime)
+                self._dirty = True
+
+    def discard(self, name: str) -> None:
+        """Drop the entry for ``name``, e.g. after it was restored or deleted."""
+        with self._lock:
+            if self._entries.pop(name, None) is not None:
+                self._dirty = True
+
+    def prune(self, names: Iterable[str]) -> None:
+        """Drop entries for directories that are no longer in the trash."""
+        keep = set(names)
+        with self._lock:
+            stale = [name for name in self._entries if name not in keep]
+            for name in stale:
+                del self._entries[name]
+            if stale:
+                self._dirty = True
+
+    def save(self) -> None:
+        """Atomically write pending changes back to the ``directorysizes`` file."""
+        with self._lock:
+            if not self._dirty:
+                return
+            lines = [
+                f"{size} {mtime} {urllib.parse.quote(name)}\n"
+                for name, (size, mtime) in sorted(self._entries.items())
+            ]
+            try:
+                fd, tmp_path = tempfile.mkstemp(
+                    prefix='.directorysizes.', dir=str(self.path.parent)
+                )
+            except OSError:
+                return
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.writelines(lines)
+                os.replace(tmp_path, self.path)
+                self._file_mtime_ns = self.path.stat().st_mtime_ns
+                self._dirty = False
+            except OSError:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+
+class SubtreeSizeCache:
+    """In-memory sizes of directories nested inside trashed items.
+
+    Used when browsing into a trashed directory. Entries are keyed on the
+    absolute path and validated against the directory's own inode and mtime;
+    restoring or deleting a sub-path must call :meth:`invalidate`, since a
+    change deep in a tree does not touch its ancestors' mtimes. At most
+    ``max_entries`` entries are kept, least recently used first out.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: 'collections.OrderedDict[str, Tuple[int, int, int]]' = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str, st: os.stat_result) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(path)
+            hit = entry is not None and entry[:2] == (st.st_ino, st.st_mtime_ns)
+            if hit:
+                self._entries.move_to_end(path)
+        record_cache_lookup('subtree', hit)
+        return entry[2] if hit else None
+
+    def set(self, path: str, st: os.stat_result, size: int) -> None:
+        with self._lock:
+            self._entries[path] = (st.st_ino, st.st_mtime_ns, size)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path: str) -> None:
+        """Drop ``path``, everything below it and every ancestor's size."""
+        path = path.rstrip(os.sep)
+        with self._lock:
+            for key in list(self._entries):
+                if (key == path or key.startswith(path + os.sep)
+                        or path.startswith(key + os.sep)):
+                    del self._entries[key]
+
+
+def _parse_line(line: bytes) -> Optional[Tuple[str, int, int]]:
+    """Parse one ``directorysizes`` line, returning None for malformed lines."""
+    parts = line.strip().split(b' ', 2)
+    if len(parts) != 3:
+        return None
+    try:
+        size = int(parts[0])
+        mtime = int(parts[1])
+        name = urllib.parse.unquote(parts[2].decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return name, size, mtime
+
+
+_caches: Dict[Path, DirectorySizesCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_size_cache(trash_dir: Path) -> DirectorySizesCache:
+    """Return the shared size cache for ``trash_dir``."""
+    key = Path(trash_dir)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = DirectorySizesCache(key)
+        return cache
+
+
+_subtree_cache = SubtreeSizeCache()
+
+
+def get_subtree_cache() -> SubtreeSizeCache:
+    """Return the process-wide cache of nested directory sizes."""
+    return _subtree_cache
@@ -0,0 +1,243 @@
+"""Detection and purging of identical files in the trash.
+
+The same large checkpoint or dataset is often trashed many times over.
+Items are compared in three rounds, each only over the collisions of the
+previous one: by size, from the listing; by a hash of their first
+``PARTIAL_HASH_BYTES``; and by a hash of their whole content. Hashes run on
+a small thread pool and are memoized by path, validated against the file's
+inode, mtime and size, so a repeated report reads nothing that is unchanged.
+
+Only trashed regular files are compared; folders and symlinks are skipped.
+"""
+
+import collections
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .metrics import record_cache_lookup
+from .trash import TrashError, delete_item, deletion_sort_key, format_size
+
+PARTIAL_HASH_BYTES = 64 * 1024
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _digest(path: str, limit: Optional[int] = None) -> str:
+    """blake2b of the first ``limit`` bytes of ``path``, or all of it."""
+    digest = hashlib.blake2b(digest_size=16)
+    remaining = limit
+    with open(path, 'rb') as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(HASH_CHUNK_SIZE if remaining is None else min(HASH_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+class HashCache:
+    """Memoized partial and full content hashes, keyed on file path.
+
+    Entries are reused while the file's inode, mtime and size are unchanged.
+    At most ``max_entries`` entries are kept, least recently used first out.
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._entries: 'collections.OrderedDict[str, Tuple[tuple, Dict[str, str]]]' = \
+            collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def digest(self, path: str, full: bool) -> str:
+        """Return the partial (or ``full``) content hash of ``path``.
+
+        For files no larger than ``PARTIAL_HASH_BYTES`` both are the same.
+        Raises OSError if the file cannot be read.
+        """
+        st = os.stat(path)
+        validator = (st.st_ino, st.st_mtime_ns, st.st_size)
+        kind = 'full' if full and st.st_size > PARTIAL_HASH_BYTES else 'partial'
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != validator:
+                entry = (validator, {})
+                self._entries[path] = entry
+            self._entries.move_to_end(path)
+            value = entry[1].get(kind)
+        record_cache_lookup('hash', value is not None)
+        if value is not None:
+            return value
+
+        value = _digest(path, None if kind == 'full' else PARTIAL_HASH_BYTES)
+        with self._lock:
+            entry[1][kind] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+
+_cache = HashCache()
+
+
+def get_hash_cache() -> HashCache:
+    """Return the process-wide content hash cache."""
+    return _cache
+
+
+def _collisions(groups: Dict[tuple, List[dict]]) -> List[dict]:
+    return [item for group in groups.values() if len(group) > 1 for item in group]
+
+
+def _hash_round(items: List[dict], paths: Dict[str, str], full: bool, workers: int,
+                job=None) -> Dict[str, str]:
+    """Hash ``items`` on a thread pool; returns item ids to digests.
+
+    Unreadable files are left out. Stops early when ``job`` is cancelled.
+    """
+    cache = get_hash_cache()
+
+    def run(item):
+        if job is not None and job.cancelled:
+            return item['id'], None
+        try:
+            digest = cache.digest(paths[item['id']], full)
+        except OSError:
+            digest = None
+        if job is not None:
+            job.add_progress(1)
+        return item['id'], digest
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='trash-hash') as pool:
+        return {item_id: digest for item_id, digest in pool.map(run, items) if digest is not None}
+
+
+def find_duplicates(listing: dict, job=None, workers: int = 4, min_size: int = 1) -> dict:
+    """Group the identical files of a merged ``/list`` listing.
+
+    Groups list their items newest first; every copy but the newest is
+    reclaimable. ``min_size`` skips smaller files. Progress is reported to
+    ``job`` per hashed file.
+    """
+    trash_dirs = {volume['id']: Path(volume['trash_dir']) for volume in listing.get('volumes', [])}
+    paths = {}
+    by_size = collections.defaultdict(list)
+    for item in listing['items']:
+        if item['is_dir'] or item['is_symlink'] or item['size'] < min_size:
+            continue
+        trash_dir = trash_dirs.get(item.get('volume'))
+        if trash_dir is None:
+            continue
+        paths[item['id']] = os.path.join(trash_dir, 'files', item['name'])
+        by_size[item['size']].append(item)
+
+    candidates = _collisions(by_size)
+    if job is not None:
+        job.set_totals(len(candidates))
+
+    partial = _hash_round(candidates, paths, False, workers, job)
+    by_partial = collections.defaultdict(list)
+    for item in candidates:
+        if item['id'] in partial:
+            by_partial[(item['size'], partial[item['id']])].append(item)
+
+    # Small files were hashed whole already
+    colliding = _collisions(by_partial)
+    large = [item for item in colliding if item['size'] > PARTIAL_HASH_BYTES]
+    if job is not None:
+        job.set_totals(len(candidates) + len(large))
+    full = _hash_round(large, paths, True, workers, job)
+    by_content = collections.defaultdict(list)
+    for item in colliding:
+        digest = partial[item['id']] if item['size'] <= PARTIAL_HASH_BYTES else full.get(item['id'])
+        if digest is not None:
+            by_content[(item['size'], digest)].append(item)
+
+    groups = []
+    for (size, digest), items in by_content.items():
+        if len(items) < 2:
+            continue
+        items = sorted(items, key=lambda item: item['name'])
+        items.sort(key=deletion_sort_key, reverse=True)
+        reclaimable = size * (len(items) - 1)
+        groups.append({
+            'digest': digest,
+            'size': size,
+            'size_formatted': format_size(size),
+            'count': len(items),
+            'reclaimable': reclaimable,
+            'reclaimable_formatted': format_size(reclaimable),
+            'items': items
+        })
+    groups.sort(key=lambda group: group['reclaimable'], reverse=True)
+
+    reclaimable = sum(group['reclaimable'] for group in groups)
+    result = {
+        'groups': groups,
+        'group_count': len(groups),
+        'duplicate_count': sum(group['count'] - 1 for group in groups),
+        'reclaimable_bytes': reclaimable,
+        'reclaimable_formatted': format_size(reclaimable),
+        'scanned': {'candidates': len(candidates), 'full_hashes': len(large)}
+    }
+    if job is not None and job.cancelled:
+        result['cancelled'] = True
+    return result
+
+
+def purge_duplicates(listing: dict, job=None, workers: int = 4, min_size: int = 1,
+                     digests: Optional[Iterable[str]] = None) -> dict:
+    """Delete every copy but the newest of each duplicate group.
+
+    Groups are found again first, so only copies that are still identical
+    are deleted. ``digests`` restricts the purge to those groups. Progress
+    is reported to ``job`` per deleted copy, which can be cancelled between
+    copies.
+    """
+    report = find_duplicates(listing, workers=workers, min_size=min_size)
+    groups = report['groups']
+    if digests is not None:
+        wanted = set(digests)
+        groups = [group for group in groups if group['digest'] in wanted]
+    trash_dirs = {volume['id']: Path(volume['trash_dir']) for volume in listing.get('volumes', [])}
+    work = [item for group in groups for item in group['items'][1:]]
+    if job is not None:
+        job.set_totals(len(work), sum(item['size'] for item in work))
+
+    deleted = bytes_freed = 0
+    errors = []
+    cancelled = False
+    for item in work:
+        if job is not None and job.cancelled:
+            cancelled = True
+            break
+        freed = 0
+        try:
+            delete_item(trash_dirs[item['volume']], item['name'])
+            deleted += 1
+            freed = item['size']
+            bytes_freed += freed
+        except TrashError as e:
+            errors.append(f"{item['id']}: {e}")
+            if job is not None:
+                job.add_error(errors[-1])
+        if job is not None:
+            job.add_progress(1, freed)
+
+    result = {
+        'success': not errors and not cancelled,
+        'deleted_count': deleted,
+        'kept': [group['items'][0]['id'] for group in groups],
+        'bytes_freed': bytes_freed,
+        'bytes_freed_formatted': format_size(bytes_freed)
+    }
+    if errors:
+        result['errors'] = errors
+    if cancelled:
+        result['cancelled'] = True
+    return result
@@ -0,0 +1,269 @@
+"""Long-lived in-memory index of a trash directory.
+
+The index holds one listing record per entry of ``Trash/files`` and is kept
+current by a watcher (see :mod:`.watcher`). Watch events only mark names as
+dirty; the next read re-parses just those entries, so a ``/list`` request
+on an unchanged trash is a memory read. With an :class:`.IndexStore` the
+records survive restarts and are only revalidated on startup.
+"""
+
+import collections
+import hashlib
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .directorysizes import get_size_cache
+from .indexstore import IndexStore
+from .metrics import TRASH_ITEMS, TRASH_SIZE
+from .scan import ScanStats, record_stats, scan_trash
+from .trash import build_listing, describe_item
+from .volumes import HOME_VOLUME, trash_topdir, volume_id
+from .watcher import read_dir_signature
+
+# Number of version transitions remembered for ``changes_since``
+HISTORY_LENGTH = 64
+
+
+def make_version(signature: tuple, item_count: int, generation: int = 0) -> str:
+    """Derive the content version from the directory signature and entry count.
+
+    ``generation`` only moves when entries changed without touching the
+    directory mtimes (e.g. a ``.trashinfo`` rewritten in place).
+    """
+    digest = hashlib.blake2b(repr((signature, item_count, generation)).encode(), digest_size=8)
+    return digest.hexdigest()
+
+
+class TrashIndex:
+    """Incrementally maintained listing of one trash directory.
+
+    Thread-safe: watch callbacks call :meth:`mark_dirty` from the IOLoop while
+    :meth:`refresh` runs on the worker pool.
+
+    Records are tagged with the ``volume`` they belong to and an ``id`` that
+    is unique across volumes: the bare entry name in the home trash, and
+    ``<volume>/<name>`` in per-volume trashes.
+
+    When a ``store`` is given, the first refresh starts from the records it
+    holds and only re-describes entries whose fingerprint changed while the
+    server was down.
+    """
+
+    def __init__(self, trash_dir: Path, store: Optional[IndexStore] = None):
+        self.trash_dir = Path(trash_dir)
+        self.volume = HOME_VOLUME if trash_topdir(self.trash_dir) is None else volume_id(self.trash_dir)
+        self.files_dir = self.trash_dir / 'files'
+        self.info_dir = self.trash_dir / 'info'
+        self.watcher = None
+        self._items: Dict[str, dict] = {}
+        self._validators: Dict[str, tuple] = {}
+        self._refresh_lock = threading.Lock()
+        self._dirty_lock = threading.Lock()
+        self._dirty_names: Set[str] = set()
+        self._needs_rescan = True
+        self._snapshot: Optional[dict] = None
+        self._signature: Optional[tuple] = None
+        self._generation = 0
+        # System calls of the last refresh's scan
+        self.last_scan = ScanStats()
+        self._history = collections.deque(maxlen=HISTORY_LENGTH)
+        self._history_lock = threading.Lock()
+        self._listeners: List[Callable[['TrashIndex', List[dict], List[str]], None]] = []
+        self.store = store
+        self._store_loaded = store is None
+
+    def add_listener(self, listener: Callable[['TrashIndex', List[dict], List[str]], None]) -> None:
+        """Call ``listener(index, changed_items, removed_names)`` after every
+        refresh that changed the index, on whichever thread ran the refresh."""
+        self._listeners.append(listener)
+
+    def item_id(self, name: str) -> str:
+        return name if self.volume == HOME_VOLUME else f'{self.volume}/{name}'
+
+    def mark_dirty(self, name: Optional[str] = None) -> None:
+        """Schedule ``name`` (or everything, when None) for re-parsing."""
+        with self._dirty_lock:
+            if name is None:
+                self._needs_rescan = True
+            else:
+                self._dirty_names.add(name)
+
+    def invalidate(self, name: str) -> None:
+        """Force ``name`` to be re-described even if its fingerprint is unchanged.
+
+        Needed after changes deep inside a trashed directory, which do not
+        touch the entry's own mtime.
+        """
+        with self._dirty_lock:
+            self._validators.pop(name, None)
+            self._dirty_names.add(name)
+
+    @property
+    def is_dirty(self) -> bool:
+        with self._dirty_lock:
+            return self._needs_rescan or bool(self._dirty_names)
+
+    def check_signature(self) -> bool:
+        """Compare the directory signature with the one the index was built from.
+
+        Marks the index for a rescan and returns False when they differ, which
+        catches changes the watcher has not reported yet.
+        """
+        if read_dir_signature(self.trash_dir) == self._signature:
+            return True
+        self.mark_dirty()
+        return False
+
+    def refresh(self) -> Tuple[List[dict], List[str]]:
+        """Bring the index up to date.
+
+        Returns ``(changed_items, removed_names)``; ``changed_items`` holds the
+        new records for entries that were added or modified.
+        """
+        with self._refresh_lock:
+            # Read before scanning so a change made during the scan yields a
+            # new version on the next check
+            signature = read_dir_signature(self.trash_dir)
+            with self._dirty_lock:
+                rescan = self._needs_rescan
+                names = self._dirty_names
+                self._needs_rescan = False
+                self._dirty_names = set()
+
+            if not self._store_loaded:
+                self._load_store()
+            stats = ScanStats()
+            if rescan:
+                scanned = {entry.name: entry for entry in scan_trash(self.trash_dir, stats=stats)}
+                names = set(scanned) | set(self._items)
+            elif names:
+                scanned = {entry.name: entry for entry in scan_trash(self.trash_dir, names, stats)}
+            self.last_scan = stats
+            record_stats('index', stats)
+
+            if not names:
+                self._update_snapshot(signature, [], [])
+                return [], []
+
+            size_cache = get_size_cache(self.trash_dir)
+            size_cache.load()
+
+            changed, removed = [], []
+            for name in names:
+                entry = scanned.get(name)
+                if entry is None:
+                    if self._items.pop(name, None) is not None:
+                        removed.append(name)
+                    self._validators.pop(name, None)
+                    size_cache.discard(name)
+                    continue
+                validator = entry.validator
+                if self._validators.get(name) == validator and name in self._items:
+                    continue
+                try:
+                    item = describe_item(self.files_dir / name, self.info_dir, size_cache, entry)
+                except (PermissionError, OSError):
+                    continue
+                item['volume'] = self.volume
+                item['id'] = self.item_id(name)
+                self._items[name] = item
+                self._validators[name] = validator
+                changed.append(item)
+
+            size_cache.save()
+            if self.store is not None:
+                pairs = ((item, self._validators[item['name']]) for item in changed)
+                if not self.store.save(pairs, removed):
+                    # The store was corrupt and replaced by an empty one
+                    self.store.save(((item, self._validators[name])
+                                     for name, item in self._items.items()), [])
+            self._update_snapshot(signature, changed, removed)
+
+        if changed or removed:
+            for listener in self._listeners:
+                listener(self, changed, removed)
+        return changed, removed
+
+    def _load_store(self) -> None:
+        self._store_loaded = True
+        items, validators = self.store.load()
+        for name, item in items.items():
+            item['volume'] = self.volume
+            item['id'] = self.item_id(name)
+        self._items.update(items)
+        self._validators.update(validators)
+
+    def _update_snapshot(self, signature: tuple, changed: List[dict], removed: List[str]) -> None:
+        self._signature = signature
+        previous = self._snapshot
+        version = make_version(signature, len(self._items), self._generation)
+        if previous is not None and previous['version'] == version:
+            if not changed and not removed:
+                return
+            self._generation += 1
+            version = make_version(signature, len(self._items), self._generation)
+        snapshot = build_listing(list(self._items.values()))
+        snapshot['version'] = version
+        TRASH_SIZE.labels(self.volume).set(snapshot['total_size'])
+        TRASH_ITEMS.labels(self.volume).set(snapshot['item_count'])
+        if previous is not None and previous['version'] != version:
+            with self._history_lock:
+                self._history.append((
+                    previous['version'],
+                    version,
+                    frozenset(item['name'] for item in changed),
+                    frozenset(removed)
+                ))
+        self._snapshot = snapshot
+
+    def changes_since(self, version: str, until: str) -> Optional[Tuple[Set[str], Set[str]]]:
+        """Return ``(changed_names, removed_names)`` between two versions.
+
+        Returns None when ``version`` is too old or unknown, in which case the
+        caller has to send the full listing.
+        """
+        if version == until:
+            return set(), set()
+        with self._history_lock:
+            history = list(self._history)
+        for start, entry in enumerate(history):
+            if entry[0] == version:
+                break
+        else:
+            return None
+
+        changed, removed = set(), set()
+        for _from_version, to_version, entry_changed, entry_removed in history[start:]:
+            changed = (changed - entry_removed) | entry_changed
+            removed = (removed - entry_changed) | entry_removed
+            if to_version == until:
+                return changed, removed
+        return None
+
+    @property
+    def snapshot(self) -> Optional[dict]:
+        """The listing as of the last refresh, or None before the first one.
+
+        Safe to read from any thread without blocking.
+        """
+        return self._snapshot
+
+    def listing(self, check_signature: bool = False) -> dict:
+        """Return the current listing in the ``/list`` response shape.
+
+        With ``check_signature`` an up-to-date index is first confirmed with
+        :meth:`check_signature`, which costs two ``stat`` calls.
+        """
+        if check_signature and not self.is_dirty and self._snapshot is not None:
+            self.check_signature()
+        if self.is_dirty or self._snapshot is None:
+            self.refresh()
+        return self._snapshot
+
+    def stop(self) -> None:
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        if self.store is not None:
+            self.store.close()
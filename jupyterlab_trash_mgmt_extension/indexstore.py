@@ -0,0 +1,205 @@
+"""Durable copy of the trash index in an SQLite database.
+
+The in-memory index (see :mod:`.index`) is lost whenever the server stops,
+and rebuilding it describes every entry again, which means walking every
+trashed directory to measure it. With a store, the records are saved next
+to the ``files/`` and ``info/`` directories together with the fingerprints
+they were built from, so after a restart only entries whose fingerprint
+changed are described again; the rest cost two ``stat`` calls each.
+
+The database is a cache: when it cannot be opened, is corrupt or was
+written by another schema version it is discarded and rebuilt.
+
+Trash directories are often on network home directories, where SQLite's
+write-ahead log cannot work (it needs memory shared between processes), so
+the database uses a rollback journal.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from .trash import format_size
+
+INDEX_STORE_FILENAME = '.jupyter-trash-index.sqlite'
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    name TEXT PRIMARY KEY,
+    original_path TEXT NOT NULL,
+    deletion_date TEXT NOT NULL,
+    deletion_timestamp REAL,
+    size INTEGER NOT NULL,
+    is_dir INTEGER NOT NULL,
+    is_symlink INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    st_size INTEGER NOT NULL,
+    info_ino INTEGER,
+    info_mtime_ns INTEGER,
+    info_size INTEGER
+)
+"""
+
+_COLUMNS = ('name', 'original_path', 'deletion_date', 'deletion_timestamp', 'size',
+            'is_dir', 'is_symlink', 'ino', 'mtime_ns', 'st_size',
+            'info_ino', 'info_mtime_ns', 'info_size')
+
+_UPSERT = (f"INSERT OR REPLACE INTO items ({', '.join(_COLUMNS)}) "
+           f"VALUES ({', '.join('?' * len(_COLUMNS))})")
+
+
+def _to_row(item: dict, validator: tuple) -> tuple:
+    ino, mtime_ns, st_size, info = validator
+    info_ino, info_mtime_ns, info_size = info if info is not None else (None, None, None)
+    return (item['name'], item['original_path'], item['deletion_date'],
+            item['deletion_timestamp'], item['size'], int(item['is_dir']),
+            int(item['is_symlink']), ino, mtime_ns, st_size,
+            info_ino, info_mtime_ns, info_size)
+
+
+def _from_row(row: tuple) -> Tuple[dict, tuple]:
+    (name, original_path, deletion_date, deletion_timestamp, size, is_dir, is_symlink,
+     ino, mtime_ns, st_size, info_ino, info_mtime_ns, info_size) = row
+    item = {
+        'name': name,
+        'trash_path': name,
+        'original_path': original_path,
+        'deletion_date': deletion_date,
+        'deletion_timestamp': deletion_timestamp,
+        'size': size,
+        'size_formatted': format_size(size),
+        'is_dir': bool(is_dir),
+        'is_symlink': bool(is_symlink)
+    }
+    info = (info_ino, info_mtime_ns, info_size) if info_ino is not None else None
+    return item, (ino, mtime_ns, st_size, info)
+
+
+class IndexStore:
+    """Index records of one trash directory, persisted in SQLite.
+
+    The database is opened on first use, so creating a store does no I/O.
+    Thread-safe: the connection is shared between the worker threads that
+    run index refreshes and serialized with a lock.
+    """
+
+    def __init__(self, trash_dir: Path, log: Optional[logging.Logger] = None):
+        self.path = Path(trash_dir) / INDEX_STORE_FILENAME
+        self.log = log or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = False
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Open the database on first use; call with the lock held."""
+        if self._conn is None and not self._disabled:
+            try:
+                self._conn = self._connect()
+            except sqlite3.Error as e:
+                # Most likely a corrupt or foreign file: start over
+                self.log.warning('Discarding trash index store %s: %s', self.path, e)
+                self._remove_files()
+                try:
+                    self._conn = self._connect()
+                except sqlite3.Error as e:
+                    self.log.warning('Trash index store %s disabled: %s', self.path, e)
+                    self._disabled = True
+        return self._conn
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        try:
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if version not in (0, SCHEMA_VERSION):
+                conn.execute('DROP TABLE IF EXISTS items')
+            conn.execute('PRAGMA journal_mode=DELETE')
+            # The store can always be rebuilt, so a lost transaction is harmless
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(_SCHEMA)
+            conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+            conn.execute('SELECT count(*) FROM items').fetchone()
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    def _discard(self, error: sqlite3.Error) -> None:
+        """Drop a database found corrupt in use; call with the lock held.
+
+        The next access creates an empty one.
+        """
+        self.log.warning('Discarding trash index store %s: %s', self.path, error)
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._remove_files()
+
+    def _remove_files(self) -> None:
+        # Stores written before the rollback journal was used may have a WAL
+        for suffix in ('', '-journal', '-wal', '-shm'):
+            try:
+                os.unlink(f'{self.path}{suffix}')
+            except OSError:
+                pass
+
+    def load(self) -> Tuple[Dict[str, dict], Dict[str, tuple]]:
+        """Return the stored ``(records, fingerprints)``, both keyed on name."""
+        items, validators = {}, {}
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return items, validators
+            try:
+                rows = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM items").fetchall()
+            except sqlite3.OperationalError as e:
+                self.log.warning('Could not read trash index store %s: %s', self.path, e)
+                return items, validators
+            except sqlite3.DatabaseError as e:
+                self._discard(e)
+                return items, validators
+        for row in rows:
+            item, validator = _from_row(row)
+            items[item['name']] = item
+            validators[item['name']] = validator
+        return items, validators
+
+    def save(self, changed: Iterable[Tuple[dict, tuple]], removed: Iterable[str]) -> bool:
+        """Write ``(record, fingerprint)`` pairs and drop ``removed`` names
+        in one transaction.
+
+        Returns False when the database was found corrupt and discarded: the
+        new, empty one then needs every record written again.
+        """
+        rows = [_to_row(item, validator) for item, validator in changed]
+        names = [(name,) for name in removed]
+        if not rows and not names:
+            return True
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return True
+            try:
+                with conn:
+                    conn.execute('BEGIN')
+                    conn.executemany(_UPSERT, rows)
+                    conn.executemany('DELETE FROM items WHERE name = ?', names)
+            except sqlite3.OperationalError as e:
+                # Locked or out of space: the next save may succeed
+                self.log.warning('Could not update trash index store %s: %s', self.path, e)
+            except sqlite3.DatabaseError as e:
+                self._discard(e)
+                return False
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._disabled = True
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,100 @@
+"""Background jobs for trash operations that outlive a single HTTP request."""
+
+import threading
+import time
+import uuid
+from typing import Optional
+
+from .trash import format_size
+
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+
+class Job:
+    """Progress and cancellation state of one background operation.
+
+    The job function runs on a worker thread and reports progress through
+    :meth:`add_progress`; the IOLoop reads :meth:`to_dict` concurrently.
+    Cancellation is cooperative: job functions check :attr:`cancelled`
+    between units of work and stop early, returning ``cancelled: True``.
+    """
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = JOB_PENDING
+        self.items_total = 0
+        self.items_done = 0
+        self.bytes_total = 0
+        self.bytes_done = 0
+        self.errors = []
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def set_totals(self, items: int = 0, nbytes: int = 0) -> None:
+        with self._lock:
+            self.items_total = items
+            self.bytes_total = nbytes
+
+    def add_progress(self, items: int = 0, nbytes: int = 0) -> None:
+        with self._lock:
+            self.items_done += items
+            self.bytes_done += nbytes
+
+    def add_error(self, message: str) -> None:
+        with self._lock:
+            self.errors.append(message)
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def wait_cancelled(self, timeout: float) -> bool:
+        """Sleep up to ``timeout`` seconds, returning early (True) if cancelled."""
+        return self._cancel_event.wait(timeout)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def start(self) -> None:
+        with self._lock:
+            self.status = JOB_RUNNING
+
+    def finish(self, status: str, result: Optional[dict] = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished = time.time()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                'job_id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'items_total': self.items_total,
+                'items_done': self.items_done,
+                'bytes_total': self.bytes_total,
+                'bytes_done': self.bytes_done,
+                'bytes_total_formatted': format_size(self.bytes_total),
+                'bytes_done_formatted': format_size(self.bytes_done),
+                'errors': list(self.errors),
+                'result': self.result,
+                'error': self.error,
+                'cancel_requested': self.cancelled
+            }
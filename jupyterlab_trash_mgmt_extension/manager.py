@@ -0,0 +1,827 @@
+"""Server-side state shared by the trash management handlers."""
+
+import asyncio
+import collections
+import datetime
+import functools
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from tornado.ioloop import IOLoop, PeriodicCallback
+from traitlets import Bool, Enum, Float, Integer
+from traitlets.config import LoggingConfigurable
+
+from . import metrics
+from .deletion import get_remover
+from .duplicates import find_duplicates, purge_duplicates
+from .analytics import analyze_trash
+from .index import HISTORY_LENGTH, TrashIndex
+from .indexstore import IndexStore
+from .jobs import JOB_CANCELLED, JOB_COMPLETED, JOB_FAILED, Job
+from .preview import PREVIEW_MAX_BYTES
+from .reconcile import FILES_ACTIONS, ORPHAN_MIN_AGE, find_orphans, repair_orphans
+from .retention import select_evictions
+from .trash import CrossDeviceError, TrashError, build_listing, delete_items, format_size, get_trash_dir
+from .volumes import TrashVolume, build_volumes, find_volume_trashes, read_mount_points
+from .watcher import PollingWatcher, start_watcher
+
+
+# Seconds after startup before the first scheduled reconciliation
+RECONCILE_STARTUP_DELAY = 60.0
+
+
+def _job_main(job: Job, func, *args, **kwargs):
+    # A job is pending until a job thread picks it up
+    job.start()
+    return func(*args, job=job, **kwargs)
+
+
+class TrashManager(LoggingConfigurable):
+    """Runs blocking trash operations off the Tornado IOLoop.
+
+    Configure it like any other Jupyter server component, for example in
+    ``jupyter_server_config.py``::
+
+        c.TrashManager.max_workers = 8
+        c.TrashManager.max_concurrent_operations = 16
+    """
+
+    max_workers = Integer(
+        4,
+        config=True,
+        help="Number of worker threads used for trash filesystem operations."
+    )
+
+    max_concurrent_operations = Integer(
+        8,
+        config=True,
+        help=(
+            "Maximum number of trash operations in flight at once. Further "
+            "requests wait for a free slot instead of queueing unbounded work "
+            "on the worker pool."
+        )
+    )
+
+    max_concurrent_jobs = Integer(
+        2,
+        config=True,
+        help=(
+            "Number of background jobs (emptying, purges, cross-filesystem "
+            "restores, deduplication) run at once. Jobs run on threads of their "
+            "own, so a long or throttled job never holds the workers serving "
+            "requests; further jobs wait as pending."
+        )
+    )
+
+    batch_parallelism = Integer(
+        4,
+        config=True,
+        help=(
+            "Maximum number of items of one batch restore or delete processed "
+            "at the same time, so a large batch leaves worker slots for other "
+            "requests."
+        )
+    )
+
+    deletion_workers = Integer(
+        8,
+        config=True,
+        help=(
+            "Number of threads removing the subdirectories of one deleted tree "
+            "in parallel. Deletion on network filesystems is bound by per-file "
+            "latency, so this can exceed the CPU count. 1 deletes serially."
+        )
+    )
+
+    hash_workers = Integer(
+        4,
+        config=True,
+        help=(
+            "Number of threads hashing trashed files to find duplicates. "
+            "Hashing is mostly bound by I/O, so a few threads suffice."
+        )
+    )
+
+    preview_max_bytes = Integer(
+        PREVIEW_MAX_BYTES,
+        config=True,
+        help=(
+            "Most bytes of a trashed file returned by one /preview request, "
+            "whatever range is asked for."
+        )
+    )
+
+    job_progress_interval = Float(
+        0.5,
+        config=True,
+        help="Seconds between progress messages pushed for running background jobs."
+    )
+
+    job_retention = Float(
+        600.0,
+        config=True,
+        help="Seconds a finished background job stays available for status queries."
+    )
+
+    scan_volumes = Bool(
+        True,
+        config=True,
+        help=(
+            "Also list the per-volume trash directories (.Trash/$uid and "
+            ".Trash-$uid) of mounted filesystems next to the home trash."
+        )
+    )
+
+    mount_cache_ttl = Float(
+        30.0,
+        config=True,
+        help="Seconds the mount table and discovered volume trashes are cached."
+    )
+
+    retention_max_age_days = Float(
+        0.0,
+        config=True,
+        help="Purge trashed items deleted more than this many days ago. 0 disables the limit."
+    )
+
+    retention_max_size = Integer(
+        0,
+        config=True,
+        help=(
+            "Maximum bytes kept in each trash directory; the oldest items are "
+            "purged beyond it. 0 disables the limit."
+        )
+    )
+
+    retention_max_items = Integer(
+        0,
+        config=True,
+        help=(
+            "Maximum number of items kept in each trash directory; the oldest "
+            "items are purged beyond it. 0 disables the limit."
+        )
+    )
+
+    retention_interval = Float(
+        3600.0,
+        config=True,
+        help="Seconds between retention policy checks."
+    )
+
+    retention_max_deletions_per_second = Float(
+        10.0,
+        config=True,
+        help=(
+            "Rate limit for automatic purges, so they do not saturate shared "
+            "storage. It counts trashed items, not the files inside them; "
+            "throttled purges remove each trashed folder on one thread instead "
+            "of in parallel. 0 deletes as fast as possible."
+        )
+    )
+
+    reconcile_interval = Float(
+        86400.0,
+        config=True,
+        help=(
+            "Seconds between passes matching Trash/files against Trash/info "
+            "to find orphans left by crashed or non-compliant tools. 0 disables "
+            "the scheduled pass; /orphans still works on demand."
+        )
+    )
+
+    reconcile_purge_info = Bool(
+        True,
+        config=True,
+        help="Remove .trashinfo files without an item during scheduled reconciliation."
+    )
+
+    reconcile_files_action = Enum(
+        FILES_ACTIONS,
+        default_value='keep',
+        config=True,
+        help=(
+            "What scheduled reconciliation does with items that have no "
+            ".trashinfo: 'keep' them (only report), 'regenerate' their "
+            ".trashinfo so they can be restored, or 'purge' them."
+        )
+    )
+
+    orphan_min_age = Float(
+        ORPHAN_MIN_AGE,
+        config=True,
+        help=(
+            "Seconds an unmatched files/ or info/ entry must be left unchanged "
+            "before it counts as an orphan, so items being trashed or restored "
+            "by other tools are not mistaken for orphans."
+        )
+    )
+
+    use_inotify = Bool(
+        True,
+        config=True,
+        help=(
+            "Watch the trash with inotify to keep the in-memory index current. "
+            "When disabled or unavailable the trash is polled instead."
+        )
+    )
+
+    persistent_index = Bool(
+        False,
+        config=True,
+        help=(
+            "Keep a copy of the trash index in an SQLite database inside each "
+            "trash directory, so that after a restart only items that changed "
+            "meanwhile are measured again and the first listing is fast."
+        )
+    )
+
+    index_poll_interval = Float(
+        5.0,
+        config=True,
+        help="Seconds between trash directory polls when inotify is not used."
+    )
+
+    list_cache_ttl = Float(
+        1.0,
+        config=True,
+        help=(
+            "Seconds a merged listing is reused for further /list requests "
+            "without checking the trash again. Changes seen by the watchers or "
+            "made through the extension end the reuse early; 0 disables it."
+        )
+    )
+
+    push_delay = Float(
+        0.2,
+        config=True,
+        help=(
+            "Seconds to wait after a trash change before refreshing the index "
+            "and pushing the delta to connected clients, so bursts of changes "
+            "are sent as one message."
+        )
+    )
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, self.max_workers),
+            thread_name_prefix='trash-mgmt'
+        )
+        self._job_executor = ThreadPoolExecutor(
+            max_workers=max(1, self.max_concurrent_jobs),
+            thread_name_prefix='trash-job'
+        )
+        self._semaphore = asyncio.Semaphore(max(1, self.max_concurrent_operations))
+        self._indexes: Dict[Path, TrashIndex] = {}
+        self._subscribers: List[Callable[[dict], None]] = []
+        self._pending_pushes: set = set()
+        self._io_loop: Optional[IOLoop] = None
+        self._jobs: Dict[str, Job] = {}
+        self._volumes: List[TrashVolume] = []
+        self._volumes_checked = 0.0
+        self._volumes_future: Optional[asyncio.Future] = None
+        # Merged version -> per-volume versions, for /list?since= lookups
+        self._merged_versions: 'collections.OrderedDict[str, Dict[str, str]]' = collections.OrderedDict()
+        self._merged_lock = threading.Lock()
+        # The merged listing in progress, shared by concurrent callers, and
+        # the last one as (monotonic time it was started, listing)
+        self._listing_future: Optional[asyncio.Future] = None
+        self._listing_waiters = 0
+        self._listing_cache: Optional[tuple] = None
+        # Bumped on every known change, so listings started before it are not cached
+        self._listing_generation = 0
+        self._retention_callback: Optional[PeriodicCallback] = None
+        self._reconcile_callback: Optional[PeriodicCallback] = None
+        self._reconcile_jobs: Dict[Path, Job] = {}
+        self._analytics_cache: Optional[tuple] = None
+        self._purge_jobs: Dict[Path, Job] = {}
+        get_remover().set_max_workers(self.deletion_workers)
+
+    async def run(self, func, *args, **kwargs):
+        """Run ``func(*args, **kwargs)`` on the worker pool and return its result."""
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs)
+            )
+
+    async def run_batch(self, func, trash_dir: Path, trash_paths: List[str],
+                        copy_job=None) -> List[dict]:
+        """Run ``func(trash_dir, trash_path)`` for every path with bounded parallelism.
+
+        Returns one result per path, in order; failures are reported per item
+        with ``success: False``, an ``error`` message and the HTTP ``status``.
+        When ``func`` raises :class:`CrossDeviceError` and a ``copy_job`` is
+        given, ``copy_job(trash_dir, trash_path)`` is started as a ``restore``
+        job instead and the item's result carries the ``job``.
+        """
+        limit = asyncio.Semaphore(max(1, self.batch_parallelism))
+
+        async def run_one(trash_path: str) -> dict:
+            async with limit:
+                try:
+                    result = await self.run(func, trash_dir, trash_path)
+                except CrossDeviceError as e:
+                    if copy_job is None:
+                        return {'trash_path': trash_path, 'success': False,
+                                'error': str(e), 'status': e.status_code}
+                    job = self.start_job('restore', [trash_dir], copy_job, trash_dir, trash_path)
+                    return {'trash_path': trash_path, 'success': True, 'job': job.to_dict()}
+                except TrashError as e:
+                    return {'trash_path': trash_path, 'success': False,
+                            'error': str(e), 'status': e.status_code}
+                except Exception as e:
+                    return {'trash_path': trash_path, 'success': False,
+                            'error': str(e), 'status': 500}
+                finally:
+                    self.record_change(trash_dir, trash_path)
+            return {'trash_path': trash_path, **result}
+
+        return await asyncio.gather(*(run_one(path) for path in trash_paths))
+
+    def start_job(self, kind: str, trash_dirs: List[Path], func, *args, **kwargs) -> Job:
+        """Run ``func(*args, job=job, **kwargs)`` as a background job.
+
+        Progress is pushed to event subscribers while the job runs, and the
+        indexes of ``trash_dirs`` are refreshed once it finishes.
+        """
+        self._prune_jobs()
+        job = Job(kind)
+        self._jobs[job.id] = job
+        asyncio.ensure_future(self._run_job(job, trash_dirs, func, *args, **kwargs))
+        return job
+
+    async def _run_job(self, job: Job, trash_dirs: List[Path], func, *args, **kwargs) -> None:
+        reporter = PeriodicCallback(
+            functools.partial(self._broadcast_job, job), self.job_progress_interval * 1000
+        )
+        reporter.start()
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                self._job_executor, functools.partial(_job_main, job, func, *args, **kwargs)
+            )
+        except Exception as e:
+            self.log.warning(f"Trash {job.kind} job {job.id} failed: {e}")
+            job.finish(JOB_FAILED, error=str(e))
+        else:
+            job.finish(JOB_CANCELLED if result.get('cancelled') else JOB_COMPLETED, result)
+        finally:
+            metrics.record_bytes(job.kind, job.bytes_done)
+            reporter.stop()
+            for trash_dir in trash_dirs:
+                self.record_change(trash_dir)
+            self._broadcast_job(job)
+
+    def _broadcast_job(self, job: Job) -> None:
+        if self._subscribers:
+            self._broadcast({'type': 'job', **job.to_dict()})
+
+    def _prune_jobs(self) -> None:
+        cutoff = time.time() - self.job_retention
+        for job_id, job in list(self._jobs.items()):
+            if job.done and job.finished < cutoff:
+                del self._jobs[job_id]
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Job]:
+        self._prune_jobs()
+        return list(self._jobs.values())
+
+    async def get_volumes(self) -> List[TrashVolume]:
+        """Return the home trash followed by the trashes of other mounted volumes.
+
+        The mount table is re-read at most every ``mount_cache_ttl`` seconds;
+        concurrent callers share one discovery.
+        """
+        if self._volumes and time.monotonic() - self._volumes_checked < self.mount_cache_ttl:
+            return self._volumes
+        if self._volumes_future is None:
+            self._volumes_future = asyncio.ensure_future(self._discover_volumes())
+        future = self._volumes_future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self._volumes_future is future and future.done():
+                self._volumes_future = None
+
+    async def _discover_volumes(self) -> List[TrashVolume]:
+        found = []
+        if self.scan_volumes and hasattr(os, 'getuid'):
+            uid = os.getuid()
+            mount_points = await self.run(read_mount_points)
+            # Probe mounts concurrently: each stat can be a network round trip
+            results = await asyncio.gather(
+                *(self.run(find_volume_trashes, topdir, uid, self.log) for topdir in mount_points),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, list):
+                    found.extend(result)
+        volumes = await self.run(build_volumes, get_trash_dir(), found)
+        for volume in volumes:
+            self.get_index(volume.trash_dir)
+        self._volumes = volumes
+        self._volumes_checked = time.monotonic()
+        return volumes
+
+    async def get_volume(self, volume_id: Optional[str]) -> TrashVolume:
+        """Return the volume with ``volume_id`` (the home trash when empty)."""
+        volumes = await self.get_volumes()
+        if not volume_id:
+            return volumes[0]
+        for volume in volumes:
+            if volume.id == volume_id:
+                return volume
+        raise TrashError(f'Unknown volume: {volume_id}', 404)
+
+    @property
+    def retention_enabled(self) -> bool:
+        return (self.retention_max_age_days > 0 or self.retention_max_size > 0
+                or self.retention_max_items > 0)
+
+    def start_retention(self) -> None:
+        """Enforce the retention policy now and every ``retention_interval`` seconds."""
+        if not self.retention_enabled or self._retention_callback is not None:
+            return
+        self._retention_callback = PeriodicCallback(
+            self.enforce_retention, self.retention_interval * 1000, jitter=0.1
+        )
+        self._retention_callback.start()
+        IOLoop.current().add_callback(self.enforce_retention)
+
+    async def enforce_retention(self) -> List[Job]:
+        """Start a throttled purge job for every trash that violates the policy.
+
+        A trash whose previous purge is still running is skipped.
+        """
+        jobs = []
+        now = datetime.datetime.now()
+        for volume in await self.get_volumes():
+            running = self._purge_jobs.get(volume.trash_dir)
+            if running is not None and not running.done:
+                continue
+            try:
+                listing = await self.listing(volume.trash_dir)
+            except Exception as e:
+                self.log.warning(f"Retention check failed for {volume.trash_dir}: {e}")
+                continue
+            evicted = select_evictions(
+                listing['items'], now,
+                max_age_days=self.retention_max_age_days,
+                max_size=self.retention_max_size,
+                max_items=self.retention_max_items
+            )
+            if not evicted:
+                continue
+            self.log.info(
+                f"Retention policy purging {len(evicted)} items "
+                f"({format_size(sum(item['size'] for item in evicted))}) from {volume.trash_dir}"
+            )
+            job = self.start_job(
+                'purge', [volume.trash_dir], delete_items, volume.trash_dir,
+                [item['name'] for item in evicted],
+                sizes={item['name']: item['size'] for item in evicted},
+                max_rate=self.retention_max_deletions_per_second
+            )
+            self._purge_jobs[volume.trash_dir] = job
+            jobs.append(job)
+        return jobs
+
+    def start_reconcile(self) -> None:
+        """Reconcile every trash shortly after startup and every ``reconcile_interval`` seconds.
+
+        The first pass is delayed so it does not compete with building the index.
+        """
+        if self.reconcile_interval <= 0 or self._reconcile_callback is not None:
+            return
+        self._reconcile_callback = PeriodicCallback(
+            self.reconcile, self.reconcile_interval * 1000, jitter=0.1
+        )
+        self._reconcile_callback.start()
+        IOLoop.current().call_later(RECONCILE_STARTUP_DELAY, self.reconcile)
+
+    async def find_orphans(self, volumes: List[TrashVolume]) -> List[dict]:
+        """Report the orphans of ``volumes``, scanned concurrently on the worker pool."""
+        reports = await asyncio.gather(*(
+            self.run(find_orphans, volume.trash_dir, self.orphan_min_age) for volume in volumes
+        ))
+        return [{'volume': volume.id, **report} for volume, report in zip(volumes, reports)]
+
+    async def find_duplicates(self, min_size: int = 1) -> dict:
+        """Report the identical files of every volume's trash."""
+        listing = await self.merged_listing()
+        return await self.run(find_duplicates, listing, workers=self.hash_workers, min_size=min_size)
+
+    async def start_duplicates_job(self, purge: bool, min_size: int = 1, digests=None) -> Job:
+        """Find (or, with ``purge``, purge) duplicates as a background job."""
+        listing = await self.merged_listing()
+        trash_dirs = [Path(volume['trash_dir']) for volume in listing['volumes']]
+        if not purge:
+            # Only reads the trash: no index refresh needed afterwards
+            return self.start_job('duplicates', [], find_duplicates, listing,
+                                  workers=self.hash_workers, min_size=min_size)
+        return self.start_job('dedup', trash_dirs, purge_duplicates, listing,
+                              workers=self.hash_workers, min_size=min_size, digests=digests)
+
+    async def purge_duplicates(self, min_size: int = 1, digests=None) -> dict:
+        """Delete all but the newest copy of each duplicate group, or of the
+        groups in ``digests``."""
+        listing = await self.merged_listing()
+        trash_dirs = [Path(volume['trash_dir']) for volume in listing['volumes']]
+        try:
+            result = await self.run(purge_duplicates, listing, workers=self.hash_workers,
+                                    min_size=min_size, digests=digests)
+        finally:
+            for trash_dir in trash_dirs:
+                self.record_change(trash_dir)
+        metrics.record_bytes('dedup', result['bytes_freed'])
+        return result
+
+    async def reconcile(self) -> List[Job]:
+        """Start a repair job for every trash with orphans, per the configured actions.
+
+        A trash whose previous repair is still running is skipped.
+        """
+        jobs = []
+        volumes = await self.get_volumes()
+        try:
+            reports = await self.find_orphans(volumes)
+        except Exception as e:
+            self.log.warning(f"Trash reconciliation failed: {e}")
+            return jobs
+        for volume, report in zip(volumes, reports):
+            running = self._reconcile_jobs.get(volume.trash_dir)
+            if running is not None and not running.done:
+                continue
+            missing, orphaned = len(report['missing_info']), len(report['orphaned_info'])
+            if not missing and not orphaned:
+                continue
+            self.log.info(
+                f"Trash {volume.trash_dir} has {missing} items without .trashinfo and "
+                f"{orphaned} orphaned .trashinfo files ({report['orphaned_bytes_formatted']})"
+            )
+            if not (orphaned and self.reconcile_purge_info) and not (
+                    missing and self.reconcile_files_action != 'keep'):
+                continue
+            job = self.start_job(
+                'reconcile', [volume.trash_dir], repair_orphans, [volume.trash_dir],
+                purge_info=self.reconcile_purge_info, files=self.reconcile_files_action,
+                min_age=self.orphan_min_age
+            )
+            self._reconcile_jobs[volume.trash_dir] = job
+            jobs.append(job)
+        return jobs
+
+    def get_index(self, trash_dir: Path) -> TrashIndex:
+        """Return the index for ``trash_dir``, creating and watching it on first use.
+
+        Must be called from the IOLoop thread, which drives the watchers.
+        """
+        trash_dir = Path(trash_dir)
+        if self._io_loop is None:
+            self._io_loop = IOLoop.current()
+        index = self._indexes.get(trash_dir)
+        if index is None:
+            store = IndexStore(trash_dir, self.log) if self.persistent_index else None
+            index = self._indexes[trash_dir] = TrashIndex(trash_dir, store)
+            index.add_listener(self._on_index_changed)
+        if index.watcher is None or not index.watcher.active:
+            self._start_watcher(index)
+        return index
+
+    def start_index(self, trash_dir: Path) -> TrashIndex:
+        """Create the index for ``trash_dir`` and build it in the background."""
+        index = self.get_index(trash_dir)
+        self._executor.submit(index.refresh)
+        return index
+
+    def _start_watcher(self, index: TrashIndex) -> None:
+        if index.watcher is not None:
+            index.watcher.stop()
+        index.watcher = start_watcher(
+            index.trash_dir,
+            functools.partial(self._on_trash_change, index),
+            poll_interval=self.index_poll_interval,
+            use_inotify=self.use_inotify,
+            log=self.log,
+            executor=self._executor
+        )
+
+    def _on_trash_change(self, index: TrashIndex, name: Optional[str]) -> None:
+        self._mark_changed(index, name)
+        if name is not None:
+            return
+        # Directories were created, replaced or removed: re-establish the
+        # watch, upgrading from polling to inotify when it becomes possible
+        watcher = index.watcher
+        if not watcher.active or (self.use_inotify and isinstance(watcher, PollingWatcher)):
+            self._start_watcher(index)
+
+    def record_change(self, trash_dir: Path, name: Optional[str] = None,
+                      contents_changed: bool = False) -> None:
+        """Record that ``name`` (or the whole trash, when None) was modified.
+
+        ``contents_changed`` marks a change inside a trashed directory, which
+        the entry's fingerprint cannot detect.
+        """
+        index = self.get_index(trash_dir)
+        if contents_changed and name is not None:
+            index.invalidate(name)
+        self._mark_changed(index, name)
+
+    def _mark_changed(self, index: TrashIndex, name: Optional[str]) -> None:
+        index.mark_dirty(name)
+        self._listing_generation += 1
+        self._listing_cache = None
+        # Without subscribers the index is refreshed lazily on the next read
+        if self._subscribers and index not in self._pending_pushes:
+            self._pending_pushes.add(index)
+            self._io_loop.call_later(self.push_delay, self._refresh_for_push, index)
+
+    async def _refresh_for_push(self, index: TrashIndex) -> None:
+        self._pending_pushes.discard(index)
+        try:
+            await self.run(index.refresh)
+        except Exception as e:
+            self.log.warning(f"Failed to refresh trash index for {index.trash_dir}: {e}")
+
+    def _on_index_changed(self, index: TrashIndex, changed: list, removed: list) -> None:
+        # Refreshes run on worker threads; hop back to the IOLoop to broadcast
+        if not self._subscribers or self._io_loop is None:
+            return
+        volumes = self._volumes or [TrashVolume(index.volume, index.trash_dir, None)]
+        snapshots = []
+        for volume in volumes:
+            other = self._indexes.get(volume.trash_dir)
+            snapshot = other.snapshot if other is not None else None
+            snapshots.append(snapshot or build_listing([]))
+        merged = self.merge_listings(volumes, snapshots)
+        message = {
+            'type': 'delta',
+            'added': changed,
+            'removed': [index.item_id(name) for name in removed],
+            'total_size': merged['total_size'],
+            'total_size_formatted': merged['total_size_formatted'],
+            'item_count': merged['item_count'],
+            'version': merged['version']
+        }
+        self._io_loop.add_callback(self._broadcast, message)
+
+    def subscribe(self, callback: Callable[[dict], None]) -> None:
+        """Register ``callback(message)`` to receive trash change messages."""
+        self._subscribers.append(callback)
+        metrics.EVENT_SUBSCRIBERS.set(len(self._subscribers))
+
+    def unsubscribe(self, callback: Callable[[dict], None]) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+            metrics.EVENT_SUBSCRIBERS.set(len(self._subscribers))
+
+    def _broadcast(self, message: dict) -> None:
+        for callback in list(self._subscribers):
+            try:
+                callback(message)
+            except Exception as e:
+                self.log.debug(f"Dropping trash event subscriber: {e}")
+                self.unsubscribe(callback)
+
+    async def listing(self, trash_dir: Path) -> dict:
+        """Return the ``/list`` payload for ``trash_dir`` from its index.
+
+        The payload carries the index ``version`` used for ETags and deltas.
+        Even an up-to-date index is confirmed against the trash directories
+        on the worker pool, as a ``stat`` on network storage can stall the
+        IOLoop.
+        """
+        index = self.get_index(trash_dir)
+        return await self.run(index.listing, check_signature=True)
+
+    async def merged_listing(self) -> dict:
+        """Return the ``/list`` payload merging the trashes of every volume.
+
+        Concurrent callers share a single listing in progress, and its result
+        is reused for ``list_cache_ttl`` seconds unless a change is recorded
+        first, so any number of polling clients costs one scan per interval.
+        """
+        cached = self._listing_cache
+        if cached is not None and time.monotonic() - cached[0] < self.list_cache_ttl:
+            metrics.LIST_REQUESTS.labels('cached').inc()
+            return cached[1]
+        if self._listing_future is None:
+            metrics.LIST_REQUESTS.labels('computed').inc()
+            self._listing_waiters = 0
+            self._listing_future = asyncio.ensure_future(self._build_merged_listing())
+        else:
+            metrics.LIST_REQUESTS.labels('coalesced').inc()
+            self._listing_waiters += 1
+        future = self._listing_future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self._listing_future is future and future.done():
+                self._listing_future = None
+
+    async def _build_merged_listing(self) -> dict:
+        started = time.monotonic()
+        generation = self._listing_generation
+        volumes = await self.get_volumes()
+        listings = await asyncio.gather(*(self.listing(volume.trash_dir) for volume in volumes))
+        merged = self.merge_listings(volumes, listings)
+        if generation == self._listing_generation:
+            self._listing_cache = (started, merged)
+        self.log.debug(
+            f"Listed the trash of {len(volumes)} volume(s) in {time.monotonic() - started:.3f}s "
+            f"for {self._listing_waiters + 1} concurrent request(s)"
+        )
+        return merged
+
+    async def analytics(self, top: int = 20, groups: int = 20) -> dict:
+        """Return :func:`.analytics.analyze_trash` of the merged listing.
+
+        The last result is reused until the trash version or the limits change.
+        """
+        listing = await self.merged_listing()
+        key = (listing['version'], top, groups)
+        if self._analytics_cache is not None and self._analytics_cache[0] == key:
+            return self._analytics_cache[1]
+        result = await self.run(analyze_trash, listing, top=top, groups=groups)
+        self._analytics_cache = (key, result)
+        return result
+
+    def merge_listings(self, volumes: List[TrashVolume], listings: List[dict]) -> dict:
+        """Combine per-volume listings, adding per-volume ``volumes`` totals.
+
+        With only the home trash the version is the index version itself;
+        otherwise it is derived from every volume's version.
+        """
+        versions = {volume.id: listing.get('version') for volume, listing in zip(volumes, listings)}
+        if len(listings) == 1:
+            version = listings[0].get('version')
+            merged = dict(listings[0])
+        else:
+            digest = hashlib.blake2b(repr(sorted(versions.items())).encode(), digest_size=8)
+            version = digest.hexdigest()
+            merged = build_listing([item for listing in listings for item in listing['items']])
+        merged['version'] = version
+        merged['volumes'] = [
+            {
+                **volume.to_dict(),
+                'item_count': listing['item_count'],
+                'total_size': listing['total_size'],
+                'total_size_formatted': listing['total_size_formatted']
+            }
+            for volume, listing in zip(volumes, listings)
+        ]
+        with self._merged_lock:
+            self._merged_versions[version] = versions
+            self._merged_versions.move_to_end(version)
+            while len(self._merged_versions) > HISTORY_LENGTH:
+                self._merged_versions.popitem(last=False)
+        return merged
+
+    def changes_since(self, since: str, listing: dict):
+        """Return ``(changed_ids, removed_ids)`` between ``since`` and a merged listing.
+
+        Returns None when ``since`` is unknown, or the volumes changed in a
+        way that needs the full listing.
+        """
+        with self._merged_lock:
+            old_versions = self._merged_versions.get(since)
+            new_versions = self._merged_versions.get(listing['version'])
+        if old_versions is None or new_versions is None or set(old_versions) - set(new_versions):
+            return None
+        changed, removed = set(), set()
+        for volume in listing['volumes']:
+            index = self._indexes.get(Path(volume['trash_dir']))
+            if volume['id'] not in old_versions:
+                # Newly mounted volume: all of its entries are new
+                changed.update(item['id'] for item in index.snapshot['items'])
+                continue
+            changes = index.changes_since(old_versions[volume['id']], new_versions[volume['id']])
+            if changes is None:
+                return None
+            changed.update(index.item_id(name) for name in changes[0])
+            removed.update(index.item_id(name) for name in changes[1])
+        return changed, removed
+
+    def shutdown(self) -> None:
+        """Stop watchers and release the worker threads."""
+        for callback in (self._retention_callback, self._reconcile_callback):
+            if callback is not None:
+                callback.stop()
+        self._retention_callback = self._reconcile_callback = None
+        for job in self._jobs.values():
+            job.cancel()
+        for index in self._indexes.values():
+            index.stop()
+        self._executor.shutdown(wait=False)
+        self._job_executor.shutdown(wait=False)
+        get_remover().shutdown()
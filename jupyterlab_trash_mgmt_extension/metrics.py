@@ -0,0 +1,96 @@
+"""Prometheus metrics of the trash extension.
+
+Metrics are registered with the default ``prometheus_client`` registry,
+which Jupyter Server already exposes at ``/metrics``, so they are scraped
+together with the server's own metrics and need no endpoint of their own.
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+REQUEST_DURATION = Histogram(
+    'jupyter_trash_request_duration_seconds',
+    'Latency of trash API requests',
+    ['endpoint', 'method', 'status_code']
+)
+
+ENTRIES_SCANNED = Counter(
+    'jupyter_trash_entries_scanned_total',
+    'Trash entries and files examined, by what examined them',
+    ['source']
+)
+
+STAT_CALLS = Counter(
+    'jupyter_trash_stat_calls_total',
+    'stat and lstat calls made on trash contents, by what made them',
+    ['source']
+)
+
+DIRECTORY_READS = Counter(
+    'jupyter_trash_directory_reads_total',
+    'listdir and scandir calls on trash contents, by what made them',
+    ['source']
+)
+
+CACHE_LOOKUPS = Counter(
+    'jupyter_trash_cache_lookups_total',
+    'Lookups in the trash caches; the hit ratio is hit / (hit + miss)',
+    ['cache', 'result']
+)
+
+LIST_REQUESTS = Counter(
+    'jupyter_trash_list_requests_total',
+    'Merged trash listings asked for, by whether they were computed, joined '
+    'one already in progress (coalesced) or reused within the TTL (cached)',
+    ['result']
+)
+
+BYTES_DELETED = Counter(
+    'jupyter_trash_deleted_bytes_total',
+    'Bytes permanently deleted from the trash',
+    ['operation']
+)
+
+BYTES_RESTORED = Counter(
+    'jupyter_trash_restored_bytes_total',
+    'Bytes restored from the trash'
+)
+
+TRASH_SIZE = Gauge(
+    'jupyter_trash_size_bytes',
+    'Current size of the trash',
+    ['volume']
+)
+
+TRASH_ITEMS = Gauge(
+    'jupyter_trash_items',
+    'Current number of items in the trash',
+    ['volume']
+)
+
+EVENT_SUBSCRIBERS = Gauge(
+    'jupyter_trash_event_subscribers',
+    'Open /events WebSocket connections'
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def record_scan(source: str, entries: int, stat_calls: int, dir_reads: int = 0) -> None:
+    if entries:
+        ENTRIES_SCANNED.labels(source).inc(entries)
+    if stat_calls:
+        STAT_CALLS.labels(source).inc(stat_calls)
+    if dir_reads:
+        DIRECTORY_READS.labels(source).inc(dir_reads)
+
+
+def record_bytes(operation: str, nbytes: int) -> None:
+    """Count ``nbytes`` restored (``operation == 'restore'``) or deleted."""
+    if nbytes <= 0:
+        return
+    if operation == 'restore':
+        BYTES_RESTORED.inc(nbytes)
+    else:
+        BYTES_DELETED.labels(operation).inc(nbytes)
@@ -0,0 +1,204 @@
+"""Bounded previews of trashed files.
+
+A preview never reads more than a fixed number of bytes, whatever the size
+of the file: byte ranges are read in chunks straight from the trash, text
+is told from binary by sniffing the first bytes, and notebooks are
+summarized by decoding their ``cells`` array one cell at a time until
+enough cells are found.
+"""
+
+import json
+import os
+import re
+import stat
+from pathlib import Path
+from typing import Optional, Tuple
+
+from .trash import TrashError, format_size, resolve_sub_path
+
+PREVIEW_MAX_BYTES = 64 * 1024
+
+READ_CHUNK_SIZE = 16 * 1024
+
+# Bytes inspected to tell text from binary
+SNIFF_BYTES = 8 * 1024
+
+# Most of a notebook read while looking for its first cells; outputs with
+# embedded images can make single cells this large
+NOTEBOOK_READ_LIMIT = 4 * 1024 * 1024
+
+# Characters of each cell's source included in a notebook summary
+CELL_SOURCE_CHARS = 2000
+
+MAX_PREVIEW_CELLS = 50
+
+_RANGE = re.compile(r'bytes=(\d*)-(\d*)$')
+
+# nbformat writes keys sorted, so "cells" opens the document
+_CELLS_START = re.compile(rb'\s*\{\s*"cells"\s*:\s*\[')
+
+
+def open_preview(trash_dir: Path, trash_path: str, sub_path: str = '') -> Tuple[Path, int]:
+    """Return the path and size of a trashed regular file to preview."""
+    path = resolve_sub_path(Path(trash_dir) / 'files', trash_path, sub_path)
+    st = os.lstat(path)
+    if not stat.S_ISREG(st.st_mode):
+        raise TrashError('Only regular files can be previewed', 400)
+    return path, st.st_size
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range ``Range`` header into ``(start, end)``, end exclusive.
+
+    Returns None when there is no usable header (multiple ranges are not
+    supported and are ignored, as HTTP allows). Raises TrashError 416 for a
+    range outside the file.
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if match is None or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        start, end = max(0, size - int(last)), size
+    else:
+        start = int(first)
+        end = size if last == '' else min(size, int(last) + 1)
+    if start >= size or start >= end:
+        raise TrashError('Range not satisfiable', 416)
+    return start, end
+
+
+def read_range(path: Path, start: int, end: int, max_bytes: int = PREVIEW_MAX_BYTES) -> bytes:
+    """Read ``[start, end)`` of ``path``, at most ``max_bytes`` of it, in chunks."""
+    end = min(end, start + max_bytes)
+    chunks = []
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(READ_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def sniff_text(data: bytes) -> bool:
+    """Whether ``data`` looks like UTF-8 text.
+
+    Binary files almost always contain NUL bytes early on; a multi-byte
+    character cut off at the end of the sample does not count as invalid.
+    """
+    sample = data[:SNIFF_BYTES]
+    if b'\0' in sample:
+        return False
+    try:
+        sample.decode('utf-8')
+    except UnicodeDecodeError as e:
+        return e.start >= len(sample) - 3 and e.reason == 'unexpected end of data'
+    return True
+
+
+def _cell_summary(cell: dict) -> dict:
+    source = cell.get('source', '')
+    if isinstance(source, list):
+        source = ''.join(source)
+    summary = {
+        'cell_type': cell.get('cell_type', ''),
+        'source': source[:CELL_SOURCE_CHARS],
+        'truncated': len(source) > CELL_SOURCE_CHARS
+    }
+    if summary['cell_type'] == 'code':
+        summary['execution_count'] = cell.get('execution_count')
+        summary['output_count'] = len(cell.get('outputs') or [])
+    return summary
+
+
+def _decode_prefix(data: bytes) -> str:
+    """Decode the longest prefix of ``data`` that ends on a character boundary."""
+    for cut in range(4):
+        try:
+            return data[:len(data) - cut].decode('utf-8')
+        except UnicodeDecodeError:
+            continue
+    raise UnicodeDecodeError('utf-8', data, 0, len(data), 'invalid notebook encoding')
+
+
+def summarize_notebook(path: Path, max_cells: int = 5) -> Optional[dict]:
+    """Summarize the first ``max_cells`` cells of a notebook.
+
+    Cells are decoded one at a time while the file is read in chunks, so
+    only the start of the notebook is read. Returns None when the file does
+    not start like an nbformat 4 notebook.
+    """
+    decoder = json.JSONDecoder()
+    cells = []
+    complete = False
+    with open(path, 'rb') as f:
+        pending = f.read(READ_CHUNK_SIZE)
+        read = len(pending)
+        match = _CELLS_START.match(pending)
+        if match is None:
+            return None
+        pending = pending[match.end():]
+        buffer = ''
+        eof = False
+        try:
+            while len(cells) < max_cells:
+                # Keep incomplete multi-byte characters for the next chunk
+                text = pending.decode('utf-8') if eof else _decode_prefix(pending)
+                pending = pending[len(text.encode('utf-8')):]
+                buffer = (buffer + text).lstrip(' \t\r\n,')
+                if buffer.startswith(']'):
+                    complete = True
+                    break
+                try:
+                    cell, position = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    if eof or read >= NOTEBOOK_READ_LIMIT:
+                        break
+                    # The cell continues further on; doubling what is read
+                    # keeps re-decoding a large cell linear overall
+                    chunk = f.read(min(max(READ_CHUNK_SIZE, len(buffer)), NOTEBOOK_READ_LIMIT - read))
+                    read += len(chunk)
+                    eof = not chunk
+                    pending += chunk
+                    continue
+                if isinstance(cell, dict):
+                    cells.append(_cell_summary(cell))
+                buffer = buffer[position:]
+        except UnicodeDecodeError:
+            return None
+    return {
+        'cells': cells,
+        'more_cells': not complete,
+        'bytes_read': read
+    }
+
+
+def preview_summary(trash_dir: Path, trash_path: str, sub_path: str = '',
+                    max_bytes: int = PREVIEW_MAX_BYTES, max_cells: int = 5) -> dict:
+    """Describe the start of a trashed file for display.
+
+    ``kind`` is ``notebook`` (with ``cells``), ``text`` (with the first
+    ``max_bytes`` as ``text``) or ``binary``.
+    """
+    path, size = open_preview(trash_dir, trash_path, sub_path)
+    result = {'size': size, 'size_formatted': format_size(size)}
+    if path.name.endswith('.ipynb'):
+        notebook = summarize_notebook(path, max_cells)
+        if notebook is not None:
+            return {**result, 'kind': 'notebook', **notebook}
+    data = read_range(path, 0, size, max_bytes)
+    if not sniff_text(data):
+        return {**result, 'kind': 'binary'}
+    return {
+        **result,
+        'kind': 'text',
+        'text': data.decode('utf-8', 'replace'),
+        'truncated': len(data) < size
+    }
@@ -0,0 +1,211 @@
+"""Reconciliation of ``Trash/files`` against ``Trash/info``.
+
+Every entry of ``files/`` should have a matching ``info/<name>.trashinfo``
+and vice versa. Crashed or non-compliant tools leave orphans behind on
+either side: payloads without metadata, which cannot be restored to where
+they came from, and ``.trashinfo`` files describing nothing. Both
+directories are listed once, sorted and merge-joined, so a pass costs two
+``listdir`` calls plus a stat per orphan.
+"""
+
+import os
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from .transfer import tree_size
+from .trash import TrashError, forget_sizes, format_size, remove_entry
+from .volumes import trash_topdir
+
+TRASHINFO_SUFFIX = '.trashinfo'
+
+# What to do with payloads that have no .trashinfo
+FILES_ACTIONS = ('keep', 'regenerate', 'purge')
+
+# Where regenerated items restore to, under the home or volume top directory
+RECOVERY_DIR = 'Recovered from Trash'
+
+# Entries changed more recently than this may belong to a trash or restore
+# in progress (the .trashinfo is written before the payload is moved)
+ORPHAN_MIN_AGE = 60.0
+
+
+def _listdir(path: Path) -> List[str]:
+    try:
+        return os.listdir(path)
+    except FileNotFoundError:
+        return []
+
+
+def merge_join(files: List[str], infos: List[str]) -> Iterator[Tuple[str, bool, bool]]:
+    """Yield ``(name, has_payload, has_info)`` over both sorted name lists."""
+    i = j = 0
+    while i < len(files) or j < len(infos):
+        if j == len(infos) or (i < len(files) and files[i] < infos[j]):
+            yield files[i], True, False
+            i += 1
+        elif i == len(files) or infos[j] < files[i]:
+            yield infos[j], False, True
+            j += 1
+        else:
+            yield files[i], True, True
+            i += 1
+            j += 1
+
+
+def _settled(path: Path, cutoff: float) -> bool:
+    try:
+        return os.lstat(path).st_ctime < cutoff
+    except OSError:
+        return False
+
+
+def _lsize(path: Path) -> int:
+    try:
+        return os.lstat(path).st_size
+    except OSError:
+        return 0
+
+
+def find_orphans(trash_dir: Path, min_age: float = ORPHAN_MIN_AGE) -> dict:
+    """Report the orphans of one trash directory.
+
+    ``missing_info`` lists payloads without a ``.trashinfo``, with their
+    size; ``orphaned_info`` lists files of ``info/`` that describe no
+    payload, including anything not named ``*.trashinfo``. Entries changed
+    less than ``min_age`` seconds ago are not reported.
+    """
+    cutoff = time.time() - min_age
+    files_dir = trash_dir / 'files'
+    info_dir = trash_dir / 'info'
+    files = sorted(_listdir(files_dir))
+    info_names = _listdir(info_dir)
+    # Join on the item name; other files in info/ are orphans by definition
+    infos = sorted(name[:-len(TRASHINFO_SUFFIX)] for name in info_names
+                   if name.endswith(TRASHINFO_SUFFIX))
+    stray = sorted(name for name in info_names if not name.endswith(TRASHINFO_SUFFIX))
+
+    missing_info, orphaned_info = [], []
+    for name, has_payload, has_info in merge_join(files, infos):
+        if has_payload and not has_info:
+            path = files_dir / name
+            if not _settled(path, cutoff):
+                continue
+            try:
+                size = tree_size(path)
+            except OSError:
+                size = 0
+            missing_info.append({
+                'name': name,
+                'size': size,
+                'size_formatted': format_size(size),
+                'is_dir': path.is_dir() and not path.is_symlink()
+            })
+        elif has_info and not has_payload:
+            info_name = name + TRASHINFO_SUFFIX
+            if _settled(info_dir / info_name, cutoff):
+                orphaned_info.append({'name': info_name, 'size': _lsize(info_dir / info_name)})
+    orphaned_info.extend({'name': name, 'size': _lsize(info_dir / name)} for name in stray
+                         if _settled(info_dir / name, cutoff))
+
+    orphaned_bytes = (sum(item['size'] for item in missing_info)
+                      + sum(item['size'] for item in orphaned_info))
+    return {
+        'trash_dir': str(trash_dir),
+        'missing_info': missing_info,
+        'orphaned_info': orphaned_info,
+        'orphaned_bytes': orphaned_bytes,
+        'orphaned_bytes_formatted': format_size(orphaned_bytes),
+        'scanned': {'files': len(files), 'info': len(info_names)}
+    }
+
+
+def regenerate_trashinfo(trash_dir: Path, name: str) -> None:
+    """Write a ``.trashinfo`` for a payload that lost its own.
+
+    The original location is unknown, so rather than guessing one the item
+    is restored into :data:`RECOVERY_DIR` at the top of its volume, or in
+    the home directory for the home trash. The payload's mtime stands in for
+    the deletion date.
+    """
+    topdir = trash_topdir(trash_dir)
+    # Volume trashes store paths relative to $topdir
+    path = (f'{RECOVERY_DIR}/{name}' if topdir is not None
+            else str(Path.home() / RECOVERY_DIR / name))
+    mtime = os.lstat(trash_dir / 'files' / name).st_mtime
+    content = (
+        '[Trash Info]\n'
+        f'Path={urllib.parse.quote(os.fsencode(path), safe="/")}\n'
+        f'DeletionDate={time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(mtime))}\n'
+    )
+    # O_EXCL, as the specification requires, so a concurrent trash wins
+    fd = os.open(trash_dir / 'info' / f'{name}{TRASHINFO_SUFFIX}',
+                 os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def repair_orphans(trash_dirs: list, purge_info: bool = True, files: str = 'keep',
+                   job=None, min_age: float = ORPHAN_MIN_AGE) -> dict:
+    """Fix the orphans of several trash directories.
+
+    Orphaned ``.trashinfo`` files are removed when ``purge_info`` is set.
+    Payloads without metadata are kept, given a regenerated ``.trashinfo``
+    (``files='regenerate'``) or deleted (``files='purge'``). Progress is
+    reported to ``job`` per orphan, which can be cancelled between orphans.
+    """
+    if files not in FILES_ACTIONS:
+        raise TrashError(f'files must be one of {", ".join(FILES_ACTIONS)}', 400)
+
+    reports = [(Path(trash_dir), find_orphans(Path(trash_dir), min_age)) for trash_dir in trash_dirs]
+    work = []
+    for trash_dir, report in reports:
+        if purge_info:
+            work.extend((trash_dir, 'purge_info', item) for item in report['orphaned_info'])
+        if files != 'keep':
+            work.extend((trash_dir, files, item) for item in report['missing_info'])
+    if job is not None:
+        job.set_totals(len(work), sum(item['size'] for _, action, item in work
+                                      if action != 'regenerate'))
+
+    counts = {'purged_info': 0, 'regenerated': 0, 'purged_files': 0}
+    bytes_freed = 0
+    errors = []
+    cancelled = False
+    for trash_dir, action, item in work:
+        if job is not None and job.cancelled:
+            cancelled = True
+            break
+        try:
+            if action == 'purge_info':
+                os.unlink(trash_dir / 'info' / item['name'])
+                counts['purged_info'] += 1
+            elif action == 'regenerate':
+                regenerate_trashinfo(trash_dir, item['name'])
+                counts['regenerated'] += 1
+            else:
+                path = trash_dir / 'files' / item['name']
+                remove_entry(path)
+                forget_sizes(trash_dir, item['name'], path)
+                counts['purged_files'] += 1
+            if action != 'regenerate':
+                bytes_freed += item['size']
+        except (OSError, TrashError) as e:
+            errors.append(f"{item['name']}: {e}")
+            if job is not None:
+                job.add_error(errors[-1])
+        if job is not None:
+            job.add_progress(1, 0 if action == 'regenerate' else item['size'])
+
+    result = {
+        'success': not errors and not cancelled,
+        **counts,
+        'bytes_freed': bytes_freed,
+        'bytes_freed_formatted': format_size(bytes_freed)
+    }
+    if errors:
+        result['errors'] = errors
+    if cancelled:
+        result['cancelled'] = True
+    return result
@@ -0,0 +1,42 @@
+"""Retention policy: which trashed items to purge automatically.
+
+The policy is evaluated per trash directory (each volume has its own quota)
+against the index listing, and evicts oldest-first by the records'
+``deletion_timestamp`` (parsed from ``DeletionDate`` when the entry was
+indexed): first everything older than the maximum age, then the oldest
+remaining items until the trash fits the size and count limits.
+"""
+
+import datetime
+from typing import List
+
+
+def select_evictions(items: List[dict], now: datetime.datetime, max_age_days: float = 0,
+                     max_size: int = 0, max_items: int = 0) -> List[dict]:
+    """Return the items ``items`` must lose to satisfy the policy, oldest first.
+
+    A limit of 0 disables it. Items without a readable deletion date never
+    expire by age but are evicted first for the size and count limits.
+    """
+    dated = [(item.get('deletion_timestamp'), item) for item in items]
+    dated.sort(key=lambda pair: (pair[0] is not None, pair[0] or 0.0, pair[1]['name']))
+
+    evicted = []
+    remaining = dated
+    if max_age_days > 0:
+        cutoff = (now - datetime.timedelta(days=max_age_days)).timestamp()
+        evicted = [item for timestamp, item in dated if timestamp is not None and timestamp < cutoff]
+        remaining = [(timestamp, item) for timestamp, item in dated
+                     if timestamp is None or timestamp >= cutoff]
+
+    count = len(remaining)
+    size = sum(item['size'] for _timestamp, item in remaining)
+    for _timestamp, item in remaining:
+        over_size = max_size > 0 and size > max_size
+        over_count = max_items > 0 and count > max_items
+        if not over_size and not over_count:
+            break
+        evicted.append(item)
+        count -= 1
+        size -= item['size']
+    return evicted
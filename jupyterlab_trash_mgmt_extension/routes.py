@@ -1,80 +1,106 @@
+import functools
 import json
-import os
-import shutil
-import urllib.parse
-from configparser import ConfigParser
-from datetime import datetime
-from pathlib import Path
-
-from jupyter_server.base.handlers import APIHandler
+
+from jupyter_server.base.handlers import APIHandler, JupyterHandler
 from jupyter_server.utils import url_path_join
 import tornado
+from tornado import websocket
+from tornado.iostream import StreamClosedError
+
+from . import metrics
+from .browse import list_children
+from .manager import TrashManager
+from .preview import MAX_PREVIEW_CELLS, open_preview, parse_range, preview_summary, read_range, sniff_text
+from .reconcile import FILES_ACTIONS, repair_orphans
+from .trash import (
+    CrossDeviceError,
+    TrashError,
+    delete_item,
+    delete_items,
+    delta_since,
+    empty_volumes,
+    format_size,
+    get_cached_item_size,
+    get_dir_size,
+    get_item_size,
+    get_trash_dir,
+    parse_trashinfo,
+    query_trash,
+    restore_item,
+)
+
+MANAGER_SETTINGS_KEY = 'trash_mgmt_manager'
+
+MAX_ANALYTICS_LIMIT = 1000
+
+# Items serialized and flushed at a time by /list?format=ndjson
+NDJSON_CHUNK_ITEMS = 500
+
+
+class TrashAPIHandler(APIHandler):
+    """Base handler giving access to the shared trash manager.
+
+    Every request's latency is recorded under the route's ``endpoint`` name
+    (see :mod:`.metrics`).
+    """
+
+    def initialize(self, endpoint: str = ''):
+        self.endpoint = endpoint or type(self).__name__
+
+    def on_finish(self):
+        metrics.REQUEST_DURATION.labels(
+            self.endpoint, self.request.method, str(self.get_status())
+        ).observe(self.request.request_time())
+        super().on_finish()
+
+    @property
+    def trash_manager(self) -> TrashManager:
+        return self.settings[MANAGER_SETTINGS_KEY]
+
+    def finish_error(self, error: TrashError):
+        self.set_status(error.status_code)
+        self.finish(json.dumps({'error': str(error)}))
+
+    def get_json_body(self) -> dict:
+        """Parse the request body, treating an empty body as ``{}``."""
+        return json.loads(self.request.body) if self.request.body else {}
+
+    async def volume_trash_dir(self, data: dict):
+        """Return the trash directory of the ``volume`` named in a request body.
+
+        Items are restored and deleted within their own volume's trash, so no
+        operation moves data between filesystems. Defaults to the home trash.
+        """
+        volume = await self.trash_manager.get_volume(data.get('volume'))
+        return volume.trash_dir
+
+    async def start_background_delete(self, kind: str, trash_dir, func, *args):
+        """Start a deletion job and answer 202 with its initial state.
+
+        Item sizes come from the index so progress can be reported in bytes.
+        """
+        sizes = await self.item_sizes(trash_dir)
+        job = self.trash_manager.start_job(kind, [trash_dir], func, trash_dir, *args, sizes=sizes)
+        self.set_status(202)
+        self.finish(json.dumps(job.to_dict()))
+
+    async def item_sizes(self, trash_dir) -> dict:
+        """Map the entry names of ``trash_dir`` to their indexed sizes."""
+        listing = await self.trash_manager.listing(trash_dir)
+        return {item['name']: item['size'] for item in listing['items']}
+
+    def get_int_argument(self, name: str, default=None):
+        """Read an optional integer query argument, raising TrashError if malformed."""
+        value = self.get_argument(name, None)
+        if value is None or value == '':
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise TrashError(f'{name} must be an integer', 400)
 
 
-def get_trash_dir() -> Path:
-    """Get the XDG trash directory path."""
-    xdg_data_home = os.environ.get('XDG_DATA_HOME', os.path.expanduser('~/.local/share'))
-    return Path(xdg_data_home) / 'Trash'
-
-
-def get_dir_size(path: Path) -> int:
-    """Calculate total size of a directory recursively."""
-    total = 0
-    try:
-        for entry in path.rglob('*'):
-            if entry.is_file():
-                total += entry.stat().st_size
-    except (PermissionError, OSError):
-        pass
-    return total
-
-
-def get_item_size(path: Path) -> int:
-    """Get size of file or directory. Handles symlinks by reporting link size."""
-    if path.is_symlink():
-        try:
-            return path.lstat().st_size
-        except (PermissionError, OSError):
-            return 0
-    if path.is_dir():
-        return get_dir_size(path)
-    try:
-        return path.stat().st_size
-    except (PermissionError, OSError):
-        return 0
-
-
-def format_size(size_bytes: int) -> str:
-    """Format size in human readable format."""
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if size_bytes < 1024:
-            if unit == 'B':
-                return f"{size_bytes} {unit}"
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024
-    return f"{size_bytes:.1f} PB"
-
-
-def parse_trashinfo(info_path: Path) -> dict:
-    """Parse a .trashinfo file and return metadata."""
-    result = {
-        'original_path': '',
-        'deletion_date': ''
-    }
-    try:
-        config = ConfigParser()
-        config.read(info_path)
-        if config.has_section('Trash Info'):
-            # Use raw=True to prevent interpolation of % characters in URL-encoded paths
-            path = config.get('Trash Info', 'Path', fallback='', raw=True)
-            result['original_path'] = urllib.parse.unquote(path)
-            result['deletion_date'] = config.get('Trash Info', 'DeletionDate', fallback='', raw=True)
-    except Exception:
-        pass
-    return result
-
-
-class TrashStatusHandler(APIHandler):
+class TrashStatusHandler(TrashAPIHandler):
     """Handler for checking if trash functionality is enabled."""
 
     @tornado.web.authenticated
@@ -88,118 +114,259 @@ class TrashStatusHandler(APIHandler):
         }))
 
 
-class TrashListHandler(APIHandler):
-    """Handler for listing trash contents."""
+class TrashListHandler(TrashAPIHandler):
+    """Handler for listing trash contents.
 
-    @tornado.web.authenticated
-    def get(self):
-        trash_dir = get_trash_dir()
-        files_dir = trash_dir / 'files'
-        info_dir = trash_dir / 'info'
-
-        items = []
-        total_size = 0
-
-        if files_dir.exists():
-            for entry in files_dir.iterdir():
-                try:
-                    info_file = info_dir / f"{entry.name}.trashinfo"
-                    metadata = parse_trashinfo(info_file) if info_file.exists() else {}
-
-                    size = get_item_size(entry)
-                    total_size += size
-
-                    # For symlinks, check if target is dir without following broken links
-                    is_dir = entry.is_dir() if not entry.is_symlink() else entry.is_dir()
-                    is_symlink = entry.is_symlink()
-
-                    items.append({
-                        'name': entry.name,
-                        'trash_path': entry.name,
-                        'original_path': metadata.get('original_path', ''),
-                        'deletion_date': metadata.get('deletion_date', ''),
-                        'size': size,
-                        'size_formatted': format_size(size),
-                        'is_dir': is_dir,
-                        'is_symlink': is_symlink
-                    })
-                except (PermissionError, OSError):
-                    continue
-
-        # Sort by deletion date (most recent first)
-        items.sort(key=lambda x: x.get('deletion_date', ''), reverse=True)
+    Query arguments: ``sort`` (name, deletion_date or size), ``order`` (asc or
+    desc), ``filter`` (substring or glob on name and original path),
+    ``offset`` and ``limit``. Without ``limit`` every matching item is returned.
 
-        self.finish(json.dumps({
-            'items': items,
-            'total_size': total_size,
-            'total_size_formatted': format_size(total_size),
-            'item_count': len(items)
-        }))
+    Responses carry the trash content version as a strong ETag and answer
+    ``If-None-Match`` with 304. With ``since=<version>`` only the entries
+    added or removed after that version are returned, or the full listing
+    with ``full: true`` when the version is no longer known.
 
+    Items of every volume's trash are merged; each carries its ``volume`` and
+    the response lists the ``volumes`` with their totals.
 
-class TrashRestoreHandler(APIHandler):
-    """Handler for restoring items from trash."""
+    With ``format=ndjson`` the response is newline-delimited JSON: one line
+    per item, then a final ``{"summary": {...}}`` line with everything but
+    ``items``. The full sorted listing is built in memory first and then
+    written and flushed in chunks. It cannot be combined with ``since``.
+    """
 
     @tornado.web.authenticated
-    def post(self):
-        data = json.loads(self.request.body)
-        trash_path = data.get('trash_path', '')
+    async def get(self):
+        try:
+            offset = self.get_int_argument('offset', 0)
+            limit = self.get_int_argument('limit')
+            response_format = self.get_argument('format', 'json')
+            if response_format not in ('json', 'ndjson'):
+                raise TrashError('format must be json or ndjson', 400)
+            stream = response_format == 'ndjson'
+            if stream and self.get_argument('since', None):
+                raise TrashError('since cannot be combined with format=ndjson', 400)
+            listing = await self.trash_manager.merged_listing()
+
+            self.set_header('ETag', f'"{listing["version"]}"')
+            if self.check_etag_header():
+                self.set_status(304)
+                self.finish()
+                return
+
+            since = self.get_argument('since', None)
+            if since:
+                changes = self.trash_manager.changes_since(since, listing)
+                if changes is not None:
+                    changed, removed = changes
+                    self.finish(json.dumps(
+                        delta_since(listing, changed, removed, self.get_argument('filter', ''))
+                    ))
+                    return
+
+            result = query_trash(
+                listing,
+                sort=self.get_argument('sort', 'deletion_date'),
+                order=self.get_argument('order', 'desc'),
+                pattern=self.get_argument('filter', ''),
+                offset=offset,
+                limit=limit
+            )
+        except TrashError as e:
+            self.finish_error(e)
+            return
+        if stream:
+            await self.write_ndjson(result)
+            return
+        if since:
+            result['full'] = True
+        self.finish(json.dumps(result))
+
+    async def write_ndjson(self, result: dict):
+        """Send a listing as NDJSON without serializing it as one string.
+
+        The listing is already built and sorted in memory; only its encoding
+        and transmission are split into chunks. If the client goes away the
+        remaining chunks are dropped, but the request is still finished so it
+        is logged and recorded in the metrics.
+        """
+        content_type = 'application/x-ndjson'
+        self.set_header('Content-Type', content_type)
+        items = result.pop('items')
+        for start in range(0, len(items), NDJSON_CHUNK_ITEMS):
+            chunk = items[start:start + NDJSON_CHUNK_ITEMS]
+            self.write(''.join(json.dumps(item) + '\n' for item in chunk))
+            try:
+                await self.flush()
+            except StreamClosedError:
+                self.log.debug(f"Client closed the NDJSON listing after {start} of {len(items)} items")
+                self.finish(set_content_type=content_type)
+                return
+        self.finish(json.dumps({'summary': result}) + '\n', set_content_type=content_type)
+
+
+class TrashAnalyticsHandler(TrashAPIHandler):
+    """Handler summarizing where the trash's space goes.
+
+    Query arguments: ``top`` (number of largest items) and ``groups`` (number
+    of largest directories and extensions), both 1 to ``MAX_ANALYTICS_LIMIT``.
+    """
+
+    @tornado.web.authenticated
+    async def get(self):
+        try:
+            top = self.get_int_argument('top', 20)
+            groups = self.get_int_argument('groups', 20)
+            if not (0 < top <= MAX_ANALYTICS_LIMIT and 0 < groups <= MAX_ANALYTICS_LIMIT):
+                raise TrashError(f'top and groups must be between 1 and {MAX_ANALYTICS_LIMIT}', 400)
+            result = await self.trash_manager.analytics(top, groups)
+        except TrashError as e:
+            self.finish_error(e)
+            return
+        self.finish(json.dumps(result))
+
+
+class TrashBrowseHandler(TrashAPIHandler):
+    """Handler listing one level inside a trashed directory.
+
+    Query arguments: ``trash_path`` (the trashed item), ``path`` (relative
+    path inside it, empty for its top level) and optional ``volume``.
+    """
 
+    @tornado.web.authenticated
+    async def get(self):
+        trash_path = self.get_argument('trash_path', '')
         if not trash_path:
             self.set_status(400)
             self.finish(json.dumps({'error': 'No trash_path provided'}))
             return
+        try:
+            trash_dir = await self.volume_trash_dir({'volume': self.get_argument('volume', '')})
+            result = await self.trash_manager.run(
+                list_children, trash_dir, trash_path, self.get_argument('path', '')
+            )
+        except TrashError as e:
+            self.finish_error(e)
+            return
+        self.finish(json.dumps(result))
 
-        trash_dir = get_trash_dir()
-        files_dir = trash_dir / 'files'
-        info_dir = trash_dir / 'info'
 
-        source = files_dir / trash_path
-        info_file = info_dir / f"{trash_path}.trashinfo"
+class TrashPreviewHandler(TrashAPIHandler):
+    """Handler previewing a trashed file without restoring it.
 
-        if not source.exists() and not source.is_symlink():
-            self.set_status(404)
-            self.finish(json.dumps({'error': 'Item not found in trash'}))
-            return
+    Query arguments: ``trash_path``, ``path`` (a file inside a trashed
+    directory, see ``/browse``) and optional ``volume``. The file's bytes
+    are served as ``text/plain`` or ``application/octet-stream``, honouring
+    a single-range ``Range`` header. At most ``preview_max_bytes`` are
+    returned; a response covering only part of the file is a 206 with
+    ``Content-Range``.
 
-        # Get original path from trashinfo
-        metadata = parse_trashinfo(info_file) if info_file.exists() else {}
-        original_path = metadata.get('original_path', '')
+    With ``format=summary`` the response is JSON instead: ``kind`` is
+    ``notebook`` (the first ``cells`` cells), ``text`` (the start of the
+    file) or ``binary``.
+    """
 
-        if not original_path:
+    @tornado.web.authenticated
+    async def get(self):
+        trash_path = self.get_argument('trash_path', '')
+        if not trash_path:
             self.set_status(400)
-            self.finish(json.dumps({'error': 'Cannot determine original path'}))
+            self.finish(json.dumps({'error': 'No trash_path provided'}))
+            return
+        sub_path = self.get_argument('path', '')
+        max_bytes = self.trash_manager.preview_max_bytes
+        size = None
+        try:
+            trash_dir = await self.volume_trash_dir({'volume': self.get_argument('volume', '')})
+            response_format = self.get_argument('format', 'raw')
+            if response_format == 'summary':
+                cells = self.get_int_argument('cells', 5)
+                if not 0 < cells <= MAX_PREVIEW_CELLS:
+                    raise TrashError(f'cells must be between 1 and {MAX_PREVIEW_CELLS}', 400)
+                result = await self.trash_manager.run(
+                    preview_summary, trash_dir, trash_path, sub_path, max_bytes, cells
+                )
+                self.finish(json.dumps(result))
+                return
+            if response_format != 'raw':
+                raise TrashError('format must be raw or summary', 400)
+
+            path, size = await self.trash_manager.run(open_preview, trash_dir, trash_path, sub_path)
+            requested = parse_range(self.request.headers.get('Range'), size)
+            start, end = requested or (0, size)
+            data = await self.trash_manager.run(read_range, path, start, end, max_bytes)
+        except TrashError as e:
+            if e.status_code == 416:
+                self.set_header('Content-Range', f'bytes */{size}')
+            self.finish_error(e)
             return
 
-        dest = Path(original_path)
+        self.set_header('X-Content-Type-Options', 'nosniff')
+        self.set_header('Accept-Ranges', 'bytes')
+        if requested is not None or len(data) < size:
+            self.set_status(206)
+            self.set_header('Content-Range', f'bytes {start}-{start + len(data) - 1}/{size}')
+        content_type = 'text/plain; charset=utf-8' if sniff_text(data) else 'application/octet-stream'
+        self.finish(data, set_content_type=content_type)
+
 
-        # Check if destination already exists
-        if dest.exists():
-            self.set_status(409)
-            self.finish(json.dumps({'error': f'Destination already exists: {original_path}'}))
+class TrashRestoreHandler(TrashAPIHandler):
+    """Handler for restoring items from trash.
+
+    Items are renamed back into place. When the original location is on
+    another filesystem the copy runs as a background job and the response is
+    ``202`` with the job (see ``/jobs``). An optional ``sub_path`` restores
+    only that path inside a trashed directory (see ``/browse``).
+    """
+
+    @tornado.web.authenticated
+    async def post(self):
+        data = json.loads(self.request.body)
+        trash_path = data.get('trash_path', '')
+
+        if not trash_path:
+            self.set_status(400)
+            self.finish(json.dumps({'error': 'No trash_path provided'}))
             return
 
-        # Ensure parent directory exists
-        dest.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            trash_dir = await self.volume_trash_dir(data)
+        except TrashError as e:
+            self.finish_error(e)
+            return
 
+        sub_path = data.get('sub_path', '')
+        sizes = {} if sub_path else await self.item_sizes(trash_dir)
         try:
-            shutil.move(str(source), str(dest))
-            if info_file.exists():
-                info_file.unlink()
-            self.finish(json.dumps({
-                'success': True,
-                'restored_to': original_path
-            }))
-        except Exception as e:
-            self.set_status(500)
-            self.finish(json.dumps({'error': str(e)}))
+            result = await self.trash_manager.run(
+                restore_item, trash_dir, trash_path, allow_copy=False, sub_path=sub_path
+            )
+        except CrossDeviceError:
+            job = self.trash_manager.start_job(
+                'restore', [trash_dir], restore_item, trash_dir, trash_path, sub_path=sub_path
+            )
+            self.set_status(202)
+            self.finish(json.dumps(job.to_dict()))
+            return
+        except TrashError as e:
+            self.finish_error(e)
+            return
+        finally:
+            self.trash_manager.record_change(trash_dir, trash_path, contents_changed=bool(sub_path))
+        metrics.record_bytes('restore', sizes.get(trash_path, 0))
+        self.finish(json.dumps(result))
 
 
-class TrashDeleteHandler(APIHandler):
-    """Handler for permanently deleting items from trash."""
+class TrashDeleteHandler(TrashAPIHandler):
+    """Handler for permanently deleting items from trash.
+
+    With ``"background": true`` the deletion runs as a job (see ``/jobs``).
+    An optional ``sub_path`` deletes only that path inside a trashed
+    directory (see ``/browse``).
+    """
 
     @tornado.web.authenticated
-    def post(self):
+    async def post(self):
         data = json.loads(self.request.body)
         trash_path = data.get('trash_path', '')
 
@@ -208,94 +375,342 @@ class TrashDeleteHandler(APIHandler):
             self.finish(json.dumps({'error': 'No trash_path provided'}))
             return
 
-        trash_dir = get_trash_dir()
-        files_dir = trash_dir / 'files'
-        info_dir = trash_dir / 'info'
+        try:
+            trash_dir = await self.volume_trash_dir(data)
+        except TrashError as e:
+            self.finish_error(e)
+            return
 
-        target = files_dir / trash_path
-        info_file = info_dir / f"{trash_path}.trashinfo"
+        sub_path = data.get('sub_path', '')
+        if data.get('background') and not sub_path:
+            await self.start_background_delete('delete', trash_dir, delete_items, [trash_path])
+            return
 
-        if not target.exists() and not target.is_symlink():
-            self.set_status(404)
-            self.finish(json.dumps({'error': 'Item not found in trash'}))
+        sizes = {} if sub_path else await self.item_sizes(trash_dir)
+        try:
+            result = await self.trash_manager.run(delete_item, trash_dir, trash_path, sub_path)
+        except TrashError as e:
+            self.finish_error(e)
             return
+        finally:
+            self.trash_manager.record_change(trash_dir, trash_path, contents_changed=bool(sub_path))
+        metrics.record_bytes('delete', sizes.get(trash_path, 0))
+        self.finish(json.dumps(result))
 
+
+class TrashEmptyHandler(TrashAPIHandler):
+    """Handler for emptying the trash of every volume, or of one ``volume``.
+
+    With ``"background": true`` the trash is emptied by a job whose progress
+    and cancellation are available under ``/jobs/<job_id>``.
+    """
+
+    @tornado.web.authenticated
+    async def post(self):
+        data = self.get_json_body()
         try:
-            if target.is_symlink():
-                # Symlinks should be unlinked, never rmtree'd
-                target.unlink()
-            elif target.is_dir():
-                shutil.rmtree(str(target))
+            if data.get('volume'):
+                trash_dirs = [await self.volume_trash_dir(data)]
             else:
-                target.unlink()
+                trash_dirs = [volume.trash_dir for volume in await self.trash_manager.get_volumes()]
+        except TrashError as e:
+            self.finish_error(e)
+            return
+
+        sizes = {trash_dir: await self.item_sizes(trash_dir) for trash_dir in trash_dirs}
+        if data.get('background'):
+            job = self.trash_manager.start_job(
+                'empty', trash_dirs, empty_volumes, trash_dirs, sizes=sizes
+            )
+            self.set_status(202)
+            self.finish(json.dumps(job.to_dict()))
+            return
 
-            if info_file.exists():
-                info_file.unlink()
+        try:
+            result = await self.trash_manager.run(empty_volumes, trash_dirs)
+        finally:
+            for trash_dir in trash_dirs:
+                self.trash_manager.record_change(trash_dir)
+        freed = sum(sum(entries.values()) for entries in sizes.values())
+        if not result['success']:
+            # Only part of the trash went; measure what is left
+            for trash_dir in trash_dirs:
+                freed -= (await self.trash_manager.listing(trash_dir))['total_size']
+        metrics.record_bytes('empty', freed)
+        self.finish(json.dumps(result))
+
+
+class TrashOrphansHandler(TrashAPIHandler):
+    """Handler reporting (GET) and repairing (POST) mismatched ``files/`` and ``info/`` entries.
+
+    Both act on every volume's trash, or only on the given ``volume``. POST
+    takes ``purge_info`` (remove ``.trashinfo`` files without an item,
+    default true) and ``files`` (``keep``, ``regenerate`` or ``purge`` items
+    without a ``.trashinfo``, default ``keep``); with ``"background": true``
+    the repair runs as a job.
+    """
+
+    async def _volumes(self, volume_id):
+        if volume_id:
+            return [await self.trash_manager.get_volume(volume_id)]
+        return await self.trash_manager.get_volumes()
+
+    @tornado.web.authenticated
+    async def get(self):
+        try:
+            volumes = await self._volumes(self.get_argument('volume', ''))
+        except TrashError as e:
+            self.finish_error(e)
+            return
+        reports = await self.trash_manager.find_orphans(volumes)
+        self.finish(json.dumps({'volumes': reports}))
+
+    @tornado.web.authenticated
+    async def post(self):
+        data = self.get_json_body()
+        try:
+            volumes = await self._volumes(data.get('volume'))
+            files = data.get('files', 'keep')
+            if files not in FILES_ACTIONS:
+                raise TrashError(f'files must be one of {", ".join(FILES_ACTIONS)}', 400)
+        except TrashError as e:
+            self.finish_error(e)
+            return
+        trash_dirs = [volume.trash_dir for volume in volumes]
+        options = {'purge_info': bool(data.get('purge_info', True)), 'files': files,
+                   'min_age': self.trash_manager.orphan_min_age}
+
+        if data.get('background'):
+            job = self.trash_manager.start_job('reconcile', trash_dirs, repair_orphans, trash_dirs, **options)
+            self.set_status(202)
+            self.finish(json.dumps(job.to_dict()))
+            return
+
+        try:
+            result = await self.trash_manager.run(repair_orphans, trash_dirs, **options)
+        finally:
+            for trash_dir in trash_dirs:
+                self.trash_manager.record_change(trash_dir)
+        metrics.record_bytes('reconcile', result['bytes_freed'])
+        self.finish(json.dumps(result))
+
+
+class TrashDuplicatesHandler(TrashAPIHandler):
+    """Handler reporting (GET) and purging (POST) identical trashed files.
+
+    GET takes ``min_size`` (ignore smaller files, default 1) and returns
+    the duplicate groups, newest copy first, with the reclaimable bytes.
+    POST deletes every copy but the newest, of all groups or only of those
+    whose ``digest`` is listed in ``digests``. Both accept
+    ``background=true`` to run as a job.
+    """
 
-            self.finish(json.dumps({'success': True}))
-        except Exception as e:
-            self.set_status(500)
-            self.finish(json.dumps({'error': str(e)}))
+    def _min_size(self, value) -> int:
+        try:
+            min_size = int(value)
+        except (TypeError, ValueError):
+            raise TrashError('min_size must be an integer', 400)
+        if min_size < 0:
+            raise TrashError('min_size must not be negative', 400)
+        return min_size
 
+    def _finish_job(self, job):
+        self.set_status(202)
+        self.finish(json.dumps(job.to_dict()))
 
-class TrashEmptyHandler(APIHandler):
-    """Handler for emptying the entire trash."""
+    @tornado.web.authenticated
+    async def get(self):
+        try:
+            min_size = self._min_size(self.get_argument('min_size', '1'))
+        except TrashError as e:
+            self.finish_error(e)
+            return
+        if self.get_argument('background', '') in ('1', 'true'):
+            self._finish_job(await self.trash_manager.start_duplicates_job(False, min_size))
+            return
+        self.finish(json.dumps(await self.trash_manager.find_duplicates(min_size)))
 
     @tornado.web.authenticated
-    def post(self):
-        trash_dir = get_trash_dir()
-        files_dir = trash_dir / 'files'
-        info_dir = trash_dir / 'info'
-
-        deleted_count = 0
-        errors = []
-
-        # Delete all files in trash
-        if files_dir.exists():
-            for entry in list(files_dir.iterdir()):
-                try:
-                    if entry.is_symlink():
-                        entry.unlink()
-                    elif entry.is_dir():
-                        shutil.rmtree(str(entry))
-                    else:
-                        entry.unlink()
-                    deleted_count += 1
-                except Exception as e:
-                    errors.append(f"{entry.name}: {str(e)}")
-
-        # Delete all trashinfo files
-        if info_dir.exists():
-            for entry in list(info_dir.iterdir()):
-                try:
-                    entry.unlink()
-                except Exception:
-                    pass
-
-        if errors:
-            self.finish(json.dumps({
-                'success': False,
-                'deleted_count': deleted_count,
-                'errors': errors
-            }))
+    async def post(self):
+        data = self.get_json_body()
+        try:
+            min_size = self._min_size(data.get('min_size', 1))
+            digests = data.get('digests')
+            if digests is not None and not (
+                    isinstance(digests, list) and all(isinstance(d, str) for d in digests)):
+                raise TrashError('digests must be a list of strings', 400)
+        except TrashError as e:
+            self.finish_error(e)
+            return
+        if data.get('background'):
+            self._finish_job(await self.trash_manager.start_duplicates_job(True, min_size, digests))
+            return
+        self.finish(json.dumps(await self.trash_manager.purge_duplicates(min_size, digests)))
+
+
+class TrashBatchHandler(TrashAPIHandler):
+    """Handler applying restore or delete to many items in one request.
+
+    Expects ``{"trash_paths": [...]}`` (with an optional ``volume``) and returns per-item ``results`` plus
+    ``success_count`` and ``error_count``. Operations with a
+    ``background_operation`` also accept ``"background": true`` and run as a
+    job instead. Restores to another filesystem are copied by a job each;
+    their results carry the ``job`` to follow (see ``/jobs``).
+    """
+
+    def initialize(self, operation, background_operation=None, endpoint: str = ''):
+        super().initialize(endpoint)
+        self.operation = operation
+        self.background_operation = background_operation
+
+    @tornado.web.authenticated
+    async def post(self):
+        data = json.loads(self.request.body)
+        trash_paths = data.get('trash_paths')
+
+        if (not isinstance(trash_paths, list) or not trash_paths
+                or not all(isinstance(path, str) and path for path in trash_paths)):
+            self.set_status(400)
+            self.finish(json.dumps({'error': 'trash_paths must be a non-empty list of names'}))
+            return
+
+        try:
+            trash_dir = await self.volume_trash_dir(data)
+        except TrashError as e:
+            self.finish_error(e)
+            return
+
+        # Each item is processed once even if it is listed twice
+        trash_paths = list(dict.fromkeys(trash_paths))
+        if data.get('background') and self.background_operation is not None:
+            await self.start_background_delete(
+                'delete', trash_dir, self.background_operation, trash_paths
+            )
+            return
+
+        sizes = await self.item_sizes(trash_dir)
+        if self.operation is restore_item:
+            # Restores to another filesystem are copied by jobs, not in this request
+            results = await self.trash_manager.run_batch(
+                functools.partial(restore_item, allow_copy=False), trash_dir, trash_paths,
+                copy_job=restore_item
+            )
         else:
-            self.finish(json.dumps({
-                'success': True,
-                'deleted_count': deleted_count
-            }))
+            results = await self.trash_manager.run_batch(self.operation, trash_dir, trash_paths)
+        success_count = sum(1 for result in results if result['success'])
+        # Jobs record their own bytes when they finish
+        metrics.record_bytes(
+            'restore' if self.operation is restore_item else 'delete',
+            sum(sizes.get(result['trash_path'], 0) for result in results
+                if result['success'] and 'job' not in result)
+        )
+        self.finish(json.dumps({
+            'results': results,
+            'success_count': success_count,
+            'error_count': len(results) - success_count
+        }))
+
+
+class TrashJobsHandler(TrashAPIHandler):
+    """Handler listing background jobs."""
+
+    @tornado.web.authenticated
+    def get(self):
+        self.finish(json.dumps({
+            'jobs': [job.to_dict() for job in self.trash_manager.list_jobs()]
+        }))
+
 
+class TrashJobHandler(TrashAPIHandler):
+    """Handler for polling (GET) or cancelling (DELETE) one background job.
 
-def setup_route_handlers(web_app):
+    Progress is also pushed to ``/events`` subscribers as ``job`` messages.
+    """
+
+    def _get_job(self, job_id: str):
+        job = self.trash_manager.get_job(job_id)
+        if job is None:
+            self.set_status(404)
+            self.finish(json.dumps({'error': 'Job not found'}))
+        return job
+
+    @tornado.web.authenticated
+    def get(self, job_id):
+        job = self._get_job(job_id)
+        if job is not None:
+            self.finish(json.dumps(job.to_dict()))
+
+    @tornado.web.authenticated
+    def delete(self, job_id):
+        job = self._get_job(job_id)
+        if job is not None:
+            job.cancel()
+            self.set_status(202)
+            self.finish(json.dumps(job.to_dict()))
+
+
+class TrashEventsHandler(JupyterHandler, websocket.WebSocketHandler):
+    """WebSocket pushing trash changes to the frontend.
+
+    ``delta`` messages carry ``added`` item records (new or modified
+    entries), ``removed`` entry names and the updated trash totals. ``job``
+    messages carry the progress of background jobs.
+    """
+
+    @property
+    def trash_manager(self) -> TrashManager:
+        return self.settings[MANAGER_SETTINGS_KEY]
+
+    async def get(self, *args, **kwargs):
+        if self.current_user is None:
+            raise tornado.web.HTTPError(403)
+        res = super().get(*args, **kwargs)
+        if res is not None:
+            await res
+
+    async def open(self):
+        # Make sure the trashes are watched even before the first /list request
+        self.trash_manager.get_index(get_trash_dir())
+        self.trash_manager.subscribe(self.send_event)
+        await self.trash_manager.get_volumes()
+
+    def send_event(self, message: dict):
+        try:
+            self.write_message(json.dumps(message))
+        except websocket.WebSocketClosedError:
+            self.trash_manager.unsubscribe(self.send_event)
+
+    def on_close(self):
+        self.trash_manager.unsubscribe(self.send_event)
+
+
+def setup_route_handlers(web_app, manager: TrashManager = None):
     host_pattern = ".*$"
     base_url = web_app.settings["base_url"]
     base_route = url_path_join(base_url, "jupyterlab-trash-mgmt-extension")
 
+    if manager is None:
+        manager = TrashManager()
+    web_app.settings[MANAGER_SETTINGS_KEY] = manager
+
     handlers = [
-        (url_path_join(base_route, "status"), TrashStatusHandler),
-        (url_path_join(base_route, "list"), TrashListHandler),
-        (url_path_join(base_route, "restore"), TrashRestoreHandler),
-        (url_path_join(base_route, "delete"), TrashDeleteHandler),
-        (url_path_join(base_route, "empty"), TrashEmptyHandler),
+        (url_path_join(base_route, "status"), TrashStatusHandler, {'endpoint': 'status'}),
+        (url_path_join(base_route, "list"), TrashListHandler, {'endpoint': 'list'}),
+        (url_path_join(base_route, "analytics"), TrashAnalyticsHandler, {'endpoint': 'analytics'}),
+        (url_path_join(base_route, "browse"), TrashBrowseHandler, {'endpoint': 'browse'}),
+        (url_path_join(base_route, "preview"), TrashPreviewHandler, {'endpoint': 'preview'}),
+        (url_path_join(base_route, "restore"), TrashRestoreHandler, {'endpoint': 'restore'}),
+        (url_path_join(base_route, "delete"), TrashDeleteHandler, {'endpoint': 'delete'}),
+        (url_path_join(base_route, "empty"), TrashEmptyHandler, {'endpoint': 'empty'}),
+        (url_path_join(base_route, "orphans"), TrashOrphansHandler, {'endpoint': 'orphans'}),
+        (url_path_join(base_route, "duplicates"), TrashDuplicatesHandler, {'endpoint': 'duplicates'}),
+        (url_path_join(base_route, "batch", "restore"), TrashBatchHandler,
+         {'operation': restore_item, 'endpoint': 'batch/restore'}),
+        (url_path_join(base_route, "batch", "delete"), TrashBatchHandler,
+         {'operation': delete_item, 'background_operation': delete_items, 'endpoint': 'batch/delete'}),
+        (url_path_join(base_route, "jobs"), TrashJobsHandler, {'endpoint': 'jobs'}),
+        (url_path_join(base_route, "jobs", r"([0-9a-f]+)"), TrashJobHandler, {'endpoint': 'jobs/<id>'}),
+        (url_path_join(base_route, "events"), TrashEventsHandler),
     ]
 
     web_app.add_handlers(host_pattern, handlers)
@@ -0,0 +1,177 @@
+"""Single-pass metadata collection over ``Trash/files`` and ``Trash/info``.
+
+Describing an entry through :class:`pathlib.Path` predicates costs a system
+call per question (``exists``, ``is_symlink``, ``is_dir``, ``stat``), and
+several of them are asked more than once; on NFS each is a round trip.
+Here every entry gets exactly one ``lstat``, from which its type, size and
+fingerprint are all derived. ``info/`` is listed once into a set, so entries
+without a ``.trashinfo`` cost nothing extra, and directory trees are walked
+with ``os.scandir``, whose entries carry their type, so only files are
+stat'ed.
+
+Every scan can count its system calls in a :class:`ScanStats`, which is
+how the savings are measured; the counts also feed :mod:`.metrics`.
+"""
+
+import os
+import stat
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from .metrics import record_scan
+
+TRASHINFO_SUFFIX = '.trashinfo'
+
+
+class ScanStats:
+    """System calls made by one scan."""
+
+    def __init__(self):
+        self.dir_reads = 0
+        self.stat_calls = 0
+        self.entries = 0
+
+    def add(self, other: 'ScanStats') -> None:
+        self.dir_reads += other.dir_reads
+        self.stat_calls += other.stat_calls
+        self.entries += other.entries
+
+    def to_dict(self) -> dict:
+        return {
+            'dir_reads': self.dir_reads,
+            'stat_calls': self.stat_calls,
+            'entries': self.entries
+        }
+
+
+class ScannedEntry(NamedTuple):
+    """One entry of ``Trash/files`` with everything read about it."""
+
+    name: str
+    path: str
+    # lstat of the entry itself
+    st: os.stat_result
+    # stat of its .trashinfo, or None when it has none
+    info_st: Optional[os.stat_result]
+
+    @property
+    def is_symlink(self) -> bool:
+        return stat.S_ISLNK(self.st.st_mode)
+
+    @property
+    def is_dir(self) -> bool:
+        return stat.S_ISDIR(self.st.st_mode)
+
+    @property
+    def validator(self) -> tuple:
+        """Cheap fingerprint of the entry and its ``.trashinfo``."""
+        st, info_st = self.st, self.info_st
+        info = (info_st.st_ino, info_st.st_mtime_ns, info_st.st_size) if info_st is not None else None
+        return (st.st_ino, st.st_mtime_ns, st.st_size, info)
+
+
+def _stat_info(info_dir: Path, name: str, stats: ScanStats) -> Optional[os.stat_result]:
+    stats.stat_calls += 1
+    try:
+        return os.stat(info_dir / f'{name}{TRASHINFO_SUFFIX}')
+    except OSError:
+        return None
+
+
+def scan_entry(files_dir: Path, info_dir: Path, name: str,
+               stats: Optional[ScanStats] = None) -> Optional[ScannedEntry]:
+    """Scan one entry by name; None if it no longer exists."""
+    stats = stats if stats is not None else ScanStats()
+    path = os.path.join(files_dir, name)
+    stats.entries += 1
+    stats.stat_calls += 1
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return None
+    return ScannedEntry(name, path, st, _stat_info(info_dir, name, stats))
+
+
+def scan_trash(trash_dir: Path, names: Optional[Iterable[str]] = None,
+               stats: Optional[ScanStats] = None) -> Iterator[ScannedEntry]:
+    """Yield every entry of ``trash_dir``, or only the given ``names``.
+
+    A full scan reads ``files/`` and ``info/`` once each and makes one
+    ``lstat`` per entry plus one ``stat`` per existing ``.trashinfo``. Named
+    entries are stat'ed directly, which is cheaper than listing a large
+    ``info/`` for a handful of names. Entries that vanish are skipped.
+    """
+    stats = stats if stats is not None else ScanStats()
+    files_dir = Path(trash_dir) / 'files'
+    info_dir = Path(trash_dir) / 'info'
+    if names is not None:
+        for name in names:
+            entry = scan_entry(files_dir, info_dir, name, stats)
+            if entry is not None:
+                yield entry
+        return
+
+    stats.dir_reads += 1
+    try:
+        info_names = set(os.listdir(info_dir))
+    except OSError:
+        info_names = set()
+    stats.dir_reads += 1
+    try:
+        entries = os.scandir(files_dir)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            stats.entries += 1
+            stats.stat_calls += 1
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            info_st = None
+            if f'{entry.name}{TRASHINFO_SUFFIX}' in info_names:
+                info_st = _stat_info(info_dir, entry.name, stats)
+            yield ScannedEntry(entry.name, entry.path, st, info_st)
+
+
+def walk_size(path: Path, stats: Optional[ScanStats] = None) -> int:
+    """Total size of the files under directory ``path``.
+
+    Symlinks to files count with their target's size, as ``Path.is_file``
+    would; symlinked directories are not entered. Each regular file or
+    symlink costs one ``stat``, directories only their ``scandir``.
+    """
+    stats = stats if stats is not None else ScanStats()
+    total = 0
+    pending = [os.fspath(path)]
+    while pending:
+        directory = pending.pop()
+        stats.dir_reads += 1
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                stats.entries += 1
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                        continue
+                    is_link = entry.is_symlink()
+                    if not is_link and not entry.is_file(follow_symlinks=False):
+                        continue
+                    # Follows symlinks; the result is cached on the entry
+                    stats.stat_calls += 1
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    total += st.st_size
+    return total
+
+
+def record_stats(source: str, stats: ScanStats) -> None:
+    """Add a scan's counts to the Prometheus counters of ``source``."""
+    record_scan(source, stats.entries, stats.stat_calls, stats.dir_reads)
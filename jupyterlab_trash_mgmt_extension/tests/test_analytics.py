@@ -0,0 +1,77 @@
+"""Tests for trash space analytics."""
+
+import datetime
+import json
+
+import pytest
+from tornado.httpclient import HTTPClientError
+
+from jupyterlab_trash_mgmt_extension.analytics import analyze_trash, item_extension
+from jupyterlab_trash_mgmt_extension.trash import build_listing
+
+NOW = datetime.datetime(2024, 3, 1, 12, 0, 0)
+
+
+def item(name, size, days_ago=1, directory="/home/user", is_dir=False):
+    date = NOW - datetime.timedelta(days=days_ago)
+    return {
+        "name": name, "size": size, "is_dir": is_dir,
+        "original_path": f"{directory}/{name}",
+        "deletion_date": date.strftime("%Y-%m-%dT%H:%M:%S"),
+        "deletion_timestamp": date.timestamp()
+    }
+
+
+class TestAnalyzeTrash:
+    """Tests for analyze_trash."""
+
+    def test_largest_items(self):
+        """Test only the N largest items are returned, largest first."""
+        listing = build_listing([item(f"f{i}.txt", i) for i in range(100)])
+        result = analyze_trash(listing, top=3, now=NOW)
+        assert [i["size"] for i in result["largest"]] == [99, 98, 97]
+
+    def test_groups(self):
+        """Test sizes are grouped by original directory and extension."""
+        listing = build_listing([
+            item("a.ipynb", 100, directory="/home/user/project"),
+            item("b.ipynb", 50, directory="/home/user/project"),
+            item("data.csv", 500, directory="/home/user/data"),
+            item("checkpoints", 20, directory="/home/user/project", is_dir=True),
+        ])
+        result = analyze_trash(listing, groups=2, now=NOW)
+        assert [(g["directory"], g["count"], g["size"]) for g in result["by_directory"]] == [
+            ("/home/user/data", 1, 500), ("/home/user/project", 3, 170)
+        ]
+        assert [g["extension"] for g in result["by_extension"]] == [".csv", ".ipynb"]
+
+    def test_age_histogram(self):
+        """Test items fall into the age bucket matching their deletion date."""
+        listing = build_listing([
+            item("today", 1, days_ago=0.5), item("week", 2, days_ago=3),
+            item("old", 4, days_ago=400),
+            {**item("undated", 8), "deletion_date": "", "deletion_timestamp": None}
+        ])
+        histogram = {b["label"]: b["size"] for b in analyze_trash(listing, now=NOW)["age_histogram"]}
+        assert histogram["Today"] == 1
+        assert histogram["This week"] == 2
+        assert histogram["Older"] == 4
+        assert histogram["Unknown"] == 8
+
+    def test_item_extension(self):
+        """Test extensions are lower-cased and folders grouped separately."""
+        assert item_extension({"name": "Report.PDF"}) == ".pdf"
+        assert item_extension({"name": "Makefile"}) == "(none)"
+        assert item_extension({"name": "dir.d", "is_dir": True}) == "(folder)"
+
+
+async def test_analytics_handler(jp_fetch, sample_trash_file, sample_trash_directory):
+    """Test the endpoint summarizes the trash and validates its limits."""
+    response = await jp_fetch("jupyterlab-trash-mgmt-extension", "analytics", params={"top": 1})
+    payload = json.loads(response.body)
+    assert [i["name"] for i in payload["largest"]] == ["test_folder"]
+    assert payload["item_count"] == 2
+
+    with pytest.raises(HTTPClientError) as exc_info:
+        await jp_fetch("jupyterlab-trash-mgmt-extension", "analytics", params={"top": 0})
+    assert exc_info.value.code == 400
@@ -0,0 +1,114 @@
+"""Tests for browsing into trashed directories."""
+
+import json
+import os
+
+import pytest
+from tornado.httpclient import HTTPClientError
+
+from jupyterlab_trash_mgmt_extension import browse
+from jupyterlab_trash_mgmt_extension.browse import list_children
+from jupyterlab_trash_mgmt_extension.directorysizes import get_subtree_cache
+from jupyterlab_trash_mgmt_extension.trash import TrashError, delete_item, restore_item
+
+
+@pytest.fixture
+def trashed_project(trash_dir, tmp_path):
+    """A trashed directory with nested content, originally at tmp_path/work/project."""
+    project = trash_dir / "files" / "project"
+    (project / "notebooks" / "old").mkdir(parents=True)
+    (project / "data").mkdir()
+    (project / "notebooks" / "analysis.ipynb").write_text("{}" * 50)
+    (project / "notebooks" / "old" / "draft.ipynb").write_text("x" * 30)
+    (project / "data" / "big.csv").write_text("1" * 1000)
+    (project / "README.md").write_text("readme")
+    (trash_dir / "info" / "project.trashinfo").write_text(
+        f"[Trash Info]\nPath={tmp_path / 'work' / 'project'}\nDeletionDate=2024-01-15T10:30:00\n"
+    )
+    return project
+
+
+class TestListChildren:
+    """Tests for list_children."""
+
+    def test_top_level(self, trash_dir, trashed_project):
+        """Test one level is listed, folders first, with subtree sizes."""
+        result = list_children(trash_dir, "project")
+        assert [(c["name"], c["path"], c["size"]) for c in result["children"]] == [
+            ("data", "data", 1000),
+            ("notebooks", "notebooks", 130),
+            ("README.md", "README.md", 6),
+        ]
+        assert result["total_size"] == 1136
+
+    def test_nested_level(self, trash_dir, trashed_project):
+        """Test paths of nested children are relative to the item."""
+        result = list_children(trash_dir, "project", "notebooks")
+        assert [c["path"] for c in result["children"]] == ["notebooks/old", "notebooks/analysis.ipynb"]
+
+    def test_rejects_escapes(self, trash_dir, trashed_project, tmp_path):
+        """Test parent references and symlinked directories cannot be traversed."""
+        os.symlink(tmp_path, trashed_project / "escape")
+        for sub_path in ("../..", "notebooks/../../project", "escape"):
+            with pytest.raises(TrashError) as exc_info:
+                list_children(trash_dir, "project", sub_path)
+            assert exc_info.value.status_code == 400
+        with pytest.raises(TrashError) as exc_info:
+            list_children(trash_dir, "project", "missing")
+        assert exc_info.value.status_code == 404
+
+    def test_sizes_are_cached(self, trash_dir, trashed_project, monkeypatch):
+        """Test subtree sizes are reused until invalidated."""
+        list_children(trash_dir, "project")
+        monkeypatch.setattr(browse, "tree_size", lambda path: pytest.fail("size recomputed"))
+        list_children(trash_dir, "project")
+        get_subtree_cache().invalidate(str(trashed_project / "data" / "big.csv"))
+        monkeypatch.setattr(browse, "tree_size", lambda path: 0)
+        sizes = {c["name"]: c["size"] for c in list_children(trash_dir, "project")["children"]}
+        assert sizes["data"] == 0
+        assert sizes["notebooks"] == 130
+
+
+class TestSubPathOperations:
+    """Tests for restoring and deleting inside a trashed directory."""
+
+    def test_restore_sub_path(self, trash_dir, trashed_project, tmp_path):
+        """Test one nested file is restored under the item's original path."""
+        result = restore_item(trash_dir, "project", sub_path="notebooks/analysis.ipynb")
+        restored = tmp_path / "work" / "project" / "notebooks" / "analysis.ipynb"
+        assert result["restored_to"] == str(restored)
+        assert restored.read_text() == "{}" * 50
+        assert not (trashed_project / "notebooks" / "analysis.ipynb").exists()
+        assert (trash_dir / "info" / "project.trashinfo").exists()
+
+    def test_delete_sub_path(self, trash_dir, trashed_project):
+        """Test deleting a nested directory keeps the rest of the item."""
+        delete_item(trash_dir, "project", sub_path="data")
+        assert not (trashed_project / "data").exists()
+        assert (trashed_project / "README.md").exists()
+        assert (trash_dir / "info" / "project.trashinfo").exists()
+
+
+async def test_browse_and_restore_handlers(jp_fetch, trash_dir, trashed_project, tmp_path):
+    """Test browsing, then restoring a sub-path updates the item's listed size."""
+    response = await jp_fetch(
+        "jupyterlab-trash-mgmt-extension", "browse", params={"trash_path": "project", "path": "data"}
+    )
+    assert [c["name"] for c in json.loads(response.body)["children"]] == ["big.csv"]
+
+    response = await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+    assert json.loads(response.body)["items"][0]["size"] == 1136
+
+    await jp_fetch(
+        "jupyterlab-trash-mgmt-extension", "restore", method="POST",
+        body=json.dumps({"trash_path": "project", "sub_path": "data/big.csv"})
+    )
+    assert (tmp_path / "work" / "project" / "data" / "big.csv").exists()
+    response = await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+    assert json.loads(response.body)["items"][0]["size"] == 136
+
+    with pytest.raises(HTTPClientError) as exc_info:
+        await jp_fetch(
+            "jupyterlab-trash-mgmt-extension", "browse", params={"trash_path": "project", "path": "README.md"}
+        )
+    assert exc_info.value.code == 400
@@ -0,0 +1,73 @@
+"""Tests for the parallel deletion engine."""
+
+import os
+
+import pytest
+
+from jupyterlab_trash_mgmt_extension import deletion
+from jupyterlab_trash_mgmt_extension.deletion import TreeRemover
+
+
+def make_tree(root, width=3, depth=3):
+    """Create ``width`` files and subdirectories per level, ``depth`` levels deep."""
+    root.mkdir()
+    for i in range(width):
+        (root / f"file{i}.txt").write_text("x" * i)
+    if depth > 1:
+        for i in range(width):
+            make_tree(root / f"dir{i}", width, depth - 1)
+
+
+@pytest.fixture(params=[1, 4], ids=["serial", "parallel"])
+def remover(request):
+    remover = TreeRemover(max_workers=request.param)
+    yield remover
+    remover.shutdown()
+
+
+class TestTreeRemover:
+    """Tests for TreeRemover."""
+
+    def test_removes_nested_tree(self, tmp_path, remover):
+        """Test every level of a nested tree is removed."""
+        make_tree(tmp_path / "tree")
+        remover.remove(tmp_path / "tree")
+        assert not (tmp_path / "tree").exists()
+
+    def test_removes_single_file(self, tmp_path, remover):
+        """Test a plain file is unlinked."""
+        target = tmp_path / "file.txt"
+        target.write_text("data")
+        remover.remove(target)
+        assert not target.exists()
+
+    def test_symlinks_are_not_followed(self, tmp_path, remover):
+        """Test links inside the tree, and the tree itself as a link, are unlinked only."""
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "keep.txt").write_text("keep")
+
+        tree = tmp_path / "tree"
+        make_tree(tree, width=2, depth=2)
+        os.symlink(outside, tree / "dir0" / "link")
+        os.symlink(outside / "keep.txt", tree / "file-link")
+        remover.remove(tree)
+        assert not tree.exists()
+
+        link = tmp_path / "top-link"
+        os.symlink(outside, link)
+        remover.remove(link)
+        assert not link.is_symlink()
+        assert (outside / "keep.txt").read_text() == "keep"
+
+    def test_missing_path(self, tmp_path, remover):
+        """Test removing a missing path raises like os.unlink."""
+        with pytest.raises(FileNotFoundError):
+            remover.remove(tmp_path / "missing")
+
+    def test_fallback_without_fd_functions(self, tmp_path, monkeypatch):
+        """Test platforms without dirfd support fall back to shutil.rmtree."""
+        monkeypatch.setattr(deletion, "HAVE_FD_FUNCTIONS", False)
+        make_tree(tmp_path / "tree", width=2, depth=2)
+        TreeRemover().remove(tmp_path / "tree")
+        assert not (tmp_path / "tree").exists()
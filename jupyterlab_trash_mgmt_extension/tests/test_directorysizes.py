@@ -0,0 +1,75 @@
+"""Tests for the directorysizes cache."""
+
+import json
+import os
+
+from jupyterlab_trash_mgmt_extension.directorysizes import DirectorySizesCache
+from jupyterlab_trash_mgmt_extension.routes import get_cached_item_size
+
+
+class TestDirectorySizesCache:
+    """Tests for reading and writing the directorysizes file."""
+
+    def test_roundtrip(self, trash_dir):
+        """Test entries survive a save and reload, including encoded names."""
+        cache = DirectorySizesCache(trash_dir)
+        cache.set("my folder%", 1700000000, 4096)
+        cache.save()
+
+        content = (trash_dir / "directorysizes").read_text()
+        assert content == "4096 1700000000 my%20folder%25\n"
+
+        reloaded = DirectorySizesCache(trash_dir)
+        reloaded.load()
+        assert reloaded.get("my folder%", 1700000000) == 4096
+
+    def test_stale_mtime_is_a_miss(self, trash_dir):
+        """Test entries are ignored when the trashinfo mtime changed."""
+        cache = DirectorySizesCache(trash_dir)
+        cache.set("folder", 1700000000, 10)
+        assert cache.get("folder", 1700000001) is None
+
+    def test_malformed_lines_are_skipped(self, trash_dir):
+        """Test malformed lines written by other tools do not break loading."""
+        (trash_dir / "directorysizes").write_text("garbage\n12 34 ok\nx y z\n")
+        cache = DirectorySizesCache(trash_dir)
+        cache.load()
+        assert cache.get("ok", 34) == 12
+
+    def test_prune_removes_missing_entries(self, trash_dir):
+        """Test prune drops directories that left the trash."""
+        cache = DirectorySizesCache(trash_dir)
+        cache.set("kept", 1, 1)
+        cache.set("gone", 1, 2)
+        cache.prune(["kept"])
+        cache.save()
+        assert (trash_dir / "directorysizes").read_text() == "1 1 kept\n"
+
+    def test_cached_item_size_computes_once(self, sample_trash_directory, trash_dir):
+        """Test a directory is only measured once while its trashinfo is unchanged."""
+        cache = DirectorySizesCache(trash_dir)
+        dir_path = sample_trash_directory["dir_path"]
+        info_path = sample_trash_directory["info_path"]
+
+        assert get_cached_item_size(dir_path, info_path, cache) == 28
+
+        # New content is not picked up, the cached size is served instead
+        (dir_path / "file3.txt").write_text("more")
+        assert get_cached_item_size(dir_path, info_path, cache) == 28
+
+        # Touching the trashinfo invalidates the entry
+        stat = info_path.stat()
+        os.utime(info_path, (stat.st_atime, stat.st_mtime + 10))
+        assert get_cached_item_size(dir_path, info_path, cache) == 32
+
+
+async def test_list_writes_directorysizes(jp_fetch, sample_trash_directory, trash_dir):
+    """Test listing the trash persists directory sizes."""
+    response = await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+    payload = json.loads(response.body)
+    assert payload["item_count"] == 1
+    assert payload["items"][0]["size"] == 28
+
+    lines = (trash_dir / "directorysizes").read_text().splitlines()
+    assert len(lines) == 1
+    assert lines[0].startswith("28 ") and lines[0].endswith(" test_folder")
@@ -0,0 +1,110 @@
+"""Tests for duplicate detection in the trash."""
+
+import json
+
+import pytest
+
+from jupyterlab_trash_mgmt_extension import duplicates
+from jupyterlab_trash_mgmt_extension.duplicates import (
+    PARTIAL_HASH_BYTES,
+    HashCache,
+    find_duplicates,
+    purge_duplicates,
+)
+from jupyterlab_trash_mgmt_extension.index import TrashIndex
+from jupyterlab_trash_mgmt_extension.volumes import HOME_VOLUME
+
+
+def add_trash_item(trash_dir, name, content, date):
+    (trash_dir / "files" / name).write_bytes(content)
+    (trash_dir / "info" / f"{name}.trashinfo").write_text(
+        f"[Trash Info]\nPath=/home/user/{name}\nDeletionDate={date}\n"
+    )
+
+
+def home_listing(trash_dir):
+    listing = TrashIndex(trash_dir).listing()
+    return {**listing, "volumes": [{"id": HOME_VOLUME, "trash_dir": str(trash_dir)}]}
+
+
+@pytest.fixture
+def checkpoints(trash_dir, monkeypatch):
+    """Three copies of a large checkpoint, a same-size file differing at the end, and a small pair."""
+    monkeypatch.setattr(duplicates, "_cache", HashCache())
+    big = b"w" * (PARTIAL_HASH_BYTES * 2)
+    add_trash_item(trash_dir, "model.ckpt", big, "2024-01-10T00:00:00")
+    add_trash_item(trash_dir, "model.ckpt.1", big, "2024-01-12T00:00:00")
+    add_trash_item(trash_dir, "model.ckpt.2", big, "2024-01-11T00:00:00")
+    add_trash_item(trash_dir, "other.ckpt", big[:-1] + b"x", "2024-01-13T00:00:00")
+    add_trash_item(trash_dir, "notes.txt", b"hello", "2024-01-10T00:00:00")
+    add_trash_item(trash_dir, "notes (copy).txt", b"hello", "2024-01-14T00:00:00")
+    add_trash_item(trash_dir, "other.txt", b"world", "2024-01-10T00:00:00")
+    return big
+
+
+class TestFindDuplicates:
+    """Tests for find_duplicates."""
+
+    def test_groups(self, trash_dir, checkpoints):
+        """Test identical files are grouped newest first, with reclaimable bytes."""
+        report = find_duplicates(home_listing(trash_dir))
+        groups = [[item["name"] for item in group["items"]] for group in report["groups"]]
+        assert groups == [
+            ["model.ckpt.1", "model.ckpt.2", "model.ckpt"],
+            ["notes (copy).txt", "notes.txt"],
+        ]
+        assert report["reclaimable_bytes"] == 2 * len(checkpoints) + 5
+        assert report["duplicate_count"] == 3
+        # Only the large files whose first bytes collide are hashed whole
+        assert report["scanned"] == {"candidates": 7, "full_hashes": 4}
+
+    def test_hashes_are_cached(self, trash_dir, checkpoints, monkeypatch):
+        """Test unchanged files are not read again."""
+        listing = home_listing(trash_dir)
+        find_duplicates(listing)
+        monkeypatch.setattr(duplicates, "_digest", lambda *args: pytest.fail("file re-hashed"))
+        assert find_duplicates(listing)["group_count"] == 2
+
+    def test_min_size(self, trash_dir, checkpoints):
+        """Test files below min_size are ignored."""
+        report = find_duplicates(home_listing(trash_dir), min_size=100)
+        assert report["group_count"] == 1
+
+
+class TestPurgeDuplicates:
+    """Tests for purge_duplicates."""
+
+    def test_keeps_newest(self, trash_dir, checkpoints):
+        """Test every copy but the newest is deleted with its .trashinfo."""
+        result = purge_duplicates(home_listing(trash_dir))
+        assert result["deleted_count"] == 3
+        assert result["bytes_freed"] == 2 * len(checkpoints) + 5
+        assert sorted(result["kept"]) == ["model.ckpt.1", "notes (copy).txt"]
+        assert sorted(p.name for p in (trash_dir / "files").iterdir()) == [
+            "model.ckpt.1", "notes (copy).txt", "other.ckpt", "other.txt"
+        ]
+        assert not (trash_dir / "info" / "model.ckpt.trashinfo").exists()
+
+    def test_selected_groups(self, trash_dir, checkpoints):
+        """Test digests restrict the purge to those groups."""
+        listing = home_listing(trash_dir)
+        small = find_duplicates(listing)["groups"][1]
+        result = purge_duplicates(listing, digests=[small["digest"]])
+        assert result["deleted_count"] == 1
+        assert not (trash_dir / "files" / "notes.txt").exists()
+        assert (trash_dir / "files" / "model.ckpt").exists()
+
+
+async def test_duplicates_handler(jp_fetch, trash_dir, checkpoints):
+    """Test reporting and purging duplicates over HTTP."""
+    response = await jp_fetch("jupyterlab-trash-mgmt-extension", "duplicates")
+    report = json.loads(response.body)
+    assert report["group_count"] == 2
+
+    response = await jp_fetch(
+        "jupyterlab-trash-mgmt-extension", "duplicates", method="POST", body=json.dumps({})
+    )
+    assert json.loads(response.body)["deleted_count"] == 3
+
+    response = await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+    assert json.loads(response.body)["item_count"] == 4
@@ -0,0 +1,188 @@
+"""Tests for the in-memory trash index and its watchers."""
+
+import asyncio
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from jupyterlab_trash_mgmt_extension import index as index_module
+from jupyterlab_trash_mgmt_extension import watcher as watcher_module
+from jupyterlab_trash_mgmt_extension.index import TrashIndex
+from jupyterlab_trash_mgmt_extension.watcher import InotifyWatcher, PollingWatcher
+
+
+def add_trash_item(trash_dir, name, content="data", original="/home/user"):
+    (trash_dir / "files" / name).write_text(content)
+    (trash_dir / "info" / f"{name}.trashinfo").write_text(
+        f"[Trash Info]\nPath={original}/{name}\nDeletionDate=2024-01-15T10:30:00\n"
+    )
+
+
+class TestTrashIndex:
+    """Tests for incremental index refreshes."""
+
+    def test_initial_build(self, trash_dir, sample_trash_file, sample_trash_directory):
+        """Test the first refresh lists every entry."""
+        index = TrashIndex(trash_dir)
+        listing = index.listing()
+        assert listing["item_count"] == 2
+        assert listing["total_size"] == 27 + 28
+
+    def test_only_dirty_entries_are_reparsed(self, trash_dir, monkeypatch):
+        """Test marking one name dirty re-describes only that entry."""
+        for i in range(3):
+            add_trash_item(trash_dir, f"file{i}.txt")
+        index = TrashIndex(trash_dir)
+        index.refresh()
+
+        described = []
+        original = index_module.describe_item
+        monkeypatch.setattr(
+            index_module, "describe_item",
+            lambda entry, *args: described.append(entry.name) or original(entry, *args)
+        )
+
+        (trash_dir / "files" / "file1.txt").write_text("changed content")
+        add_trash_item(trash_dir, "file3.txt")
+        index.mark_dirty("file1.txt")
+        index.mark_dirty("file3.txt")
+        changed, removed = index.refresh()
+
+        assert sorted(described) == ["file1.txt", "file3.txt"]
+        assert sorted(item["name"] for item in changed) == ["file1.txt", "file3.txt"]
+        assert removed == []
+        assert index.listing()["item_count"] == 4
+
+    def test_rescan_detects_removals(self, trash_dir):
+        """Test a full rescan drops entries deleted behind the index's back."""
+        add_trash_item(trash_dir, "a.txt")
+        add_trash_item(trash_dir, "b.txt")
+        index = TrashIndex(trash_dir)
+        index.refresh()
+
+        (trash_dir / "files" / "a.txt").unlink()
+        index.mark_dirty()
+        changed, removed = index.refresh()
+        assert changed == []
+        assert removed == ["a.txt"]
+        assert [item["name"] for item in index.listing()["items"]] == ["b.txt"]
+
+    def test_clean_index_is_not_rescanned(self, trash_dir):
+        """Test a clean index serves its snapshot without touching the disk."""
+        add_trash_item(trash_dir, "a.txt")
+        index = TrashIndex(trash_dir)
+        first = index.listing()
+        add_trash_item(trash_dir, "b.txt")
+        assert index.listing() is first
+
+    def test_listing_can_check_signature(self, trash_dir):
+        """Test check_signature catches changes no watcher reported."""
+        add_trash_item(trash_dir, "a.txt")
+        index = TrashIndex(trash_dir)
+        index.listing()
+        add_trash_item(trash_dir, "b.txt")
+        assert index.listing(check_signature=True)["item_count"] == 2
+
+
+class TestWatchers:
+    """Tests for change notification."""
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+    async def test_inotify_reports_entry_names(self, trash_dir):
+        """Test inotify events map files/ and info/ changes to entry names."""
+        changes = []
+        watcher = InotifyWatcher(trash_dir, changes.append)
+        watcher.start()
+        try:
+            add_trash_item(trash_dir, "new.txt")
+            for _ in range(50):
+                await asyncio.sleep(0.01)
+                if changes:
+                    break
+        finally:
+            watcher.stop()
+        assert set(changes) == {"new.txt"}
+
+    def test_inotify_requires_directories(self, tmp_path):
+        """Test inotify setup fails cleanly when the trash does not exist."""
+        watcher = InotifyWatcher(tmp_path / "missing", lambda name: None)
+        with pytest.raises(OSError):
+            watcher.start()
+        assert not watcher.active
+
+    async def test_polling_detects_directory_changes(self, trash_dir):
+        """Test polling reports a full rescan when a directory mtime changes."""
+        changes = []
+        watcher = PollingWatcher(trash_dir, changes.append)
+        await watcher._poll()
+        assert changes == []
+        add_trash_item(trash_dir, "new.txt")
+        await watcher._poll()
+        assert changes == [None]
+
+    async def test_polling_stats_off_the_loop(self, trash_dir, monkeypatch):
+        """Test the polling watcher reads directory signatures on the executor."""
+        threads = []
+
+        def read_signature(path):
+            threads.append(threading.current_thread())
+            return original(path)
+
+        executor = ThreadPoolExecutor(1)
+        watcher = PollingWatcher(trash_dir, lambda name: None, executor=executor)
+        original = watcher_module.read_dir_signature
+        monkeypatch.setattr(watcher_module, "read_dir_signature", read_signature)
+        try:
+            await watcher._poll()
+        finally:
+            executor.shutdown()
+        assert threads and threading.current_thread() not in threads
+
+
+async def test_list_reflects_changes(jp_fetch, trash_dir):
+    """Test /list picks up items trashed after the index was built."""
+    add_trash_item(trash_dir, "first.txt")
+    response = await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+    assert json.loads(response.body)["item_count"] == 1
+
+    add_trash_item(trash_dir, "second.txt")
+    await asyncio.sleep(0.05)
+    response = await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+    assert json.loads(response.body)["item_count"] == 2
+
+
+async def test_list_checks_signature_off_the_ioloop(jp_fetch, jp_serverapp, trash_dir, monkeypatch):
+    """Test /list confirms an up-to-date index on a worker thread."""
+    jp_serverapp.web_app.settings["trash_mgmt_manager"].list_cache_ttl = 0
+    await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+    threads = []
+    original = index_module.read_dir_signature
+    monkeypatch.setattr(
+        index_module, "read_dir_signature",
+        lambda path: threads.append(threading.current_thread()) or original(path)
+    )
+    await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+    assert threads
+    assert threading.main_thread() not in threads
+
+
+async def test_events_push_deltas(trash_dir, jp_ws_fetch):
+    """Test connected clients receive added and removed entries."""
+    ws = await jp_ws_fetch("jupyterlab-trash-mgmt-extension", "events")
+    try:
+        add_trash_item(trash_dir, "pushed.txt")
+        message = json.loads(await asyncio.wait_for(ws.read_message(), 5))
+        assert message["type"] == "delta"
+        assert [item["name"] for item in message["added"]] == ["pushed.txt"]
+        assert message["item_count"] == 1
+
+        (trash_dir / "files" / "pushed.txt").unlink()
+        (trash_dir / "info" / "pushed.txt.trashinfo").unlink()
+        message = json.loads(await asyncio.wait_for(ws.read_message(), 5))
+        assert message["removed"] == ["pushed.txt"]
+        assert message["item_count"] == 0
+    finally:
+        ws.close()
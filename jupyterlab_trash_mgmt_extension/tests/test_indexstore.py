@@ -0,0 +1,107 @@
+"""Tests for the SQLite copy of the trash index."""
+
+import json
+
+import pytest
+
+from jupyterlab_trash_mgmt_extension import index as index_module
+from jupyterlab_trash_mgmt_extension.index import TrashIndex
+from jupyterlab_trash_mgmt_extension.indexstore import INDEX_STORE_FILENAME, IndexStore
+
+
+def add_trash_item(trash_dir, name, content="data"):
+    (trash_dir / "files" / name).write_text(content)
+    (trash_dir / "info" / f"{name}.trashinfo").write_text(
+        f"[Trash Info]\nPath=/home/user/{name}\nDeletionDate=2024-01-15T10:30:00\n"
+    )
+
+
+def build_index(trash_dir):
+    index = TrashIndex(trash_dir, IndexStore(trash_dir))
+    index.refresh()
+    index.stop()
+
+
+class TestIndexStore:
+    """Tests for restarting the index from its store."""
+
+    def test_restart_reuses_records(self, trash_dir, sample_trash_file, sample_trash_directory, monkeypatch):
+        """Test unchanged entries are not described again after a restart."""
+        build_index(trash_dir)
+        assert (trash_dir / INDEX_STORE_FILENAME).exists()
+
+        monkeypatch.setattr(index_module, "describe_item", lambda *args: pytest.fail("entry re-described"))
+        index = TrashIndex(trash_dir, IndexStore(trash_dir))
+        listing = index.listing()
+        index.stop()
+        assert listing["item_count"] == 2
+        assert listing["total_size"] == 27 + 28
+        by_name = {item["name"]: item for item in listing["items"]}
+        assert by_name["test_folder"]["is_dir"]
+        assert by_name["test_file.txt"]["original_path"] == "/home/user/original/test_file.txt"
+        assert by_name["test_file.txt"]["deletion_timestamp"] is not None
+        assert by_name["test_file.txt"]["id"] == "test_file.txt"
+
+    def test_restart_revalidates_changes(self, trash_dir, monkeypatch):
+        """Test entries changed or removed while stopped are picked up."""
+        for name in ("a.txt", "b.txt", "c.txt"):
+            add_trash_item(trash_dir, name)
+        build_index(trash_dir)
+
+        (trash_dir / "files" / "b.txt").unlink()
+        (trash_dir / "info" / "b.txt.trashinfo").unlink()
+        (trash_dir / "files" / "c.txt").write_text("longer content")
+        add_trash_item(trash_dir, "d.txt")
+
+        described = []
+        original = index_module.describe_item
+        monkeypatch.setattr(
+            index_module, "describe_item",
+            lambda entry, *args: described.append(entry.name) or original(entry, *args)
+        )
+        index = TrashIndex(trash_dir, IndexStore(trash_dir))
+        listing = index.listing()
+        index.stop()
+        assert sorted(described) == ["c.txt", "d.txt"]
+        assert sorted(item["name"] for item in listing["items"]) == ["a.txt", "c.txt", "d.txt"]
+
+        # The removal was written back too
+        items, validators = IndexStore(trash_dir).load()
+        assert sorted(items) == sorted(validators) == ["a.txt", "c.txt", "d.txt"]
+        assert items["c.txt"]["size"] == len("longer content")
+
+    def test_corrupt_store_is_rebuilt(self, trash_dir, sample_trash_file):
+        """Test an unreadable database is discarded instead of failing."""
+        (trash_dir / INDEX_STORE_FILENAME).write_bytes(b"not a database" * 100)
+        index = TrashIndex(trash_dir, IndexStore(trash_dir))
+        assert index.listing()["item_count"] == 1
+        index.stop()
+        assert list(IndexStore(trash_dir).load()[0]) == ["test_file.txt"]
+
+    def test_store_corrupted_in_use_is_rebuilt(self, trash_dir, sample_trash_file):
+        """Test a database that goes bad while open is replaced and fully rewritten."""
+        store = IndexStore(trash_dir)
+        index = TrashIndex(trash_dir, store)
+        index.refresh()
+        assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+
+        (trash_dir / INDEX_STORE_FILENAME).write_bytes(b"not a database" * 1000)
+        add_trash_item(trash_dir, "new.txt")
+        index.mark_dirty("new.txt")
+        index.refresh()
+        index.stop()
+        assert sorted(IndexStore(trash_dir).load()[0]) == ["new.txt", "test_file.txt"]
+
+
+@pytest.fixture
+def jp_server_config(jp_server_config):
+    config = dict(jp_server_config)
+    config["TrashManager"] = {"persistent_index": True}
+    return config
+
+
+async def test_list_with_persistent_index(jp_fetch, trash_dir, sample_trash_file):
+    """Test the server writes the store when the option is enabled."""
+    response = await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+    assert json.loads(response.body)["item_count"] == 1
+    assert (trash_dir / INDEX_STORE_FILENAME).exists()
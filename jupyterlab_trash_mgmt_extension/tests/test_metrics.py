@@ -0,0 +1,118 @@
+"""Tests for the Prometheus metrics."""
+
+import asyncio
+import json
+
+from prometheus_client import REGISTRY
+from tornado.concurrent import Future
+from tornado.iostream import StreamClosedError
+
+from jupyterlab_trash_mgmt_extension import routes
+from jupyterlab_trash_mgmt_extension import trash as trash_module
+from jupyterlab_trash_mgmt_extension.trash import delete_items
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+async def test_closed_ndjson_listing_recorded(jp_fetch, jp_serverapp, monkeypatch, sample_trash_file):
+    """Test an NDJSON listing the client abandons is still finished and recorded."""
+    real_flush = routes.TrashListHandler.flush
+
+    def flush(self, include_footers=False):
+        if include_footers:
+            return real_flush(self, include_footers)
+        future = Future()
+        future.set_exception(StreamClosedError())
+        return future
+
+    monkeypatch.setattr(routes.TrashListHandler, "flush", flush)
+    debug = []
+    monkeypatch.setattr(jp_serverapp.log, "debug", lambda message, *args: debug.append(message))
+    labels = {"endpoint": "list", "method": "GET", "status_code": "200"}
+    before = sample("jupyter_trash_request_duration_seconds_count", **labels)
+    response = await jp_fetch("jupyterlab-trash-mgmt-extension", "list", params={"format": "ndjson"})
+    assert "summary" not in response.body.decode()
+    assert sample("jupyter_trash_request_duration_seconds_count", **labels) == before + 1
+    assert any("closed the NDJSON listing" in message for message in debug)
+
+
+async def test_handler_metrics(jp_fetch, sample_trash_file, sample_trash_directory):
+    """Test latency, trash totals and deleted bytes are recorded and scraped."""
+    requests_before = sample(
+        "jupyter_trash_request_duration_seconds_count", endpoint="list", method="GET", status_code="200"
+    )
+    deleted_before = sample("jupyter_trash_deleted_bytes_total", operation="delete")
+
+    await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+    assert sample(
+        "jupyter_trash_request_duration_seconds_count", endpoint="list", method="GET", status_code="200"
+    ) == requests_before + 1
+    assert sample("jupyter_trash_items", volume="home") == 2
+    assert sample("jupyter_trash_size_bytes", volume="home") == 27 + 28
+
+    await jp_fetch(
+        "jupyterlab-trash-mgmt-extension", "delete", method="POST",
+        body=json.dumps({"trash_path": "test_folder"})
+    )
+    assert sample("jupyter_trash_deleted_bytes_total", operation="delete") == deleted_before + 28
+
+    response = await jp_fetch("metrics")
+    body = response.body.decode()
+    assert 'jupyter_trash_request_duration_seconds_count{endpoint="delete"' in body
+    assert "jupyter_trash_cache_lookups_total" in body
+
+
+async def test_list_requests_share_one_scan(jp_fetch, jp_serverapp, trash_dir, sample_trash_file):
+    """Test concurrent and repeated /list requests reuse one listing until the trash changes."""
+    manager = jp_serverapp.web_app.settings["trash_mgmt_manager"]
+    manager.list_cache_ttl = 60.0
+
+    def counts():
+        return {result: sample("jupyter_trash_list_requests_total", result=result)
+                for result in ("computed", "coalesced", "cached")}
+
+    before = counts()
+    responses = await asyncio.gather(
+        *(jp_fetch("jupyterlab-trash-mgmt-extension", "list") for _ in range(5))
+    )
+    assert len({response.headers["ETag"] for response in responses}) == 1
+    after = counts()
+    assert after["computed"] == before["computed"] + 1
+    assert after["coalesced"] + after["cached"] == before["coalesced"] + before["cached"] + 4
+
+    manager.record_change(trash_dir, "test_file.txt")
+    await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+    assert counts()["computed"] == after["computed"] + 1
+
+    manager.list_cache_ttl = 0
+    await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+    await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+    assert counts()["computed"] == after["computed"] + 3
+
+
+async def test_job_bytes_exclude_failed_deletions(jp_serverapp, trash_dir, sample_trash_file,
+                                                  sample_trash_directory, monkeypatch):
+    """Test bytes of items that could not be deleted are not counted as freed."""
+    manager = jp_serverapp.web_app.settings["trash_mgmt_manager"]
+    real_remove = trash_module.remove_entry
+
+    def remove_entry(path, parallel=True):
+        if path.name == "test_folder":
+            raise PermissionError(13, "Permission denied", str(path))
+        real_remove(path, parallel)
+
+    monkeypatch.setattr(trash_module, "remove_entry", remove_entry)
+    before = sample("jupyter_trash_deleted_bytes_total", operation="purge")
+    job = manager.start_job(
+        "purge", [trash_dir], delete_items, trash_dir, ["test_file.txt", "test_folder"],
+        sizes={"test_file.txt": 27, "test_folder": 28}
+    )
+    for _ in range(100):
+        if job.done:
+            break
+        await asyncio.sleep(0.01)
+    assert job.result["error_count"] == 1
+    assert job.bytes_done == 27
+    assert sample("jupyter_trash_deleted_bytes_total", operation="purge") == before + 27
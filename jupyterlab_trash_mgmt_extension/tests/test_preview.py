@@ -0,0 +1,131 @@
+"""Tests for previews of trashed files."""
+
+import json
+
+import pytest
+from tornado.httpclient import HTTPClientError
+
+from jupyterlab_trash_mgmt_extension import preview
+from jupyterlab_trash_mgmt_extension.preview import parse_range, preview_summary, sniff_text, summarize_notebook
+from jupyterlab_trash_mgmt_extension.trash import TrashError
+
+
+def notebook(cell_count, source_size=10):
+    return {
+        "cells": [
+            {"cell_type": "code", "execution_count": i, "metadata": {},
+             "outputs": [{"output_type": "stream", "name": "stdout", "text": "é" * source_size}],
+             "source": [f"print({i})\n", "x" * source_size]}
+            for i in range(cell_count)
+        ],
+        "metadata": {},
+        "nbformat": 4,
+        "nbformat_minor": 5
+    }
+
+
+def test_parse_range():
+    """Test single byte ranges are clamped to the file, and others refused or ignored."""
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=10-19", 100) == (10, 20)
+    assert parse_range("bytes=90-", 100) == (90, 100)
+    assert parse_range("bytes=-5", 100) == (95, 100)
+    assert parse_range("bytes=50-500", 100) == (50, 100)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    with pytest.raises(TrashError) as exc_info:
+        parse_range("bytes=100-", 100)
+    assert exc_info.value.status_code == 416
+
+
+def test_sniff_text():
+    """Test NUL bytes and invalid UTF-8 mark binary, but a cut-off character does not."""
+    assert sniff_text("héllo".encode())
+    assert sniff_text("héllo".encode()[:2])
+    assert not sniff_text(b"\x89PNG\r\n\x1a\n\0\0")
+    assert not sniff_text(b"\xff\xfe text")
+
+
+class TestSummarizeNotebook:
+    """Tests for summarize_notebook."""
+
+    def test_reads_only_the_first_cells(self, tmp_path, monkeypatch):
+        """Test cells are decoded across chunks and reading stops after max_cells."""
+        monkeypatch.setattr(preview, "READ_CHUNK_SIZE", 256)
+        path = tmp_path / "big.ipynb"
+        path.write_text(json.dumps(notebook(200, source_size=100), indent=1, sort_keys=True))
+
+        summary = summarize_notebook(path, max_cells=3)
+        assert [cell["execution_count"] for cell in summary["cells"]] == [0, 1, 2]
+        assert summary["cells"][1]["source"] == "print(1)\n" + "x" * 100
+        assert summary["cells"][1]["output_count"] == 1
+        assert summary["more_cells"]
+        assert summary["bytes_read"] < path.stat().st_size / 10
+
+    def test_short_notebook(self, tmp_path):
+        """Test a notebook with fewer cells than asked for is complete."""
+        path = tmp_path / "small.ipynb"
+        path.write_text(json.dumps(notebook(2), sort_keys=True))
+        summary = summarize_notebook(path, max_cells=5)
+        assert len(summary["cells"]) == 2
+        assert not summary["more_cells"]
+
+    def test_not_a_notebook(self, tmp_path):
+        """Test files not starting with a cells array fall back to a text preview."""
+        path = tmp_path / "odd.ipynb"
+        path.write_text('{"metadata": {}, "cells": []}')
+        assert summarize_notebook(path) is None
+
+
+def test_preview_summary_text_and_binary(trash_dir):
+    """Test text previews are capped and binary files are only identified."""
+    (trash_dir / "files" / "log.txt").write_text("line\n" * 100)
+    (trash_dir / "files" / "blob.bin").write_bytes(b"\0\1\2" * 10)
+    summary = preview_summary(trash_dir, "log.txt", max_bytes=10)
+    assert summary["kind"] == "text"
+    assert summary["text"] == "line\nline\n"
+    assert summary["truncated"]
+    assert preview_summary(trash_dir, "blob.bin")["kind"] == "binary"
+
+
+async def test_preview_handler_ranges(jp_fetch, trash_dir):
+    """Test raw previews honour Range headers and are capped."""
+    (trash_dir / "files" / "data.csv").write_text("0123456789" * 10000)
+    response = await jp_fetch(
+        "jupyterlab-trash-mgmt-extension", "preview", params={"trash_path": "data.csv"},
+        headers={"Range": "bytes=5-14"}
+    )
+    assert response.code == 206
+    assert response.body == b"5678901234"
+    assert response.headers["Content-Range"] == "bytes 5-14/100000"
+    assert response.headers["Content-Type"].startswith("text/plain")
+
+    response = await jp_fetch("jupyterlab-trash-mgmt-extension", "preview", params={"trash_path": "data.csv"})
+    assert response.code == 206
+    assert len(response.body) == preview.PREVIEW_MAX_BYTES
+    assert response.headers["Content-Range"] == f"bytes 0-{preview.PREVIEW_MAX_BYTES - 1}/100000"
+
+    with pytest.raises(HTTPClientError) as exc_info:
+        await jp_fetch(
+            "jupyterlab-trash-mgmt-extension", "preview", params={"trash_path": "data.csv"},
+            headers={"Range": "bytes=200000-"}
+        )
+    assert exc_info.value.code == 416
+
+
+async def test_preview_handler_summary(jp_fetch, trash_dir):
+    """Test the summary format of a notebook inside a trashed folder."""
+    (trash_dir / "files" / "project").mkdir()
+    (trash_dir / "files" / "project" / "analysis.ipynb").write_text(json.dumps(notebook(10), sort_keys=True))
+    response = await jp_fetch(
+        "jupyterlab-trash-mgmt-extension", "preview",
+        params={"trash_path": "project", "path": "analysis.ipynb", "format": "summary", "cells": "2"}
+    )
+    payload = json.loads(response.body)
+    assert payload["kind"] == "notebook"
+    assert len(payload["cells"]) == 2
+
+    with pytest.raises(HTTPClientError) as exc_info:
+        await jp_fetch(
+            "jupyterlab-trash-mgmt-extension", "preview", params={"trash_path": "project"}
+        )
+    assert exc_info.value.code == 400
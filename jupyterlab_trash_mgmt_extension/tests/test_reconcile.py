@@ -0,0 +1,72 @@
+"""Tests for reconciling trash payloads with their metadata."""
+
+import json
+from pathlib import Path
+
+from jupyterlab_trash_mgmt_extension.reconcile import (
+    RECOVERY_DIR, find_orphans, merge_join, repair_orphans
+)
+from jupyterlab_trash_mgmt_extension.trash import parse_trashinfo
+
+
+def make_orphans(trash_dir):
+    """One complete item, one payload without metadata and one stray trashinfo."""
+    (trash_dir / "files" / "a").write_text("kept")
+    (trash_dir / "info" / "a.trashinfo").write_text("[Trash Info]\nPath=/home/user/a\n")
+    (trash_dir / "files" / "a b").write_text("no info")
+    (trash_dir / "info" / "gone.txt.trashinfo").write_text("[Trash Info]\nPath=/home/user/gone.txt\n")
+
+
+def test_merge_join():
+    """Test names present on one side only are reported from that side."""
+    assert list(merge_join(["a", "c", "d"], ["b", "c"])) == [
+        ("a", True, False), ("b", False, True), ("c", True, True), ("d", True, False)
+    ]
+
+
+def test_find_orphans(trash_dir):
+    """Test both kinds of orphans are found, and recent ones are left alone."""
+    make_orphans(trash_dir)
+    report = find_orphans(trash_dir, min_age=0)
+    assert [item["name"] for item in report["missing_info"]] == ["a b"]
+    assert report["missing_info"][0]["size"] == 7
+    assert [item["name"] for item in report["orphaned_info"]] == ["gone.txt.trashinfo"]
+    assert report["scanned"] == {"files": 2, "info": 2}
+
+    recent = find_orphans(trash_dir)
+    assert recent["missing_info"] == [] and recent["orphaned_info"] == []
+
+
+def test_repair_orphans(trash_dir):
+    """Test stray metadata is purged and missing metadata regenerated."""
+    make_orphans(trash_dir)
+    result = repair_orphans([trash_dir], files="regenerate", min_age=0)
+    assert result["purged_info"] == 1 and result["regenerated"] == 1
+    assert not (trash_dir / "info" / "gone.txt.trashinfo").exists()
+    metadata = parse_trashinfo(trash_dir / "info" / "a b.trashinfo")
+    assert metadata["original_path"] == str(Path.home() / RECOVERY_DIR / "a b")
+    assert metadata["deletion_timestamp"] is not None
+
+    (trash_dir / "info" / "a b.trashinfo").unlink()
+    result = repair_orphans([trash_dir], files="purge", min_age=0)
+    assert result["purged_files"] == 1 and result["bytes_freed"] == 7
+    assert sorted(p.name for p in (trash_dir / "files").iterdir()) == ["a"]
+
+
+async def test_orphans_handler(jp_fetch, jp_serverapp, trash_dir):
+    """Test orphans are reported and purged through the API."""
+    jp_serverapp.web_app.settings["trash_mgmt_manager"].orphan_min_age = 0
+    make_orphans(trash_dir)
+
+    response = await jp_fetch("jupyterlab-trash-mgmt-extension", "orphans")
+    report = json.loads(response.body)["volumes"][0]
+    assert report["volume"] == "home"
+    assert len(report["missing_info"]) == 1 and len(report["orphaned_info"]) == 1
+
+    response = await jp_fetch(
+        "jupyterlab-trash-mgmt-extension", "orphans", method="POST",
+        body=json.dumps({"files": "purge"})
+    )
+    assert json.loads(response.body)["purged_files"] == 1
+    response = await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+    assert json.loads(response.body)["item_count"] == 1
@@ -0,0 +1,127 @@
+"""Tests for the retention policy."""
+
+import asyncio
+import datetime
+import threading
+import time
+
+import pytest
+
+from jupyterlab_trash_mgmt_extension.deletion import get_remover
+from jupyterlab_trash_mgmt_extension.jobs import JOB_PENDING, JOB_RUNNING, Job
+from jupyterlab_trash_mgmt_extension.manager import TrashManager
+from jupyterlab_trash_mgmt_extension.retention import select_evictions
+from jupyterlab_trash_mgmt_extension.trash import delete_items
+
+NOW = datetime.datetime(2024, 3, 1, 12, 0, 0)
+
+
+def item(name, days_ago, size=10):
+    date = NOW - datetime.timedelta(days=days_ago)
+    return {"name": name, "deletion_date": date.strftime("%Y-%m-%dT%H:%M:%S"),
+            "deletion_timestamp": date.timestamp(), "size": size}
+
+
+def add_trash_item(trash_dir, name, days_ago, content="data"):
+    date = datetime.datetime.now() - datetime.timedelta(days=days_ago)
+    (trash_dir / "files" / name).write_text(content)
+    (trash_dir / "info" / f"{name}.trashinfo").write_text(
+        f"[Trash Info]\nPath=/home/user/{name}\nDeletionDate={date:%Y-%m-%dT%H:%M:%S}\n"
+    )
+
+
+class TestSelectEvictions:
+    """Tests for choosing which items to purge."""
+
+    def test_no_limits(self):
+        """Test a disabled policy evicts nothing."""
+        assert select_evictions([item("a", 400)], NOW) == []
+
+    def test_max_age(self):
+        """Test items older than the maximum age are evicted."""
+        items = [item("new", 1), item("old", 40), item("older", 90)]
+        evicted = select_evictions(items, NOW, max_age_days=30)
+        assert [i["name"] for i in evicted] == ["older", "old"]
+
+    def test_size_and_count_evict_oldest_first(self):
+        """Test the oldest items go until both size and count limits hold."""
+        items = [item("a", 1, 100), item("b", 2, 100), item("c", 3, 100), item("d", 4, 100)]
+        assert [i["name"] for i in select_evictions(items, NOW, max_size=250)] == ["d", "c"]
+        assert [i["name"] for i in select_evictions(items, NOW, max_items=3)] == ["d"]
+        evicted = select_evictions(items, NOW, max_size=350, max_items=2)
+        assert [i["name"] for i in evicted] == ["d", "c"]
+
+    def test_undated_items(self):
+        """Test undated items never expire by age but go first over the limits."""
+        items = [item("dated", 100), {"name": "undated", "deletion_date": "", "size": 10}]
+        assert [i["name"] for i in select_evictions(items, NOW, max_age_days=30)] == ["dated"]
+        assert [i["name"] for i in select_evictions(items, NOW, max_items=1)] == ["undated"]
+
+
+def test_delete_items_throttled(trash_dir):
+    """Test the deletion rate limit spaces deletions out."""
+    for name in ("a", "b", "c"):
+        add_trash_item(trash_dir, name, 1)
+    start = time.monotonic()
+    result = delete_items(trash_dir, ["a", "b", "c"], job=Job("purge"), max_rate=20)
+    assert result["success_count"] == 3
+    assert time.monotonic() - start >= 0.1
+
+
+def test_throttled_deletes_do_not_fan_out(trash_dir, monkeypatch):
+    """Test a throttled purge removes folders on its own thread."""
+    folder = trash_dir / "files" / "folder"
+    for sub in ("a", "b", "c"):
+        (folder / sub).mkdir(parents=True)
+        (folder / sub / "data").write_text("x")
+    monkeypatch.setattr(get_remover(), "_get_executor", lambda: pytest.fail("fanned out"))
+    result = delete_items(trash_dir, ["folder"], job=Job("purge"), max_rate=100)
+    assert result["success_count"] == 1
+    assert not folder.exists()
+
+
+async def test_jobs_leave_request_workers_free():
+    """Test waiting jobs run on their own threads, not the request workers."""
+    manager = TrashManager(scan_volumes=False, max_workers=1, max_concurrent_jobs=1)
+    release = threading.Event()
+
+    def wait_for_release(job=None):
+        release.wait(5)
+        return {}
+
+    try:
+        first = manager.start_job("purge", [], wait_for_release)
+        second = manager.start_job("purge", [], wait_for_release)
+        for _ in range(100):
+            if first.status == JOB_RUNNING:
+                break
+            await asyncio.sleep(0.01)
+        assert await asyncio.wait_for(manager.run(lambda: 42), 1) == 42
+        assert first.status == JOB_RUNNING
+        assert second.status == JOB_PENDING
+    finally:
+        release.set()
+        manager.shutdown()
+
+
+async def test_enforce_retention(trash_dir):
+    """Test the manager purges the oldest items beyond the limits."""
+    add_trash_item(trash_dir, "recent", 1)
+    add_trash_item(trash_dir, "stale", 10)
+    add_trash_item(trash_dir, "ancient", 100)
+    manager = TrashManager(
+        scan_volumes=False, retention_max_age_days=30, retention_max_items=1,
+        retention_max_deletions_per_second=0
+    )
+    try:
+        jobs = await manager.enforce_retention()
+        assert [job.kind for job in jobs] == ["purge"]
+        for _ in range(100):
+            if jobs[0].done:
+                break
+            await asyncio.sleep(0.01)
+        assert jobs[0].result["success_count"] == 2
+        assert sorted(p.name for p in (trash_dir / "files").iterdir()) == ["recent"]
+        assert await manager.enforce_retention() == []
+    finally:
+        manager.shutdown()
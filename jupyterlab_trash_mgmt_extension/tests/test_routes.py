@@ -1,12 +1,17 @@
 """Tests for trash management routes and helper functions."""
 
+import asyncio
+import atexit
 import json
 import os
 import shutil
 from pathlib import Path
 
 import pytest
+from tornado.httpclient import HTTPClientError
 
+from jupyterlab_trash_mgmt_extension import _load_jupyter_server_extension, routes
+from jupyterlab_trash_mgmt_extension.jobs import Job
 from jupyterlab_trash_mgmt_extension.routes import (
     format_size,
     get_dir_size,
@@ -14,6 +19,7 @@ from jupyterlab_trash_mgmt_extension.routes import (
     get_trash_dir,
     parse_trashinfo,
 )
+from jupyterlab_trash_mgmt_extension.trash import empty_trash
 
 
 class TestHelperFunctions:
@@ -258,3 +264,227 @@ class TestTrashOperations:
         assert dir_item is not None
         assert dir_item["original_path"] == "/home/user/original/test_folder"
         assert dir_item["is_dir"] is True
+
+
+class TestHandlers:
+    """Tests for the HTTP handlers running on the worker pool."""
+
+    async def test_list_handler(self, jp_fetch, sample_trash_file, sample_trash_directory):
+        """Test listing returns both items, most recently deleted first."""
+        response = await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+        payload = json.loads(response.body)
+        assert payload["item_count"] == 2
+        assert [item["name"] for item in payload["items"]] == ["test_file.txt", "test_folder"]
+
+    async def test_restore_handler(self, jp_fetch, trash_dir, tmp_path):
+        """Test restoring an item moves it back and removes its trashinfo."""
+        original = tmp_path / "restored" / "notes.txt"
+        (trash_dir / "files" / "notes.txt").write_text("notes")
+        (trash_dir / "info" / "notes.txt.trashinfo").write_text(
+            f"[Trash Info]\nPath={original}\nDeletionDate=2024-01-15T10:30:00\n"
+        )
+
+        response = await jp_fetch(
+            "jupyterlab-trash-mgmt-extension", "restore",
+            method="POST", body=json.dumps({"trash_path": "notes.txt"})
+        )
+        assert json.loads(response.body) == {"success": True, "restored_to": str(original)}
+        assert original.read_text() == "notes"
+        assert not (trash_dir / "info" / "notes.txt.trashinfo").exists()
+
+    async def test_delete_handler_missing_item(self, jp_fetch, trash_dir):
+        """Test deleting an unknown item returns 404."""
+        with pytest.raises(HTTPClientError) as exc_info:
+            await jp_fetch(
+                "jupyterlab-trash-mgmt-extension", "delete",
+                method="POST", body=json.dumps({"trash_path": "missing"})
+            )
+        assert exc_info.value.code == 404
+
+    async def test_empty_handler(self, jp_fetch, trash_dir, sample_trash_file, sample_trash_directory):
+        """Test emptying the trash removes every payload and trashinfo."""
+        response = await jp_fetch(
+            "jupyterlab-trash-mgmt-extension", "empty", method="POST", body=""
+        )
+        assert json.loads(response.body) == {"success": True, "deleted_count": 2}
+        assert list((trash_dir / "files").iterdir()) == []
+        assert list((trash_dir / "info").iterdir()) == []
+
+    async def test_list_handler_pagination(self, jp_fetch, trash_dir):
+        """Test sorting, filtering and paging are applied server-side."""
+        for i in range(5):
+            (trash_dir / "files" / f"report_{i}.txt").write_text("x" * (i + 1))
+            (trash_dir / "info" / f"report_{i}.txt.trashinfo").write_text(
+                f"[Trash Info]\nPath=/home/user/reports/report_{i}.txt\nDeletionDate=2024-01-1{i}T00:00:00\n"
+            )
+        (trash_dir / "files" / "other.bin").write_text("y")
+
+        response = await jp_fetch(
+            "jupyterlab-trash-mgmt-extension", "list",
+            params={"sort": "size", "order": "asc", "filter": "*/reports/*", "offset": "1", "limit": "2"}
+        )
+        payload = json.loads(response.body)
+        assert [item["name"] for item in payload["items"]] == ["report_1.txt", "report_2.txt"]
+        assert payload["item_count"] == 6
+        assert payload["filtered_count"] == 5
+        assert payload["filtered_size"] == 15
+
+    async def test_list_handler_invalid_sort(self, jp_fetch, trash_dir):
+        """Test an unknown sort key is rejected."""
+        with pytest.raises(HTTPClientError) as exc_info:
+            await jp_fetch("jupyterlab-trash-mgmt-extension", "list", params={"sort": "owner"})
+        assert exc_info.value.code == 400
+
+    async def test_list_handler_etag(self, jp_fetch, sample_trash_file):
+        """Test an unchanged trash answers If-None-Match with 304."""
+        response = await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+        etag = response.headers["ETag"]
+        assert etag == f'"{json.loads(response.body)["version"]}"'
+
+        with pytest.raises(HTTPClientError) as exc_info:
+            await jp_fetch(
+                "jupyterlab-trash-mgmt-extension", "list", headers={"If-None-Match": etag}
+            )
+        assert exc_info.value.code == 304
+
+    async def test_list_handler_since(self, jp_fetch, trash_dir, sample_trash_file, sample_trash_directory):
+        """Test ?since= returns only the entries that changed after a version."""
+        response = await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+        version = json.loads(response.body)["version"]
+
+        (trash_dir / "files" / "added.txt").write_text("new")
+        shutil.rmtree(sample_trash_directory["dir_path"])
+        sample_trash_directory["info_path"].unlink()
+
+        response = await jp_fetch("jupyterlab-trash-mgmt-extension", "list", params={"since": version})
+        payload = json.loads(response.body)
+        assert payload["full"] is False
+        assert [item["name"] for item in payload["added"]] == ["added.txt"]
+        assert payload["removed"] == ["test_folder"]
+        assert payload["item_count"] == 2
+        assert payload["version"] != version
+
+    async def test_list_handler_unknown_since(self, jp_fetch, sample_trash_file):
+        """Test an unknown version falls back to the full listing."""
+        response = await jp_fetch("jupyterlab-trash-mgmt-extension", "list", params={"since": "stale"})
+        payload = json.loads(response.body)
+        assert payload["full"] is True
+        assert [item["name"] for item in payload["items"]] == ["test_file.txt"]
+
+    async def test_list_handler_ndjson(self, jp_fetch, trash_dir, monkeypatch):
+        """Test ?format=ndjson streams one line per item, then the totals."""
+        monkeypatch.setattr(routes, "NDJSON_CHUNK_ITEMS", 2)
+        for i in range(5):
+            (trash_dir / "files" / f"item_{i}.txt").write_text("x" * (i + 1))
+
+        response = await jp_fetch(
+            "jupyterlab-trash-mgmt-extension", "list", params={"format": "ndjson", "sort": "size"}
+        )
+        assert response.headers["Content-Type"] == "application/x-ndjson"
+        records = [json.loads(line) for line in response.body.decode().splitlines()]
+        assert [record["name"] for record in records[:-1]] == [f"item_{i}.txt" for i in range(4, -1, -1)]
+        summary = records[-1]["summary"]
+        assert "items" not in summary
+        assert summary["item_count"] == summary["filtered_count"] == 5
+        assert summary["total_size"] == 15
+
+        for params in ({"format": "xml"}, {"format": "ndjson", "since": summary["version"]}):
+            with pytest.raises(HTTPClientError) as exc_info:
+                await jp_fetch("jupyterlab-trash-mgmt-extension", "list", params=params)
+            assert exc_info.value.code == 400
+
+    async def test_batch_delete_handler(self, jp_fetch, trash_dir, sample_trash_file, sample_trash_directory):
+        """Test batch delete reports a result per item, including failures."""
+        response = await jp_fetch(
+            "jupyterlab-trash-mgmt-extension", "batch", "delete", method="POST",
+            body=json.dumps({"trash_paths": ["test_file.txt", "missing", "test_folder"]})
+        )
+        payload = json.loads(response.body)
+        assert payload["success_count"] == 2
+        assert payload["error_count"] == 1
+        assert [result["trash_path"] for result in payload["results"]] == ["test_file.txt", "missing", "test_folder"]
+        assert payload["results"][1]["status"] == 404
+        assert list((trash_dir / "files").iterdir()) == []
+
+    async def test_batch_restore_handler(self, jp_fetch, trash_dir, tmp_path):
+        """Test batch restore moves every item back."""
+        names = [f"doc{i}.txt" for i in range(5)]
+        for name in names:
+            (trash_dir / "files" / name).write_text(name)
+            (trash_dir / "info" / f"{name}.trashinfo").write_text(
+                f"[Trash Info]\nPath={tmp_path / 'docs' / name}\nDeletionDate=2024-01-15T10:30:00\n"
+            )
+
+        response = await jp_fetch(
+            "jupyterlab-trash-mgmt-extension", "batch", "restore", method="POST",
+            body=json.dumps({"trash_paths": names})
+        )
+        payload = json.loads(response.body)
+        assert payload["success_count"] == 5
+        assert sorted(p.name for p in (tmp_path / "docs").iterdir()) == names
+
+    async def test_batch_handler_rejects_bad_body(self, jp_fetch, trash_dir):
+        """Test batch endpoints require a list of names."""
+        with pytest.raises(HTTPClientError) as exc_info:
+            await jp_fetch(
+                "jupyterlab-trash-mgmt-extension", "batch", "delete", method="POST",
+                body=json.dumps({"trash_paths": "test_file.txt"})
+            )
+        assert exc_info.value.code == 400
+
+    async def test_empty_handler_background(self, jp_fetch, trash_dir, sample_trash_file, sample_trash_directory):
+        """Test a background empty returns a job that can be polled to completion."""
+        response = await jp_fetch(
+            "jupyterlab-trash-mgmt-extension", "empty", method="POST",
+            body=json.dumps({"background": True})
+        )
+        assert response.code == 202
+        job = json.loads(response.body)
+        assert job["kind"] == "empty"
+
+        for _ in range(100):
+            response = await jp_fetch("jupyterlab-trash-mgmt-extension", "jobs", job["job_id"])
+            job = json.loads(response.body)
+            if job["status"] not in ("pending", "running"):
+                break
+            await asyncio.sleep(0.02)
+        assert job["status"] == "completed"
+        assert job["items_done"] == job["items_total"] == 2
+        assert job["bytes_done"] == 27 + 28
+        assert job["result"]["deleted_count"] == 2
+        assert list((trash_dir / "files").iterdir()) == []
+
+        response = await jp_fetch("jupyterlab-trash-mgmt-extension", "jobs")
+        assert [j["job_id"] for j in json.loads(response.body)["jobs"]] == [job["job_id"]]
+
+    async def test_job_handler_unknown_job(self, jp_fetch, trash_dir):
+        """Test polling or cancelling an unknown job returns 404."""
+        for method in ("GET", "DELETE"):
+            with pytest.raises(HTTPClientError) as exc_info:
+                await jp_fetch("jupyterlab-trash-mgmt-extension", "jobs", "abc123", method=method)
+            assert exc_info.value.code == 404
+
+
+class TestJobs:
+    """Tests for cancellable background deletion."""
+
+    def test_empty_trash_cancelled(self, trash_dir, sample_trash_file, sample_trash_directory):
+        """Test a cancelled job leaves the trash untouched and reports it."""
+        job = Job("empty")
+        job.cancel()
+        result = empty_trash(trash_dir, job=job)
+        assert result["cancelled"] is True
+        assert result["deleted_count"] == 0
+        assert job.items_total == 2
+        assert sample_trash_file["info_path"].exists()
+        assert sample_trash_directory["info_path"].exists()
+
+
+async def test_manager_shut_down_at_exit(jp_serverapp, trash_dir, monkeypatch):
+    """Test loading the extension arranges for the manager to shut down at exit."""
+    registered = []
+    monkeypatch.setattr(atexit, "register", registered.append)
+    _load_jupyter_server_extension(jp_serverapp)
+    manager = jp_serverapp.web_app.settings["trash_mgmt_manager"]
+    assert registered == [manager.shutdown]
+    manager.shutdown()
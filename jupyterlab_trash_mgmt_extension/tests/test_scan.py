@@ -0,0 +1,66 @@
+"""Tests for the scandir-based scanning layer."""
+
+import os
+
+from jupyterlab_trash_mgmt_extension.index import TrashIndex
+from jupyterlab_trash_mgmt_extension.scan import ScanStats, scan_trash, walk_size
+from jupyterlab_trash_mgmt_extension.trash import list_trash
+
+
+class TestScanTrash:
+    """Tests for scan_trash."""
+
+    def test_full_scan_syscalls(self, trash_dir, sample_trash_file, sample_trash_directory):
+        """Test a full scan lists each directory once and stats each entry once."""
+        (trash_dir / "files" / "no_info.txt").write_text("x")
+        stats = ScanStats()
+        entries = {entry.name: entry for entry in scan_trash(trash_dir, stats=stats)}
+
+        assert sorted(entries) == ["no_info.txt", "test_file.txt", "test_folder"]
+        assert entries["test_folder"].is_dir
+        assert entries["no_info.txt"].info_st is None
+        assert entries["test_file.txt"].info_st is not None
+        # Three lstat calls plus two .trashinfo stats; none for the missing one
+        assert stats.to_dict() == {"dir_reads": 2, "stat_calls": 5, "entries": 3}
+
+    def test_named_scan(self, trash_dir, sample_trash_file):
+        """Test named entries are stat'ed directly and missing ones skipped."""
+        stats = ScanStats()
+        entries = list(scan_trash(trash_dir, ["test_file.txt", "gone"], stats))
+        assert [entry.name for entry in entries] == ["test_file.txt"]
+        assert stats.dir_reads == 0
+
+    def test_symlink_entry(self, trash_dir, tmp_path):
+        """Test symlinks are described from their lstat, and as folders if they point to one."""
+        os.symlink(tmp_path, trash_dir / "files" / "link")
+        (item,) = list_trash(trash_dir)["items"]
+        assert item["is_symlink"] and item["is_dir"]
+        assert item["size"] == os.lstat(trash_dir / "files" / "link").st_size
+
+
+def test_walk_size(tmp_path):
+    """Test file symlinks count their target while folder symlinks are not entered."""
+    tree = tmp_path / "tree"
+    (tree / "sub").mkdir(parents=True)
+    (tree / "a.txt").write_text("a" * 10)
+    (tree / "sub" / "b.txt").write_text("b" * 5)
+    os.symlink(tree / "a.txt", tree / "sub" / "file-link")
+    os.symlink(tmp_path, tree / "dir-link")
+    os.symlink("/nonexistent", tree / "dangling")
+
+    stats = ScanStats()
+    assert walk_size(tree, stats) == 25
+    assert stats.dir_reads == 2
+    # Two files and three symlinks; folders cost nothing
+    assert stats.stat_calls == 5
+
+
+def test_index_records_last_scan(trash_dir, sample_trash_file, sample_trash_directory):
+    """Test the index exposes the system calls of its last refresh."""
+    index = TrashIndex(trash_dir)
+    index.refresh()
+    assert index.last_scan.to_dict() == {"dir_reads": 2, "stat_calls": 4, "entries": 2}
+
+    index.mark_dirty("test_file.txt")
+    index.refresh()
+    assert index.last_scan.to_dict() == {"dir_reads": 0, "stat_calls": 2, "entries": 1}
@@ -0,0 +1,209 @@
+"""Tests for cross-filesystem restores."""
+
+import asyncio
+import errno
+import inspect
+import json
+import os
+import sys
+
+import pytest
+
+from jupyterlab_trash_mgmt_extension import transfer
+from jupyterlab_trash_mgmt_extension import trash as trash_module
+from jupyterlab_trash_mgmt_extension.jobs import Job
+from jupyterlab_trash_mgmt_extension.trash import CrossDeviceError, restore_item
+from jupyterlab_trash_mgmt_extension.transfer import (
+    CopyCancelled,
+    copy_file,
+    copy_tree,
+    tree_size,
+    verify_copy,
+)
+
+
+@pytest.fixture
+def cross_device(monkeypatch, trash_dir):
+    """Make renames out of the trash fail as if the trash were another mount."""
+    real_rename = os.rename
+    files_dir = str(trash_dir / "files")
+
+    def rename(src, dst):
+        if str(src).startswith(files_dir):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        real_rename(src, dst)
+
+    monkeypatch.setattr(trash_module.os, "rename", rename)
+
+
+def trash_folder(trash_dir, tmp_path):
+    folder = trash_dir / "files" / "project"
+    (folder / "sub").mkdir(parents=True)
+    (folder / "a.txt").write_text("alpha")
+    (folder / "sub" / "b.bin").write_bytes(os.urandom(3000))
+    os.symlink("a.txt", folder / "link")
+    (trash_dir / "info" / "project.trashinfo").write_text(
+        f"[Trash Info]\nPath={tmp_path / 'home' / 'project'}\nDeletionDate=2024-01-15T10:30:00\n"
+    )
+    return folder
+
+
+class TestCopy:
+    """Tests for the copy engine."""
+
+    def test_copy_tree_preserves_links(self, tmp_path):
+        """Test trees are copied with symlinks recreated, not followed."""
+        src = tmp_path / "src"
+        (src / "sub").mkdir(parents=True)
+        (src / "sub" / "data.txt").write_text("payload")
+        os.symlink("/nonexistent/target", src / "dangling")
+
+        copied = []
+        copy_tree(src, tmp_path / "dst", copied.append)
+        verify_copy(src, tmp_path / "dst")
+        assert sum(copied) == len("payload")
+        assert os.readlink(tmp_path / "dst" / "dangling") == "/nonexistent/target"
+
+    def test_deep_tree(self, tmp_path):
+        """Test trees nested deeper than the recursion limit are measured and copied."""
+        src = tmp_path / "src"
+        deepest = src.joinpath(*["d"] * 200)
+        deepest.mkdir(parents=True)
+        (deepest / "leaf.txt").write_text("leaf")
+
+        # Leave room for the calls themselves, but not one frame per level
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(len(inspect.stack(0)) + 50)
+        try:
+            assert tree_size(src) == 4
+            copy_tree(src, tmp_path / "dst")
+            verify_copy(src, tmp_path / "dst")
+        finally:
+            sys.setrecursionlimit(limit)
+        assert os.stat(tmp_path / "dst" / "d").st_mtime == os.stat(src / "d").st_mtime
+
+    def test_copy_file_falls_back_to_read_write(self, tmp_path, monkeypatch):
+        """Test copying still works when reflink and copy_file_range are refused."""
+        def refuse(*args):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+        monkeypatch.setattr(transfer, "_reflink", lambda src_fd, dst_fd: False)
+        monkeypatch.setattr(transfer.os, "copy_file_range", refuse, raising=False)
+        data = os.urandom(10000)
+        (tmp_path / "src").write_bytes(data)
+        copy_file(tmp_path / "src", tmp_path / "dst", chunk_size=4096)
+        assert (tmp_path / "dst").read_bytes() == data
+
+    def test_copy_can_be_cancelled(self, tmp_path):
+        """Test a cancelled copy stops before writing data."""
+        (tmp_path / "src").write_bytes(b"x" * 100)
+        with pytest.raises(CopyCancelled):
+            copy_file(tmp_path / "src", tmp_path / "dst", is_cancelled=lambda: True)
+
+    def test_verify_detects_mismatch(self, tmp_path):
+        """Test verification rejects a copy with a different size."""
+        (tmp_path / "src").write_text("full content")
+        (tmp_path / "dst").write_text("truncated")
+        with pytest.raises(OSError):
+            verify_copy(tmp_path / "src", tmp_path / "dst")
+
+
+class TestCrossDeviceRestore:
+    """Tests for restores that cannot be a rename."""
+
+    def test_restore_copies_then_removes(self, trash_dir, tmp_path, cross_device):
+        """Test the item is copied, verified and only then removed from the trash."""
+        folder = trash_folder(trash_dir, tmp_path)
+        job = Job("restore")
+        result = restore_item(trash_dir, "project", job=job)
+
+        restored = tmp_path / "home" / "project"
+        assert result["success"] is True
+        assert result["bytes_copied"] == 5 + 3000
+        assert job.bytes_done == job.bytes_total == 5 + 3000
+        assert (restored / "a.txt").read_text() == "alpha"
+        assert os.readlink(restored / "link") == "a.txt"
+        assert not folder.exists()
+        assert not (trash_dir / "info" / "project.trashinfo").exists()
+        assert [p.name for p in restored.parent.iterdir()] == ["project"]
+
+    def test_restore_survives_failed_source_removal(self, trash_dir, tmp_path, cross_device,
+                                                     monkeypatch):
+        """Test a restore whose copy is in place succeeds even if the trash copy stays."""
+        folder = trash_folder(trash_dir, tmp_path)
+
+        def remove_entry(path, parallel=True):
+            raise PermissionError(errno.EACCES, "Permission denied", str(path))
+
+        monkeypatch.setattr(trash_module, "remove_entry", remove_entry)
+        job = Job("restore")
+        result = restore_item(trash_dir, "project", job=job)
+
+        assert result["success"] is True
+        assert (tmp_path / "home" / "project" / "a.txt").read_text() == "alpha"
+        assert not (trash_dir / "info" / "project.trashinfo").exists()
+        assert folder.exists()
+        assert len(job.errors) == 1 and "Permission denied" in job.errors[0]
+
+    def test_cancelled_restore_keeps_trash(self, trash_dir, tmp_path, cross_device):
+        """Test cancelling discards the partial copy and leaves the item in the trash."""
+        folder = trash_folder(trash_dir, tmp_path)
+        job = Job("restore")
+        job.cancel()
+        result = restore_item(trash_dir, "project", job=job)
+
+        assert result["cancelled"] is True
+        assert (folder / "a.txt").exists()
+        assert list((tmp_path / "home").iterdir()) == []
+
+    def test_copy_not_allowed(self, trash_dir, tmp_path, cross_device):
+        """Test callers can ask to be told about cross-device restores."""
+        trash_folder(trash_dir, tmp_path)
+        with pytest.raises(CrossDeviceError):
+            restore_item(trash_dir, "project", allow_copy=False)
+
+
+async def test_restore_handler_starts_copy_job(jp_fetch, trash_dir, tmp_path, cross_device):
+    """Test a cross-device restore answers 202 with a job that completes."""
+    trash_folder(trash_dir, tmp_path)
+    response = await jp_fetch(
+        "jupyterlab-trash-mgmt-extension", "restore", method="POST",
+        body=json.dumps({"trash_path": "project"})
+    )
+    assert response.code == 202
+    job = json.loads(response.body)
+    for _ in range(100):
+        response = await jp_fetch("jupyterlab-trash-mgmt-extension", "jobs", job["job_id"])
+        job = json.loads(response.body)
+        if job["status"] not in ("pending", "running"):
+            break
+        await asyncio.sleep(0.02)
+    assert job["status"] == "completed"
+    assert job["result"]["restored_to"] == str(tmp_path / "home" / "project")
+    assert (tmp_path / "home" / "project" / "a.txt").exists()
+
+
+async def test_batch_restore_starts_copy_jobs(jp_fetch, trash_dir, tmp_path, cross_device):
+    """Test cross-device items of a batch restore are copied by jobs."""
+    trash_folder(trash_dir, tmp_path)
+    (trash_dir / "files" / "notes.txt").write_text("notes")
+    (trash_dir / "info" / "notes.txt.trashinfo").write_text(
+        f"[Trash Info]\nPath={tmp_path / 'home' / 'notes.txt'}\nDeletionDate=2024-01-15T10:30:00\n"
+    )
+    response = await jp_fetch(
+        "jupyterlab-trash-mgmt-extension", "batch", "restore", method="POST",
+        body=json.dumps({"trash_paths": ["project", "notes.txt"]})
+    )
+    payload = json.loads(response.body)
+    assert payload["success_count"] == 2
+    for result in payload["results"]:
+        job = result["job"]
+        for _ in range(100):
+            response = await jp_fetch("jupyterlab-trash-mgmt-extension", "jobs", job["job_id"])
+            job = json.loads(response.body)
+            if job["status"] not in ("pending", "running"):
+                break
+            await asyncio.sleep(0.02)
+        assert job["status"] == "completed"
+    assert (tmp_path / "home" / "project" / "sub" / "b.bin").exists()
+    assert (tmp_path / "home" / "notes.txt").read_text() == "notes"
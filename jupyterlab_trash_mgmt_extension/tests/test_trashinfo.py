@@ -0,0 +1,55 @@
+"""Tests for the .trashinfo parser."""
+
+import datetime
+import os
+
+from jupyterlab_trash_mgmt_extension import trashinfo
+from jupyterlab_trash_mgmt_extension.trashinfo import TrashInfoCache, parse_trashinfo_bytes
+
+
+class TestParseTrashinfoBytes:
+    """Tests for parse_trashinfo_bytes."""
+
+    def test_valid(self):
+        """Test the path is decoded and the date converted to a timestamp."""
+        info = parse_trashinfo_bytes(
+            b"[Trash Info]\nPath=/home/user/50%25%20off.txt\nDeletionDate=2024-01-15T10:30:00\n"
+        )
+        assert info.path == "/home/user/50% off.txt"
+        assert info.deletion_date == "2024-01-15T10:30:00"
+        assert info.deletion_timestamp == datetime.datetime(2024, 1, 15, 10, 30).timestamp()
+
+    def test_tolerates_variations(self):
+        """Test comments, CRLF, spacing, key case and non-UTF-8 paths."""
+        info = parse_trashinfo_bytes(
+            b"# written by some tool\r\n[Trash Info]\r\npath = /tmp/caf%E9\r\nDeletionDate=yesterday\r\n"
+        )
+        assert info.path == os.fsdecode(b"/tmp/caf\xe9")
+        assert info.deletion_date == "yesterday"
+        assert info.deletion_timestamp is None
+
+    def test_other_sections_ignored(self):
+        """Test keys outside the Trash Info section are not read."""
+        assert parse_trashinfo_bytes(b"[Wrong Section]\nPath=/home/user/test.txt\n").path == ""
+        info = parse_trashinfo_bytes(b"[Trash Info]\nPath=/a\n[Other]\nPath=/b\n")
+        assert info.path == "/a"
+        assert parse_trashinfo_bytes(b"\x00\xff garbage").path == ""
+
+
+def test_cache_reparses_only_changed_files(tmp_path, monkeypatch):
+    """Test a file is parsed once until its inode, mtime or size change."""
+    info_file = tmp_path / "a.trashinfo"
+    info_file.write_text("[Trash Info]\nPath=/a\nDeletionDate=2024-01-15T10:30:00\n")
+    cache = TrashInfoCache()
+    calls = []
+    parse = trashinfo.parse_trashinfo_bytes
+    monkeypatch.setattr(trashinfo, "parse_trashinfo_bytes", lambda data: calls.append(data) or parse(data))
+
+    assert cache.read(str(info_file)).path == "/a"
+    assert cache.read(str(info_file)).path == "/a"
+    assert len(calls) == 1
+
+    info_file.write_text("[Trash Info]\nPath=/bb\nDeletionDate=2024-01-15T10:30:00\n")
+    assert cache.read(str(info_file)).path == "/bb"
+    assert len(calls) == 2
+    assert cache.read(str(tmp_path / "missing.trashinfo")) is None
@@ -0,0 +1,121 @@
+"""Tests for per-volume trash discovery."""
+
+import json
+import os
+
+from jupyterlab_trash_mgmt_extension import manager as manager_module
+from jupyterlab_trash_mgmt_extension.trash import parse_trashinfo
+from jupyterlab_trash_mgmt_extension.volumes import (
+    HOME_VOLUME,
+    build_volumes,
+    find_volume_trashes,
+    read_mount_points,
+    trash_topdir,
+)
+
+
+def make_volume_trash(topdir, name="data.csv", content="1,2,3"):
+    """Create ``$topdir/.Trash-$uid`` holding one item with a relative trashinfo."""
+    trash = topdir / f".Trash-{os.getuid()}"
+    (trash / "files").mkdir(parents=True)
+    (trash / "info").mkdir()
+    (trash / "files" / name).write_text(content)
+    (trash / "info" / f"{name}.trashinfo").write_text(
+        f"[Trash Info]\nPath=projects/{name}\nDeletionDate=2024-02-01T08:00:00\n"
+    )
+    return trash
+
+
+class TestDiscovery:
+    """Tests for mount table parsing and trash lookup."""
+
+    def test_read_mount_points(self, tmp_path):
+        """Test pseudo filesystems are skipped and escapes decoded."""
+        mounts = tmp_path / "mounts"
+        mounts.write_text(
+            "/dev/sda1 / ext4 rw 0 0\n"
+            "proc /proc proc rw 0 0\n"
+            "server:/home /mnt/my\\040share nfs4 rw 0 0\n"
+            "/dev/sda1 / ext4 rw 0 0\n"
+        )
+        assert [str(p) for p in read_mount_points(str(mounts))] == ["/", "/mnt/my share"]
+        assert read_mount_points(str(tmp_path / "missing")) == []
+
+    def test_find_volume_trashes(self, tmp_path):
+        """Test both trash layouts are found and a non-sticky .Trash is ignored."""
+        uid = os.getuid()
+        (tmp_path / ".Trash" / str(uid)).mkdir(parents=True)
+        (tmp_path / f".Trash-{uid}").mkdir()
+        assert find_volume_trashes(tmp_path, uid) == [tmp_path / f".Trash-{uid}"]
+
+        os.chmod(tmp_path / ".Trash", 0o1777)
+        assert find_volume_trashes(tmp_path, uid) == [
+            tmp_path / ".Trash" / str(uid), tmp_path / f".Trash-{uid}"
+        ]
+
+    def test_foreign_trash_directories_are_ignored(self, tmp_path, caplog):
+        """Test trash directories owned by another user are skipped and logged."""
+        other_uid = os.getuid() + 1000
+        (tmp_path / ".Trash" / str(other_uid)).mkdir(parents=True)
+        os.chmod(tmp_path / ".Trash", 0o1777)
+        (tmp_path / f".Trash-{other_uid}").mkdir()
+        assert find_volume_trashes(tmp_path, other_uid) == []
+        assert "owned by uid" in caplog.text
+
+    def test_symlinked_trash_directory_is_ignored(self, tmp_path):
+        """Test a .Trash-$uid symlink is not followed."""
+        uid = os.getuid()
+        (tmp_path / "elsewhere").mkdir()
+        os.symlink(tmp_path / "elsewhere", tmp_path / f".Trash-{uid}")
+        assert find_volume_trashes(tmp_path, uid) == []
+
+    def test_build_volumes_deduplicates(self, trash_dir, tmp_path):
+        """Test the home trash comes first and aliases of one directory are merged."""
+        volume_trash = make_volume_trash(tmp_path / "mnt")
+        os.symlink(tmp_path / "mnt", tmp_path / "alias")
+        volumes = build_volumes(trash_dir, [
+            volume_trash, tmp_path / "alias" / volume_trash.name, trash_dir
+        ])
+        assert [volume.id for volume in volumes][0] == HOME_VOLUME
+        assert [volume.trash_dir for volume in volumes] == [trash_dir, volume_trash]
+        assert volumes[1].topdir == tmp_path / "mnt"
+
+    def test_relative_trashinfo_paths(self, tmp_path):
+        """Test relative paths resolve against the volume's top directory."""
+        trash = make_volume_trash(tmp_path)
+        assert trash_topdir(trash) == tmp_path
+        metadata = parse_trashinfo(trash / "info" / "data.csv.trashinfo")
+        assert metadata["original_path"] == str(tmp_path / "projects" / "data.csv")
+
+
+async def test_list_merges_volumes(jp_fetch, trash_dir, sample_trash_file, tmp_path, monkeypatch):
+    """Test /list merges volume trashes and restore works within a volume."""
+    volume_root = tmp_path / "mnt"
+    make_volume_trash(volume_root)
+    monkeypatch.setattr(manager_module, "read_mount_points", lambda: [volume_root])
+
+    response = await jp_fetch("jupyterlab-trash-mgmt-extension", "list")
+    payload = json.loads(response.body)
+    assert payload["item_count"] == 2
+    volumes = {volume["id"]: volume for volume in payload["volumes"]}
+    assert len(volumes) == 2 and HOME_VOLUME in volumes
+    item = next(item for item in payload["items"] if item["volume"] != HOME_VOLUME)
+    assert item["id"] == f"{item['volume']}/data.csv"
+    assert item["original_path"] == str(volume_root / "projects" / "data.csv")
+    assert volumes[item["volume"]]["item_count"] == 1
+
+    response = await jp_fetch(
+        "jupyterlab-trash-mgmt-extension", "restore", method="POST",
+        body=json.dumps({"trash_path": "data.csv", "volume": item["volume"]})
+    )
+    assert json.loads(response.body)["success"] is True
+    assert (volume_root / "projects" / "data.csv").read_text() == "1,2,3"
+
+    response = await jp_fetch(
+        "jupyterlab-trash-mgmt-extension", "list",
+        params={"since": payload["version"]}
+    )
+    delta = json.loads(response.body)
+    assert delta["full"] is False
+    assert delta["removed"] == [item["id"]]
+    assert delta["item_count"] == 1
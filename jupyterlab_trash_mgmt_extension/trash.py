@@ -0,0 +1,606 @@
+"""Blocking trash operations on the FreeDesktop trash directory layout.
+
+Everything in this module touches the filesystem synchronously. The HTTP
+handlers in :mod:`.routes` run these functions on the worker pool owned by
+:class:`.manager.TrashManager` so they never block the Tornado IOLoop.
+"""
+
+import errno
+import fnmatch
+import logging
+import os
+import stat
+import time
+import uuid
+from pathlib import Path
+
+from .deletion import get_remover
+from .directorysizes import DirectorySizesCache, get_size_cache, get_subtree_cache
+from .scan import ScannedEntry, ScanStats, record_stats, scan_entry, scan_trash, walk_size
+from .transfer import CopyCancelled, copy_tree, tree_size, verify_copy
+from .trashinfo import get_trashinfo_cache
+from .volumes import trash_topdir
+
+
+class TrashError(Exception):
+    """A trash operation failed in a way that maps onto an HTTP status."""
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def get_trash_dir() -> Path:
+    """Get the XDG trash directory path."""
+    xdg_data_home = os.environ.get('XDG_DATA_HOME', os.path.expanduser('~/.local/share'))
+    return Path(xdg_data_home) / 'Trash'
+
+
+def get_dir_size(path: Path) -> int:
+    """Calculate total size of a directory recursively."""
+    stats = ScanStats()
+    total = walk_size(path, stats)
+    record_stats('size', stats)
+    return total
+
+
+def get_item_size(path: Path) -> int:
+    """Get size of file or directory. Handles symlinks by reporting link size."""
+    try:
+        st = os.lstat(path)
+    except (PermissionError, OSError):
+        return 0
+    if stat.S_ISDIR(st.st_mode):
+        return get_dir_size(path)
+    return st.st_size
+
+
+def get_scanned_item_size(entry: ScannedEntry, cache: DirectorySizesCache) -> int:
+    """Get the size of a scanned entry, using the directorysizes cache for
+    trashed directories.
+
+    Directory sizes are keyed on the ``.trashinfo`` mtime, so items without
+    trash metadata are always measured.
+    """
+    if not entry.is_dir:
+        return entry.st.st_size
+    if entry.info_st is None:
+        return get_dir_size(Path(entry.path))
+    info_mtime = int(entry.info_st.st_mtime)
+    size = cache.get(entry.name, info_mtime)
+    if size is None:
+        size = get_dir_size(Path(entry.path))
+        cache.set(entry.name, info_mtime, size)
+    return size
+
+
+def get_cached_item_size(path: Path, info_file: Path, cache: DirectorySizesCache) -> int:
+    """Get item size, using the directorysizes cache for trashed directories."""
+    entry = scan_entry(path.parent, info_file.parent, path.name)
+    if entry is None:
+        return 0
+    return get_scanned_item_size(entry, cache)
+
+
+def format_size(size_bytes: int) -> str:
+    """Format size in human readable format."""
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if size_bytes < 1024:
+            if unit == 'B':
+                return f"{size_bytes} {unit}"
+            return f"{size_bytes:.1f} {unit}"
+        size_bytes /= 1024
+    return f"{size_bytes:.1f} PB"
+
+
+def parse_trashinfo(info_path: Path, st: os.stat_result = None) -> dict:
+    """Parse a .trashinfo file and return metadata.
+
+    Relative paths, used by per-volume trashes, are resolved against the
+    volume's top directory. Missing or malformed files give empty fields;
+    ``deletion_timestamp`` is None unless the date parses. ``st`` saves a
+    stat when the caller already has one.
+    """
+    info = get_trashinfo_cache().read(str(info_path), st)
+    if info is None:
+        return {'original_path': '', 'deletion_date': '', 'deletion_timestamp': None}
+    path = info.path
+    if path and not os.path.isabs(path):
+        topdir = trash_topdir(Path(info_path).parent.parent)
+        if topdir is not None:
+            path = str(topdir / path)
+    return {
+        'original_path': path,
+        'deletion_date': info.deletion_date,
+        'deletion_timestamp': info.deletion_timestamp
+    }
+
+
+def describe_item(entry: Path, info_dir: Path, size_cache: DirectorySizesCache,
+                  scanned: ScannedEntry = None) -> dict:
+    """Build the listing record for one entry of ``Trash/files``.
+
+    ``scanned`` is the entry as read by :mod:`.scan`; without it the entry
+    is scanned here. Raises FileNotFoundError if the entry is gone.
+    """
+    if scanned is None:
+        scanned = scan_entry(entry.parent, info_dir, entry.name)
+        if scanned is None:
+            raise FileNotFoundError(errno.ENOENT, 'No such file or directory', str(entry))
+    if scanned.info_st is not None:
+        metadata = parse_trashinfo(info_dir / f"{entry.name}.trashinfo", scanned.info_st)
+    else:
+        metadata = {'original_path': '', 'deletion_date': '', 'deletion_timestamp': None}
+
+    size = get_scanned_item_size(scanned, size_cache)
+
+    # For symlinks, check if target is dir without following broken links
+    is_symlink = scanned.is_symlink
+    is_dir = os.path.isdir(scanned.path) if is_symlink else scanned.is_dir
+
+    return {
+        'name': entry.name,
+        'trash_path': entry.name,
+        'original_path': metadata.get('original_path', ''),
+        'deletion_date': metadata['deletion_date'],
+        'deletion_timestamp': metadata['deletion_timestamp'],
+        'size': size,
+        'size_formatted': format_size(size),
+        'is_dir': is_dir,
+        'is_symlink': is_symlink
+    }
+
+
+def deletion_sort_key(item: dict) -> float:
+    """Sort key ordering items by deletion time, undated items first."""
+    timestamp = item.get('deletion_timestamp')
+    return float('-inf') if timestamp is None else timestamp
+
+
+def build_listing(items: list) -> dict:
+    """Wrap item records into the ``/list`` response shape."""
+    # Sort by deletion date (most recent first)
+    items = sorted(items, key=deletion_sort_key, reverse=True)
+    total_size = sum(item['size'] for item in items)
+    return {
+        'items': items,
+        'total_size': total_size,
+        'total_size_formatted': format_size(total_size),
+        'item_count': len(items)
+    }
+
+
+def list_trash(trash_dir: Path, stats: ScanStats = None) -> dict:
+    """List trash contents with metadata and sizes.
+
+    The system calls of the scan (not of sizing directories) are added to
+    ``stats`` when given.
+    """
+    files_dir = trash_dir / 'files'
+    info_dir = trash_dir / 'info'
+
+    size_cache = get_size_cache(trash_dir)
+    size_cache.load()
+
+    scan_stats = ScanStats()
+    items = []
+    for scanned in scan_trash(trash_dir, stats=scan_stats):
+        try:
+            items.append(describe_item(files_dir / scanned.name, info_dir, size_cache, scanned))
+        except (PermissionError, OSError):
+            continue
+    record_stats('list', scan_stats)
+    if stats is not None:
+        stats.add(scan_stats)
+
+    if files_dir.exists():
+        size_cache.prune(item['name'] for item in items)
+        size_cache.save()
+
+    return build_listing(items)
+
+
+SORT_KEYS = {
+    'name': lambda item: item['name'].lower(),
+    'deletion_date': deletion_sort_key,
+    'size': lambda item: item['size'],
+}
+
+
+def match_filter(item: dict, pattern: str) -> bool:
+    """Check an item's name and original path against a filter.
+
+    Patterns containing glob characters (``*``, ``?``, ``[``) are matched with
+    :mod:`fnmatch`, anything else is a substring match. Both are
+    case-insensitive.
+    """
+    pattern = pattern.lower()
+    candidates = (item['name'].lower(), item['original_path'].lower())
+    if any(c in pattern for c in '*?['):
+        return any(fnmatch.fnmatchcase(value, pattern) for value in candidates)
+    return any(pattern in value for value in candidates)
+
+
+def query_trash(listing: dict, sort: str = 'deletion_date', order: str = 'desc',
+                pattern: str = '', offset: int = 0, limit: int = None) -> dict:
+    """Filter, sort and paginate a :func:`list_trash` result.
+
+    Totals always describe the whole trash; ``filtered_count`` and
+    ``filtered_size`` describe the items matching ``pattern`` before paging.
+    """
+    if sort not in SORT_KEYS:
+        raise TrashError(f'Invalid sort key: {sort}', 400)
+    if order not in ('asc', 'desc'):
+        raise TrashError(f'Invalid sort order: {order}', 400)
+    if offset < 0 or (limit is not None and limit < 0):
+        raise TrashError('offset and limit must not be negative', 400)
+
+    items = listing['items']
+    if pattern:
+        items = [item for item in items if match_filter(item, pattern)]
+    # Name breaks ties so pages stay stable between requests
+    items = sorted(items, key=lambda item: item['name'])
+    items.sort(key=SORT_KEYS[sort], reverse=order == 'desc')
+
+    end = None if limit is None else offset + limit
+    return {
+        'items': items[offset:end],
+        'total_size': listing['total_size'],
+        'total_size_formatted': listing['total_size_formatted'],
+        'item_count': listing['item_count'],
+        'filtered_count': len(items),
+        'filtered_size': sum(item['size'] for item in items),
+        'offset': offset,
+        'limit': limit,
+        'version': listing.get('version'),
+        'volumes': listing.get('volumes', [])
+    }
+
+
+def delta_since(listing: dict, changed: set, removed: set, pattern: str = '') -> dict:
+    """Build a ``/list?since=`` response from changed and removed entry names.
+
+    Entries are identified by item ``id`` (see :class:`.index.TrashIndex`).
+    ``added`` holds the current records of new or modified entries matching
+    ``pattern``; ``removed`` lists every entry that left the trash.
+    """
+    added = [
+        item for item in listing['items']
+        if item.get('id', item['name']) in changed and (not pattern or match_filter(item, pattern))
+    ]
+    return {
+        'full': False,
+        'added': added,
+        'removed': sorted(removed),
+        'total_size': listing['total_size'],
+        'total_size_formatted': listing['total_size_formatted'],
+        'item_count': listing['item_count'],
+        'version': listing.get('version')
+    }
+
+
+class CrossDeviceError(TrashError):
+    """A restore needs a copy because the destination is on another filesystem."""
+
+    def __init__(self, message: str = 'Destination is on a different filesystem'):
+        super().__init__(message, 409)
+
+
+def resolve_sub_path(files_dir: Path, trash_path: str, sub_path: str = '') -> Path:
+    """Return ``files/<trash_path>/<sub_path>``, refusing paths that leave the item.
+
+    Every intermediate component must be a real directory, so a symlink
+    inside a trashed tree can never redirect an operation elsewhere. The
+    final component may be a symlink; it is then acted on, not followed.
+    """
+    parts = [part for part in sub_path.split('/') if part]
+    if trash_path in ('', '.', '..') or '/' in trash_path or any(part in ('.', '..') for part in parts):
+        raise TrashError('Invalid trash path', 400)
+
+    target = files_dir / trash_path
+    for part in parts:
+        try:
+            is_dir = stat.S_ISDIR(os.lstat(target).st_mode)
+        except OSError:
+            raise TrashError('Item not found in trash', 404)
+        if not is_dir:
+            raise TrashError(f'Not a directory: {target.relative_to(files_dir)}', 400)
+        target = target / part
+    if not target.exists() and not target.is_symlink():
+        raise TrashError('Item not found in trash', 404)
+    return target
+
+
+def restore_item(trash_dir: Path, trash_path: str, job=None, allow_copy: bool = True,
+                 sub_path: str = '') -> dict:
+    """Move a trashed item, or the ``sub_path`` inside a trashed directory,
+    back to its original location.
+
+    The item is renamed into place, which is atomic. When the destination is
+    on another filesystem it is copied instead (see :mod:`.transfer`) to a
+    temporary name next to the destination, verified, renamed into place,
+    and only then removed from the trash. With ``allow_copy=False`` that case
+    raises :class:`CrossDeviceError` so the caller can run the copy as a
+    background ``job``, which reports bytes copied and can be cancelled.
+    """
+    files_dir = trash_dir / 'files'
+    info_dir = trash_dir / 'info'
+
+    source = resolve_sub_path(files_dir, trash_path, sub_path)
+    info_file = info_dir / f"{trash_path}.trashinfo"
+
+    # Get original path from trashinfo
+    metadata = parse_trashinfo(info_file)
+    original_path = metadata.get('original_path', '')
+
+    if not original_path:
+        raise TrashError('Cannot determine original path', 400)
+
+    dest = Path(original_path).joinpath(*(part for part in sub_path.split('/') if part))
+
+    # Check if destination already exists
+    if dest.exists() or dest.is_symlink():
+        raise TrashError(f'Destination already exists: {dest}', 409)
+
+    result = {'success': True, 'restored_to': str(dest)}
+    try:
+        # Ensure parent directory exists
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.rename(source, dest)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            if not allow_copy:
+                raise CrossDeviceError() from e
+            copied = _restore_by_copy(source, dest, job)
+            if copied is None:
+                return {'success': False, 'cancelled': True}
+            result['bytes_copied'] = copied
+        # The trashinfo belongs to the whole item, which a sub-path leaves behind
+        if not sub_path and info_file.exists():
+            info_file.unlink()
+    except TrashError:
+        raise
+    except Exception as e:
+        raise TrashError(str(e)) from e
+
+    forget_sizes(trash_dir, trash_path, source)
+    return result
+
+
+def forget_sizes(trash_dir: Path, trash_path: str, removed: Path) -> None:
+    """Drop cached sizes made stale by removing ``removed`` from an item."""
+    size_cache = get_size_cache(trash_dir)
+    size_cache.load()
+    size_cache.discard(trash_path)
+    size_cache.save()
+    get_subtree_cache().invalidate(str(removed))
+
+
+def _restore_by_copy(source: Path, dest: Path, job=None):
+    """Copy ``source`` to ``dest`` across filesystems, then remove ``source``.
+
+    Returns the bytes copied, or None if ``job`` was cancelled, in which case
+    the partial copy is removed and the trashed item is left untouched. Once
+    the copy is in place the restore has succeeded: failing to remove
+    ``source`` is logged and reported to ``job``, not raised.
+    """
+    staging = dest.with_name(f'.{dest.name}.restore-{uuid.uuid4().hex[:8]}')
+    copied = 0
+
+    def progress(nbytes: int) -> None:
+        nonlocal copied
+        copied += nbytes
+        if job is not None:
+            job.add_progress(0, nbytes)
+
+    if job is not None:
+        job.set_totals(1, tree_size(source))
+    try:
+        copy_tree(source, staging, progress, lambda: job is not None and job.cancelled)
+        verify_copy(source, staging)
+        if dest.exists() or dest.is_symlink():
+            raise TrashError(f'Destination already exists: {dest}', 409)
+        os.rename(staging, dest)
+    except CopyCancelled:
+        _discard(staging)
+        return None
+    except BaseException:
+        _discard(staging)
+        raise
+
+    # The restored copy is in place; the trashed original can go
+    try:
+        remove_entry(source)
+    except OSError as e:
+        message = f'Restored to {dest}, but could not remove {source} from the trash: {e}'
+        logging.getLogger(__name__).warning(message)
+        if job is not None:
+            job.add_error(message)
+    if job is not None:
+        job.add_progress(1, 0)
+    return copied
+
+
+def _discard(path: Path) -> None:
+    if path.exists() or path.is_symlink():
+        try:
+            remove_entry(path)
+        except OSError:
+            pass
+
+
+def remove_entry(path: Path, parallel: bool = True) -> None:
+    """Permanently remove a trashed file or directory.
+
+    Symlinks are unlinked, never followed; directories are removed by the
+    parallel engine in :mod:`.deletion`, on one thread unless ``parallel``.
+    """
+    get_remover().remove(path, parallel)
+
+
+def delete_item(trash_dir: Path, trash_path: str, sub_path: str = '',
+                parallel: bool = True) -> dict:
+    """Permanently delete a single item and its trashinfo, or only the
+    ``sub_path`` inside a trashed directory."""
+    files_dir = trash_dir / 'files'
+    info_dir = trash_dir / 'info'
+
+    target = resolve_sub_path(files_dir, trash_path, sub_path)
+    info_file = info_dir / f"{trash_path}.trashinfo"
+
+    try:
+        remove_entry(target, parallel)
+        if not sub_path and info_file.exists():
+            info_file.unlink()
+    except Exception as e:
+        raise TrashError(str(e)) from e
+
+    forget_sizes(trash_dir, trash_path, target)
+    return {'success': True}
+
+
+def empty_trash(trash_dir: Path, job=None, sizes: dict = None) -> dict:
+    """Permanently delete every item in the trash.
+
+    When run as a background ``job`` (see :mod:`.jobs`), progress is reported
+    per item using the known ``sizes`` (entry name to bytes) and the job can
+    be cancelled between items; entries not yet reached are left intact.
+    """
+    return empty_volumes([trash_dir], job=job, sizes={trash_dir: sizes or {}})
+
+
+def empty_volumes(trash_dirs: list, job=None, sizes: dict = None) -> dict:
+    """Permanently delete every item of several trash directories.
+
+    ``sizes`` maps each trash directory to its entry sizes, as for
+    :func:`empty_trash`; job totals cover all directories up front.
+    """
+    sizes = sizes or {}
+    entries = {}
+    for trash_dir in trash_dirs:
+        files_dir = trash_dir / 'files'
+        entries[trash_dir] = list(files_dir.iterdir()) if files_dir.exists() else []
+    if job is not None:
+        job.set_totals(
+            sum(len(items) for items in entries.values()),
+            sum(sizes.get(trash_dir, {}).get(entry.name, 0)
+                for trash_dir, items in entries.items() for entry in items)
+        )
+
+    deleted_count = 0
+    errors = []
+    cancelled = False
+    for trash_dir in trash_dirs:
+        deleted, cancelled = _empty_entries(
+            trash_dir, entries[trash_dir], job, sizes.get(trash_dir, {}), errors
+        )
+        deleted_count += deleted
+        if cancelled:
+            break
+
+    result = {
+        'success': not errors and not cancelled,
+        'deleted_count': deleted_count
+    }
+    if errors:
+        result['errors'] = errors
+    if cancelled:
+        result['cancelled'] = True
+    return result
+
+
+def _empty_entries(trash_dir: Path, entries: list, job, sizes: dict, errors: list):
+    """Delete ``entries`` of one trash; returns ``(deleted_count, cancelled)``."""
+    info_dir = trash_dir / 'info'
+    files_dir = trash_dir / 'files'
+    deleted_count = 0
+    cancelled = False
+
+    # Delete all files in trash, each followed by its trashinfo
+    for entry in entries:
+        if job is not None and job.cancelled:
+            cancelled = True
+            break
+        freed = 0
+        try:
+            remove_entry(entry)
+            deleted_count += 1
+            freed = sizes.get(entry.name, 0)
+            info_file = info_dir / f"{entry.name}.trashinfo"
+            if info_file.exists():
+                info_file.unlink()
+        except Exception as e:
+            errors.append(f"{entry.name}: {str(e)}")
+            if job is not None:
+                job.add_error(errors[-1])
+        if job is not None:
+            # Only bytes actually reclaimed count as done
+            job.add_progress(1, freed)
+
+    # Delete the trashinfo files left without an item, but keep those of
+    # items that could not be deleted so they stay restorable
+    remaining = [entry.name for entry in files_dir.iterdir()] if files_dir.exists() else []
+    if info_dir.exists() and not cancelled:
+        keep = {f"{name}.trashinfo" for name in remaining}
+        for entry in list(info_dir.iterdir()):
+            if entry.name in keep:
+                continue
+            try:
+                entry.unlink()
+            except Exception:
+                pass
+
+    # Keep cached sizes only for entries that could not be deleted
+    size_cache = get_size_cache(trash_dir)
+    size_cache.load()
+    size_cache.prune(remaining)
+    size_cache.save()
+    return deleted_count, cancelled
+
+
+def delete_items(trash_dir: Path, trash_paths: list, job=None, sizes: dict = None,
+                 max_rate: float = 0) -> dict:
+    """Permanently delete several items, reporting progress to ``job``.
+
+    ``max_rate`` caps deletions per second (0 for no limit) so a large purge
+    does not monopolize shared storage. It counts items, not the files in
+    them, so a throttled purge removes each directory on one thread rather
+    than fanning out.
+    """
+    sizes = sizes or {}
+    if job is not None:
+        job.set_totals(len(trash_paths), sum(sizes.get(path, 0) for path in trash_paths))
+
+    interval = 1.0 / max_rate if max_rate > 0 else 0
+    next_start = time.monotonic()
+    results = []
+    for trash_path in trash_paths:
+        if interval:
+            delay = next_start - time.monotonic()
+            if delay > 0 and job is not None and job.wait_cancelled(delay):
+                break
+            if delay > 0 and job is None:
+                time.sleep(delay)
+            next_start = max(next_start, time.monotonic()) + interval
+        if job is not None and job.cancelled:
+            break
+        try:
+            results.append({'trash_path': trash_path,
+                            **delete_item(trash_dir, trash_path, parallel=not interval)})
+        except TrashError as e:
+            results.append({'trash_path': trash_path, 'success': False,
+                            'error': str(e), 'status': e.status_code})
+            if job is not None:
+                job.add_error(f"{trash_path}: {e}")
+        if job is not None:
+            job.add_progress(1, sizes.get(trash_path, 0) if results[-1]['success'] else 0)
+
+    success_count = sum(1 for result in results if result['success'])
+    return {
+        'results': results,
+        'success_count': success_count,
+        'error_count': len(results) - success_count,
+        'cancelled': len(results) < len(trash_paths)
+    }
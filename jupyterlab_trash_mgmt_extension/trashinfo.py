@@ -0,0 +1,141 @@
+"""Parsing of ``.trashinfo`` files.
+
+The format is fixed by the Trash specification::
+
+    [Trash Info]
+    Path=/percent/encoded/original%20path
+    DeletionDate=2024-01-15T10:30:00
+
+so a single pass over the raw bytes is enough; a general INI parser would
+cost more than everything else done per listed item. Parsed files are
+memoized by path and validated against their inode, mtime and size, since
+``.trashinfo`` files are written once and never edited in place.
+"""
+
+import collections
+import datetime
+import os
+import threading
+import urllib.parse
+from typing import NamedTuple, Optional, Tuple
+
+from .metrics import record_cache_lookup, record_scan
+
+SECTION = b'[trash info]'
+
+
+class TrashInfo(NamedTuple):
+    """Parsed contents of one ``.trashinfo`` file."""
+
+    path: str
+    deletion_date: str
+    # Seconds since the epoch, or None when the date is missing or malformed
+    deletion_timestamp: Optional[float]
+
+
+EMPTY = TrashInfo('', '', None)
+
+
+def parse_deletion_date(value: str) -> Optional[datetime.datetime]:
+    """Parse a ``DeletionDate`` (local time, ``YYYY-MM-DDThh:mm:ss``)."""
+    try:
+        date = datetime.datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    # The spec uses local time; drop any offset some tools add anyway
+    return date.astimezone().replace(tzinfo=None) if date.tzinfo else date
+
+
+def parse_trashinfo_bytes(data: bytes) -> TrashInfo:
+    """Parse the raw contents of a ``.trashinfo`` file.
+
+    Keys are only read inside the ``[Trash Info]`` section and matched
+    case-insensitively; the first occurrence wins. Anything unparseable
+    yields empty fields rather than an error. ``path`` is percent-decoded
+    but not resolved.
+    """
+    path = date = None
+    in_section = False
+    for line in data.splitlines():
+        line = line.strip()
+        if not line or line[:1] in (b'#', b';'):
+            continue
+        if line[:1] == b'[':
+            if in_section:
+                break
+            in_section = line.lower() == SECTION
+            continue
+        if not in_section:
+            continue
+        key, sep, value = line.partition(b'=')
+        if not sep:
+            continue
+        key = key.strip().lower()
+        if key == b'path' and path is None:
+            path = value.strip()
+        elif key == b'deletiondate' and date is None:
+            date = value.strip()
+
+    if path is None and date is None:
+        return EMPTY
+    decoded_path = os.fsdecode(urllib.parse.unquote_to_bytes(path)) if path else ''
+    decoded_date = date.decode('ascii', 'replace') if date else ''
+    parsed_date = parse_deletion_date(decoded_date)
+    timestamp = parsed_date.timestamp() if parsed_date is not None else None
+    return TrashInfo(decoded_path, decoded_date, timestamp)
+
+
+class TrashInfoCache:
+    """Memoized :func:`parse_trashinfo_bytes` results, keyed on file path.
+
+    Entries are reused while the file's inode, mtime and size are unchanged.
+    At most ``max_entries`` entries are kept, least recently used first out.
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._entries: 'collections.OrderedDict[str, Tuple[Tuple[int, int, int], TrashInfo]]' = \
+            collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def read(self, path: str, st: Optional[os.stat_result] = None) -> Optional[TrashInfo]:
+        """Return the parsed file at ``path``, or None if it cannot be read.
+
+        ``st`` is the file's stat result when the caller already has it.
+        """
+        if st is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            record_scan('trashinfo', 0, 1)
+        validator = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            hit = entry is not None and entry[0] == validator
+            if hit:
+                self._entries.move_to_end(path)
+        record_cache_lookup('trashinfo', hit)
+        if hit:
+            return entry[1]
+
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        info = parse_trashinfo_bytes(data)
+        with self._lock:
+            self._entries[path] = (validator, info)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return info
+
+
+_cache = TrashInfoCache()
+
+
+def get_trashinfo_cache() -> TrashInfoCache:
+    """Return the process-wide ``.trashinfo`` cache."""
+    return _cache
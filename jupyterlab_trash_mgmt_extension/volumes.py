@@ -0,0 +1,147 @@
+"""Discovery of the per-volume trash directories of mounted filesystems.
+
+The FreeDesktop trash specification keeps files deleted on a mount other
+than the one holding ``$XDG_DATA_HOME`` in a trash at the top of that mount:
+``$topdir/.Trash/$uid`` (when ``$topdir/.Trash`` is a sticky, non-symlink
+directory shared by all users) or ``$topdir/.Trash-$uid``. Their
+``.trashinfo`` paths are relative to ``$topdir``.
+"""
+
+import hashlib
+import logging
+import os
+import stat
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+HOME_VOLUME = 'home'
+
+MOUNTS_FILE = '/proc/self/mounts'
+
+# Kernel and virtual filesystems that never hold user files
+PSEUDO_FILESYSTEMS = frozenset({
+    'autofs', 'binfmt_misc', 'bpf', 'cgroup', 'cgroup2', 'configfs', 'debugfs',
+    'devpts', 'devtmpfs', 'efivarfs', 'fusectl', 'hugetlbfs', 'mqueue', 'nsfs',
+    'proc', 'pstore', 'ramfs', 'rpc_pipefs', 'securityfs', 'selinuxfs',
+    'squashfs', 'sysfs', 'tracefs'
+})
+
+
+class TrashVolume(NamedTuple):
+    """One trash directory and the mount it belongs to."""
+
+    id: str
+    trash_dir: Path
+    topdir: Optional[Path]
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'trash_dir': str(self.trash_dir),
+            'topdir': str(self.topdir) if self.topdir is not None else None
+        }
+
+
+def volume_id(trash_dir: Path) -> str:
+    """Return a short stable identifier for a volume trash directory."""
+    return hashlib.blake2b(os.fsencode(str(trash_dir)), digest_size=6).hexdigest()
+
+
+def trash_topdir(trash_dir: Path) -> Optional[Path]:
+    """Return ``$topdir`` for a volume trash directory, or None for the home trash."""
+    trash_dir = Path(trash_dir)
+    if trash_dir.name.startswith('.Trash-'):
+        return trash_dir.parent
+    if trash_dir.parent.name == '.Trash':
+        return trash_dir.parent.parent
+    return None
+
+
+def _unescape_mount_field(field: str) -> str:
+    # /proc/mounts escapes space, tab, newline and backslash as octal
+    return (field.replace('\\040', ' ').replace('\\011', '\t')
+            .replace('\\012', '\n').replace('\\134', '\\'))
+
+
+def read_mount_points(mounts_file: str = MOUNTS_FILE) -> List[Path]:
+    """Return the mount points of real filesystems, or [] where unavailable."""
+    try:
+        with open(mounts_file, encoding='utf-8', errors='surrogateescape') as f:
+            lines = f.readlines()
+    except OSError:
+        return []
+    mount_points = []
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 3 or fields[2] in PSEUDO_FILESYSTEMS:
+            continue
+        mount_points.append(Path(_unescape_mount_field(fields[1])))
+    return list(dict.fromkeys(mount_points))
+
+
+def _user_trash_dir(path: Path, uid: int, log: logging.Logger) -> bool:
+    """Whether ``path`` is a real directory owned by ``uid``.
+
+    On a mount shared between users anyone can create ``.Trash-$uid`` for
+    someone else; its items would then be listed and restored as theirs.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISDIR(st.st_mode):
+        log.warning('Ignoring trash directory %s: not a directory', path)
+        return False
+    if st.st_uid != uid:
+        log.warning('Ignoring trash directory %s: owned by uid %d, not %d', path, st.st_uid, uid)
+        return False
+    return True
+
+
+def find_volume_trashes(topdir: Path, uid: int, log: Optional[logging.Logger] = None) -> List[Path]:
+    """Return the existing trash directories of the mount at ``topdir``.
+
+    Only directories the spec allows are returned: a shared ``.Trash`` must
+    be a real directory with the sticky bit set, and the user's trash
+    directories must be real directories owned by ``uid``.
+    """
+    log = log or logging.getLogger(__name__)
+    found = []
+    shared = topdir / '.Trash'
+    try:
+        st = os.lstat(shared)
+    except OSError:
+        st = None
+    if st is not None and stat.S_ISDIR(st.st_mode) and st.st_mode & stat.S_ISVTX:
+        user_trash = shared / str(uid)
+        if _user_trash_dir(user_trash, uid, log):
+            found.append(user_trash)
+    private = topdir / f'.Trash-{uid}'
+    if _user_trash_dir(private, uid, log):
+        found.append(private)
+    return found
+
+
+def build_volumes(home_trash: Path, found: List[Path]) -> List[TrashVolume]:
+    """Combine the home trash with discovered volume trashes, dropping duplicates.
+
+    Bind mounts expose the same directory several times; entries are
+    deduplicated by device and inode.
+    """
+    volumes = [TrashVolume(HOME_VOLUME, Path(home_trash), None)]
+    seen = set()
+    try:
+        st = os.stat(home_trash)
+        seen.add((st.st_dev, st.st_ino))
+    except OSError:
+        pass
+    for trash_dir in found:
+        try:
+            st = os.stat(trash_dir)
+        except OSError:
+            continue
+        if (st.st_dev, st.st_ino) in seen:
+            continue
+        seen.add((st.st_dev, st.st_ino))
+        volumes.append(TrashVolume(volume_id(trash_dir), trash_dir, trash_topdir(trash_dir)))
+    return volumes
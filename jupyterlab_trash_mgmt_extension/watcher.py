@@ -0,0 +1,230 @@
+"""Change notification for the ``files/`` and ``info/`` trash subdirectories.
+
+:class:`InotifyWatcher` uses Linux inotify through ``ctypes`` and is driven by
+the Tornado IOLoop, so no extra thread is needed. Where inotify is not
+available (other platforms, exhausted watch limits, or directories that do
+not exist yet) :class:`PollingWatcher` checks the directory mtimes on a timer,
+statting on an executor thread so a slow filesystem cannot stall the IOLoop.
+
+Both report changes through ``callback(name)`` where ``name`` is the trashed
+entry name (``.trashinfo`` suffix stripped), or ``None`` when the whole trash
+must be rescanned.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from tornado.ioloop import IOLoop, PeriodicCallback
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+
+WATCH_MASK = (
+    IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+    | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+INFO_SUFFIX = '.trashinfo'
+
+ChangeCallback = Callable[[Optional[str]], None]
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        name = ctypes.util.find_library('c')
+        if not name:
+            raise OSError(errno.ENOSYS, 'libc not found')
+        libc = ctypes.CDLL(name, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, 'inotify is not supported')
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        _libc = libc
+    return _libc
+
+
+def read_dir_signature(trash_dir: Path) -> tuple:
+    """Return ``(inode, mtime_ns)`` of ``files/`` and ``info/`` (None if missing).
+
+    Creating, removing or renaming a trashed entry changes the signature.
+    """
+    signature = []
+    for subdir in ('files', 'info'):
+        try:
+            st = os.stat(Path(trash_dir) / subdir)
+            signature.append((st.st_ino, st.st_mtime_ns))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class InotifyWatcher:
+    """Watch ``files/`` and ``info/`` with inotify on the current IOLoop."""
+
+    def __init__(self, trash_dir: Path, callback: ChangeCallback):
+        self.trash_dir = Path(trash_dir)
+        self.callback = callback
+        self._fd = -1
+        self._watches: Dict[int, str] = {}
+
+    def start(self) -> None:
+        """Create the inotify instance and register it with the IOLoop.
+
+        Raises OSError when inotify is unavailable or a directory is missing.
+        """
+        libc = _load_libc()
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._fd = fd
+        try:
+            for subdir in ('files', 'info'):
+                path = os.fsencode(self.trash_dir / subdir)
+                wd = libc.inotify_add_watch(fd, path, WATCH_MASK)
+                if wd < 0:
+                    err = ctypes.get_errno()
+                    raise OSError(err, os.strerror(err), os.fsdecode(path))
+                self._watches[wd] = subdir
+            IOLoop.current().add_handler(fd, self._handle_events, IOLoop.READ)
+        except Exception:
+            self._close_fd()
+            raise
+
+    @property
+    def active(self) -> bool:
+        return self._fd >= 0
+
+    def stop(self) -> None:
+        if self._fd >= 0:
+            try:
+                IOLoop.current().remove_handler(self._fd)
+            except Exception:
+                pass
+            self._close_fd()
+
+    def _close_fd(self) -> None:
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+        self._fd = -1
+        self._watches.clear()
+
+    def _handle_events(self, fd, events) -> None:
+        try:
+            data = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        except OSError:
+            self.callback(None)
+            return
+
+        names = set()
+        rescan = False
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            raw_name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+
+            if mask & (IN_Q_OVERFLOW | IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                rescan = True
+                continue
+            subdir = self._watches.get(wd)
+            if subdir is None or not raw_name:
+                continue
+            name = os.fsdecode(raw_name)
+            if subdir == 'info':
+                if not name.endswith(INFO_SUFFIX):
+                    continue
+                name = name[:-len(INFO_SUFFIX)]
+            names.add(name)
+
+        if rescan:
+            # The watched directories went away or events were lost
+            self.stop()
+            self.callback(None)
+            return
+        for name in names:
+            self.callback(name)
+
+
+class PollingWatcher:
+    """Detect changes by polling the mtimes of ``files/`` and ``info/``.
+
+    The directories are statted on ``executor`` (the IOLoop's default executor
+    when None); the signature is compared and the callback run on the IOLoop.
+    """
+
+    def __init__(self, trash_dir: Path, callback: ChangeCallback, interval: float = 5.0,
+                 executor: Optional[Executor] = None):
+        self.trash_dir = Path(trash_dir)
+        self.callback = callback
+        self.interval = interval
+        self.executor = executor
+        self._signature = read_dir_signature(self.trash_dir)
+        self._periodic: Optional[PeriodicCallback] = None
+
+    def start(self) -> None:
+        self._periodic = PeriodicCallback(self._poll, self.interval * 1000)
+        self._periodic.start()
+
+    @property
+    def active(self) -> bool:
+        return self._periodic is not None
+
+    def stop(self) -> None:
+        if self._periodic is not None:
+            self._periodic.stop()
+            self._periodic = None
+
+    async def _poll(self) -> None:
+        signature = await IOLoop.current().run_in_executor(
+            self.executor, read_dir_signature, self.trash_dir
+        )
+        if signature != self._signature:
+            self._signature = signature
+            self.callback(None)
+
+
+def start_watcher(trash_dir: Path, callback: ChangeCallback, poll_interval: float = 5.0,
+                  use_inotify: bool = True, log=None, executor: Optional[Executor] = None):
+    """Start an inotify watcher, falling back to polling when it is unavailable.
+
+    ``executor`` runs the polling watcher's stat calls.
+    """
+    if use_inotify:
+        watcher = InotifyWatcher(trash_dir, callback)
+        try:
+            watcher.start()
+            return watcher
+        except (OSError, AttributeError) as e:
+            if log is not None:
+                log.debug(f"inotify unavailable for {trash_dir} ({e}), polling every {poll_interval}s")
+    watcher = PollingWatcher(trash_dir, callback, poll_interval, executor)
+    watcher.start()
+    return watcher
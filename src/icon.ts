@@ -24,6 +24,10 @@ const REFRESH_SVG = `<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24"
   <path class="jp-icon3" fill="#616161" d="M17.65 6.35C16.2 4.9 14.21 4 12 4c-4.42 0-7.99 3.58-7.99 8s3.57 8 7.99 8c3.73 0 6.84-2.55 7.73-6h-2.08c-.82 2.33-3.04 4-5.65 4-3.31 0-6-2.69-6-6s2.69-6 6-6c1.66 0 3.14.69 4.22 1.78L13 11h7V4l-2.35 2.35z"/>
 </svg>`;
 
+const CHART_SVG = `<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" width="16" height="16">
+  <path class="jp-icon3" fill="#616161" d="M5 9.2h3V19H5V9.2zM10.6 5h2.8v14h-2.8V5zm5.6 8H19v6h-2.8v-6z"/>
+</svg>`;
+
 export const trashIcon = new LabIcon({
   name: 'trash-mgmt:trash',
   svgstr: TRASH_SVG
@@ -53,3 +57,8 @@ export const refreshIcon = new LabIcon({
   name: 'trash-mgmt:refresh',
   svgstr: REFRESH_SVG
 });
+
+export const chartIcon = new LabIcon({
+  name: 'trash-mgmt:chart',
+  svgstr: CHART_SVG
+});
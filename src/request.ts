@@ -2,9 +2,18 @@ import { URLExt } from '@jupyterlab/coreutils';
 
 import { ServerConnection } from '@jupyterlab/services';
 
+// Maximum number of GET responses kept for ETag revalidation
+const ETAG_CACHE_SIZE = 20;
+
+// Last ETag and parsed body per GET URL, oldest first
+const etagCache = new Map<string, { etag: string; data: any }>();
+
 /**
  * Call the server extension
  *
+ * GET responses carrying an ETag are remembered and revalidated with
+ * `If-None-Match`; a `304 Not Modified` resolves to the remembered body.
+ *
  * @param endPoint API REST end point for the extension
  * @param init Initial values for the request
  * @returns The response body interpreted as JSON
@@ -21,6 +30,14 @@ export async function requestAPI<T>(
     endPoint
   );
 
+  const isGet = (init.method ?? 'GET').toUpperCase() === 'GET';
+  const cached = isGet ? etagCache.get(requestUrl) : undefined;
+  if (cached) {
+    const headers = new Headers(init.headers);
+    headers.set('If-None-Match', cached.etag);
+    init = { ...init, headers };
+  }
+
   let response: Response;
   try {
     response = await ServerConnection.makeRequest(requestUrl, init, settings);
@@ -28,6 +45,13 @@ export async function requestAPI<T>(
     throw new ServerConnection.NetworkError(error as any);
   }
 
+  if (cached && response.status === 304) {
+    // Refresh the entry's position so it is evicted last
+    etagCache.delete(requestUrl);
+    etagCache.set(requestUrl, cached);
+    return cached.data;
+  }
+
   let data: any = await response.text();
 
   if (data.length > 0) {
@@ -45,9 +69,89 @@ export async function requestAPI<T>(
     );
   }
 
+  const etag = response.headers.get('ETag');
+  if (isGet && etag) {
+    etagCache.delete(requestUrl);
+    etagCache.set(requestUrl, { etag, data });
+    if (etagCache.size > ETAG_CACHE_SIZE) {
+      etagCache.delete(etagCache.keys().next().value as string);
+    }
+  }
+
   return data;
 }
 
+/**
+ * Call a server extension end point answering newline-delimited JSON
+ *
+ * Each record is parsed and passed to `onRecord` as soon as its line has
+ * arrived, so a large response can be shown before it is complete.
+ *
+ * @param endPoint API REST end point for the extension
+ * @param onRecord Called with each parsed record, in order
+ * @param init Initial values for the request
+ */
+export async function requestNDJSON<T>(
+  endPoint: string,
+  onRecord: (record: T) => void,
+  init: RequestInit = {}
+): Promise<void> {
+  const settings = ServerConnection.makeSettings();
+  const requestUrl = URLExt.join(
+    settings.baseUrl,
+    'jupyterlab-trash-mgmt-extension',
+    endPoint
+  );
+
+  let response: Response;
+  try {
+    response = await ServerConnection.makeRequest(requestUrl, init, settings);
+  } catch (error) {
+    throw new ServerConnection.NetworkError(error as any);
+  }
+
+  if (!response.ok) {
+    let message = await response.text();
+    try {
+      const data = JSON.parse(message);
+      message = data.message || data.error || message;
+    } catch (error) {
+      console.log('Not a JSON response body.', response);
+    }
+    throw new ServerConnection.ResponseError(response, message);
+  }
+
+  let buffer = '';
+  const emitLines = (final: boolean): void => {
+    const lines = buffer.split('\n');
+    // Keep a trailing partial line until the rest of it arrives
+    buffer = final ? '' : (lines.pop() as string);
+    for (const line of lines) {
+      if (line.trim()) {
+        onRecord(JSON.parse(line));
+      }
+    }
+  };
+
+  if (!response.body) {
+    buffer = await response.text();
+    emitLines(true);
+    return;
+  }
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true });
+    emitLines(false);
+  }
+  buffer += decoder.decode();
+  emitLines(true);
+}
+
 /**
  * Check if trash functionality is enabled on the server
  *
@@ -63,3 +167,33 @@ export async function isTrashEnabled(): Promise<boolean> {
     return true;
   }
 }
+
+/**
+ * Open the server extension's trash events WebSocket
+ *
+ * @param onMessage Called with each parsed JSON message
+ * @returns The WebSocket, already connecting
+ */
+export function connectTrashEvents<T>(
+  onMessage: (message: T) => void
+): WebSocket {
+  const settings = ServerConnection.makeSettings();
+  let url = URLExt.join(
+    settings.wsUrl,
+    'jupyterlab-trash-mgmt-extension',
+    'events'
+  );
+  if (settings.token) {
+    url += `?token=${encodeURIComponent(settings.token)}`;
+  }
+
+  const socket = new settings.WebSocket(url);
+  socket.onmessage = (event: MessageEvent) => {
+    try {
+      onMessage(JSON.parse(event.data));
+    } catch (error) {
+      console.warn('Invalid trash event message:', error);
+    }
+  };
+  return socket;
+}
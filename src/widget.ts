@@ -8,20 +8,65 @@ import {
 import { Menu } from '@lumino/widgets';
 import { CommandRegistry } from '@lumino/commands';
 import { Message } from '@lumino/messaging';
-import { requestAPI } from './request';
-import { trashIcon, folderIcon, fileIcon, refreshIcon } from './icon';
-
-// Auto-refresh interval: 1/6 minute = 10 seconds
+import { connectTrashEvents, requestAPI, requestNDJSON } from './request';
+import {
+  trashIcon,
+  folderIcon,
+  fileIcon,
+  refreshIcon,
+  chartIcon,
+  restoreIcon,
+  deleteIcon
+} from './icon';
+
+// Polling interval, used only while the events socket is unavailable: 10 seconds
 const REFRESH_INTERVAL_MS = 10000;
 
+// Delay before reconnecting a dropped events socket
+const RECONNECT_DELAY_MS = 30000;
+
+// Number of items requested per page from the server
+const PAGE_SIZE = 200;
+
+// Load the next page when scrolled within this many pixels of the bottom
+const LOAD_MORE_THRESHOLD_PX = 200;
+
+// Height of a list row in pixels; must match .jp-TrashPanel-item in base.css
+const ROW_HEIGHT = 22;
+
+// Rows rendered above and below the visible window
+const OVERSCAN_ROWS = 10;
+
+// Delay before a filter change is sent to the server
+const FILTER_DEBOUNCE_MS = 300;
+
+// Number of largest items and groups shown in the reclaim space view
+const RECLAIM_TOP_ITEMS = 20;
+const RECLAIM_TOP_GROUPS = 10;
+
+// Delay after a selection change before the selected file is previewed
+const PREVIEW_DELAY_MS = 250;
+
+// Notebook cells shown in a preview
+const PREVIEW_CELLS = 3;
+
+// Polling interval for the status of a background job
+const JOB_POLL_INTERVAL_MS = 500;
+
 interface ITrashItem {
+  // Unique across volumes; trash_path is only unique within a volume
+  id: string;
+  volume: string;
   name: string;
   trash_path: string;
   original_path: string;
   deletion_date: string;
+  // Seconds since the epoch; null when the date is missing or malformed
+  deletion_timestamp: number | null;
   size: number;
   size_formatted: string;
   is_dir: boolean;
+  is_symlink: boolean;
 }
 
 interface ITrashListResponse {
@@ -29,28 +74,200 @@ interface ITrashListResponse {
   total_size: number;
   total_size_formatted: string;
   item_count: number;
+  filtered_count: number;
+  filtered_size: number;
+  offset: number;
+  limit: number | null;
+  version: string;
+  volumes: ITrashVolume[];
+  full?: boolean;
+}
+
+/**
+ * Record of `list?format=ndjson`: an item, or the totals closing the stream.
+ */
+type TrashListRecord =
+  | ITrashItem
+  | { summary: Omit<ITrashListResponse, 'items'> };
+
+interface ITrashVolume {
+  id: string;
+  trash_dir: string;
+  topdir: string | null;
+  item_count: number;
+  total_size: number;
+}
+
+interface ITrashDelta {
+  added: ITrashItem[];
+  removed: string[];
+  total_size: number;
+  total_size_formatted: string;
+  item_count: number;
+  version: string;
+}
+
+/**
+ * Response of `preview?format=summary`.
+ */
+interface IPreviewSummary {
+  kind: 'notebook' | 'text' | 'binary';
+  size: number;
+  size_formatted: string;
+  // kind === 'text'
+  text?: string;
+  truncated?: boolean;
+  // kind === 'notebook'
+  cells?: {
+    cell_type: string;
+    source: string;
+    truncated: boolean;
+    execution_count?: number | null;
+  }[];
+  more_cells?: boolean;
 }
 
+interface IJobStatus {
+  job_id: string;
+  kind: string;
+  status: 'pending' | 'running' | 'completed' | 'failed' | 'cancelled';
+  items_total: number;
+  items_done: number;
+  bytes_total: number;
+  bytes_done: number;
+  bytes_total_formatted: string;
+  bytes_done_formatted: string;
+  errors: string[];
+  result: { deleted_count?: number; errors?: string[] } | null;
+  error: string | null;
+  cancel_requested: boolean;
+}
+
+/**
+ * Messages pushed on the events socket.
+ */
+type ITrashEvent =
+  | (ITrashDelta & { type: 'delta' })
+  | (IJobStatus & { type: 'job' });
+
+interface IBrowseChild {
+  name: string;
+  // Relative to the trashed item; passed back as `sub_path`
+  path: string;
+  is_dir: boolean;
+  is_symlink: boolean;
+  size: number;
+  size_formatted: string;
+}
+
+interface IBrowseResponse {
+  trash_path: string;
+  path: string;
+  children: IBrowseChild[];
+}
+
+interface ISizeGroup {
+  count: number;
+  size: number;
+  size_formatted: string;
+}
+
+interface ITrashAnalytics {
+  largest: ITrashItem[];
+  by_directory: (ISizeGroup & { directory: string })[];
+  by_extension: (ISizeGroup & { extension: string })[];
+  age_histogram: (ISizeGroup & { label: string })[];
+  total_size: number;
+  total_size_formatted: string;
+  item_count: number;
+}
+
+interface IBatchResponse {
+  results: {
+    trash_path: string;
+    success: boolean;
+    error?: string;
+    // Set for restores to another filesystem, copied by a background job
+    job?: IJobStatus;
+  }[];
+  success_count: number;
+  error_count: number;
+}
+
+/**
+ * Response of `list?since=<version>`: a delta, or a full listing when the
+ * server no longer knows the version.
+ */
+type ITrashSinceResponse =
+  | (ITrashDelta & { full: false })
+  | (ITrashListResponse & { full: true });
+
+// One row of the virtualized list: a trash item, an entry inside an
+// expanded folder, or the placeholder shown while a folder loads
+type ListRow =
+  | { key: string; kind: 'item'; item: ITrashItem; index: number }
+  | {
+      key: string;
+      kind: 'child';
+      item: ITrashItem;
+      child: IBrowseChild;
+      depth: number;
+    }
+  | { key: string; kind: 'loading'; item: ITrashItem; depth: number };
+
 type SortColumn = 'name' | 'modified' | 'size';
 type SortDirection = 'asc' | 'desc';
 
+// Server-side sort keys for each column
+const SORT_KEYS: Record<SortColumn, string> = {
+  name: 'name',
+  modified: 'deletion_date',
+  size: 'size'
+};
+
 export class TrashWidget extends Widget {
   private _header: HTMLDivElement;
+  private _filterInput: HTMLInputElement;
   private _columnHeader: HTMLDivElement;
   private _list: HTMLDivElement;
+  // Sized to all rows so the list scrolls; only visible rows are in the DOM
+  private _spacer: HTMLDivElement;
   private _emptyMessage: HTMLDivElement;
   private _commands: CommandRegistry;
   private _contextMenu: Menu;
-  private _selectedItems: Set<ITrashItem> = new Set();
+  // Selection by item id, so it survives reloads that replace the records
+  private _selectedIds: Set<string> = new Set();
   private _lastClickedIndex: number = -1;
-  private _itemElements: Map<ITrashItem, HTMLElement> = new Map();
   private _items: ITrashItem[] = [];
-  private _sortedItems: ITrashItem[] = [];
+  private _itemsById: Map<string, ITrashItem> = new Map();
+  private _rows: ListRow[] = [];
+  // Rendered rows by row key, reused while their content is unchanged
+  private _rowElements: Map<string, HTMLElement> = new Map();
+  private _renderFrame: number | null = null;
+  private _filteredCount = 0;
+  private _filter = '';
+  private _filterTimeoutId: ReturnType<typeof setTimeout> | null = null;
+  private _loadingPage = false;
+  // Set while a streamed listing is arriving, so no page is fetched meanwhile
+  private _streaming = false;
   private _sortColumn: SortColumn = 'modified';
   private _sortDirection: SortDirection = 'desc';
   private _refreshIntervalId: ReturnType<typeof setInterval> | null = null;
+  private _socket: WebSocket | null = null;
+  private _reconnectTimeoutId: ReturnType<typeof setTimeout> | null = null;
+  private _needsResync = false;
+  private _lastData: ITrashListResponse | null = null;
   private _refreshBtn: HTMLButtonElement | null = null;
   private _spinner: Spinner;
+  private _progress: HTMLDivElement;
+  private _preview: HTMLDivElement;
+  private _previewTimeoutId: ReturnType<typeof setTimeout> | null = null;
+  // Id of the item the preview shows or is loading
+  private _previewItemId: string | null = null;
+  private _progressText: HTMLSpanElement;
+  private _activeJob: IJobStatus | null = null;
+  // Children of expanded folders, keyed by item id and sub-path; null while loading
+  private _expanded: Map<string, IBrowseChild[] | null> = new Map();
 
   constructor() {
     super();
@@ -76,6 +293,17 @@ export class TrashWidget extends Widget {
     this._header.className = 'jp-TrashPanel-header';
     this.node.appendChild(this._header);
 
+    // Create filter box - filtering happens server-side on name and original path
+    const filterBox = document.createElement('div');
+    filterBox.className = 'jp-TrashPanel-filter';
+    this._filterInput = document.createElement('input');
+    this._filterInput.className = 'jp-TrashPanel-filter-input';
+    this._filterInput.type = 'search';
+    this._filterInput.placeholder = 'Filter (text or glob, e.g. *.ipynb)';
+    this._filterInput.addEventListener('input', () => this._handleFilterInput());
+    filterBox.appendChild(this._filterInput);
+    this.node.appendChild(filterBox);
+
     // Create column headers
     this._columnHeader = document.createElement('div');
     this._columnHeader.className = 'jp-TrashPanel-columnHeader';
@@ -84,8 +312,17 @@ export class TrashWidget extends Widget {
     // Create list container
     this._list = document.createElement('div');
     this._list.className = 'jp-TrashPanel-list';
+    this._spacer = document.createElement('div');
+    this._spacer.className = 'jp-TrashPanel-list-spacer';
+    this._list.appendChild(this._spacer);
     this.node.appendChild(this._list);
 
+    // Preview of the selected file, read from the trash without restoring it
+    this._preview = document.createElement('div');
+    this._preview.className = 'jp-TrashPanel-preview';
+    this._preview.style.display = 'none';
+    this.node.appendChild(this._preview);
+
     // Create empty message
     this._emptyMessage = document.createElement('div');
     this._emptyMessage.className = 'jp-TrashPanel-empty';
@@ -98,39 +335,66 @@ export class TrashWidget extends Widget {
     this._spinner.addClass('jp-TrashPanel-spinner');
     this.node.appendChild(this._spinner.node);
 
+    // Progress of a running background job, shown over the spinner
+    this._progress = document.createElement('div');
+    this._progress.className = 'jp-TrashPanel-progress';
+    this._progress.style.display = 'none';
+    this._progressText = document.createElement('span');
+    this._progressText.className = 'jp-TrashPanel-progress-text';
+    this._progress.appendChild(this._progressText);
+    const cancelBtn = document.createElement('button');
+    cancelBtn.className = 'jp-TrashPanel-progress-cancel jp-mod-styled';
+    cancelBtn.textContent = 'Cancel';
+    cancelBtn.addEventListener('click', () => this._cancelJob());
+    this._progress.appendChild(cancelBtn);
+    this.node.appendChild(this._progress);
+
     // Clear selection when clicking empty area of the list
     this._list.addEventListener('click', (e: MouseEvent) => {
-      if (e.target === this._list) {
+      if (e.target === this._list || e.target === this._spacer) {
         this._clearSelection();
       }
     });
 
+    // Render the rows scrolled into view, and fetch the next page when
+    // scrolled near the bottom
+    this._list.addEventListener('scroll', () => {
+      this._scheduleRender();
+      const remaining =
+        this._list.scrollHeight -
+        this._list.scrollTop -
+        this._list.clientHeight;
+      if (remaining < LOAD_MORE_THRESHOLD_PX) {
+        this._loadNextPage();
+      }
+    });
+
     // Note: Initial load is handled in onAfterShow() when panel becomes visible
   }
 
   private _setupCommands(): void {
     this._commands.addCommand('trash:restore', {
       label: () => {
-        const count = this._selectedItems.size;
+        const count = this._selectedIds.size;
         return count > 1 ? `Restore ${count} Items` : 'Restore';
       },
       execute: () => {
-        if (this._selectedItems.size > 0) {
-          this._restoreItems([...this._selectedItems]);
+        if (this._selectedIds.size > 0) {
+          this._restoreItems(this._selectedItemList());
         }
       }
     });
 
     this._commands.addCommand('trash:delete', {
       label: () => {
-        const count = this._selectedItems.size;
+        const count = this._selectedIds.size;
         return count > 1
           ? `Delete ${count} Items Permanently`
           : 'Delete Permanently';
       },
       execute: () => {
-        if (this._selectedItems.size > 0) {
-          this._deleteItems([...this._selectedItems]);
+        if (this._selectedIds.size > 0) {
+          this._deleteItems(this._selectedItemList());
         }
       }
     });
@@ -143,7 +407,7 @@ export class TrashWidget extends Widget {
       window.setTimeout(resolve, 500)
     );
     try {
-      await Promise.all([this._loadTrashContents(), minSpin]);
+      await Promise.all([this._streamTrashContents(), minSpin]);
     } catch (error) {
       console.error('Failed to load trash:', error);
       showErrorMessage('Trash Error', 'Failed to load trash contents');
@@ -170,19 +434,175 @@ export class TrashWidget extends Widget {
     }
   }
 
+  /**
+   * Build the list endpoint with the current sort, filter and page window.
+   */
+  private _listEndpoint(offset: number, limit: number): string {
+    const params = new URLSearchParams({
+      sort: SORT_KEYS[this._sortColumn],
+      order: this._sortDirection,
+      offset: String(offset),
+      limit: String(limit)
+    });
+    if (this._filter) {
+      params.set('filter', this._filter);
+    }
+    return `list?${params.toString()}`;
+  }
+
   /**
    * Load trash contents from API and render.
+   *
+   * Reloads as many items as are currently shown (at least one page) so a
+   * refresh does not collapse a list the user has scrolled through.
    */
   private async _loadTrashContents(): Promise<void> {
-    const data = await requestAPI<ITrashListResponse>('list');
-    this._items = data.items;
-    this._selectedItems.clear();
+    const limit = Math.max(PAGE_SIZE, this._items.length);
+    const data = await requestAPI<ITrashListResponse>(
+      this._listEndpoint(0, limit)
+    );
+    // Copy: the response object is shared with the ETag cache
+    this._items = [...data.items];
+    this._filteredCount = data.filtered_count;
+    this._lastData = data;
     this._lastClickedIndex = -1;
     this._renderHeader(data);
     this._renderColumnHeader();
     this._renderItems();
   }
 
+  /**
+   * Reload the shown window as NDJSON, showing rows as they arrive.
+   *
+   * Used for explicit refreshes. Like a background refresh it reloads as
+   * many items as are currently shown (at least one page), leaving the rest
+   * to `_loadNextPage`; the header is only updated by the closing summary
+   * record.
+   */
+  private async _streamTrashContents(): Promise<void> {
+    const limit = Math.max(PAGE_SIZE, this._items.length);
+    const items: ITrashItem[] = [];
+    let shown = 0;
+    let frame: number | null = null;
+    const showItems = (): void => {
+      frame = null;
+      if (shown === 0) {
+        this._items = items.slice();
+        this._renderItems(false);
+      } else {
+        this._appendItems(items.slice(shown));
+      }
+      shown = items.length;
+    };
+
+    this._streaming = true;
+    try {
+      await requestNDJSON<TrashListRecord>(
+        `${this._listEndpoint(0, limit)}&format=ndjson`,
+        record => {
+          if ('summary' in record) {
+            this._lastData = { ...record.summary, items };
+            return;
+          }
+          items.push(record);
+          if (frame === null) {
+            frame = requestAnimationFrame(showItems);
+          }
+        }
+      );
+    } finally {
+      this._streaming = false;
+      if (frame !== null) {
+        cancelAnimationFrame(frame);
+      }
+    }
+
+    this._items = items.slice();
+    this._filteredCount = this._lastData?.filtered_count ?? items.length;
+    this._lastClickedIndex = -1;
+    if (this._lastData) {
+      this._renderHeader(this._lastData);
+    }
+    this._renderColumnHeader();
+    this._renderItems();
+  }
+
+  /**
+   * Poll for changes while the events socket is down.
+   *
+   * A fully loaded, unfiltered list asks only for what changed since its
+   * version; anything else is revalidated with its ETag.
+   */
+  private async _pollChanges(): Promise<void> {
+    const version = this._lastData?.version;
+    if (
+      !version ||
+      this._filter ||
+      this._items.length < this._filteredCount
+    ) {
+      await this._refreshInBackground();
+      return;
+    }
+    try {
+      const data = await requestAPI<ITrashSinceResponse>(
+        `list?since=${encodeURIComponent(version)}`
+      );
+      if (data.full) {
+        await this._loadTrashContents();
+      } else if (data.version !== version) {
+        this._applyDelta(data);
+      }
+    } catch (error) {
+      console.error('Failed to load trash:', error);
+    }
+  }
+
+  /**
+   * Fetch and append the next page of items, if any remain.
+   */
+  private async _loadNextPage(): Promise<void> {
+    if (
+      this._loadingPage ||
+      this._streaming ||
+      this._items.length >= this._filteredCount
+    ) {
+      return;
+    }
+    this._loadingPage = true;
+    try {
+      const data = await requestAPI<ITrashListResponse>(
+        this._listEndpoint(this._items.length, PAGE_SIZE)
+      );
+      // Drop overlap in case items were added since the previous page
+      const known = new Set(this._items.map(item => item.id));
+      const newItems = data.items.filter(item => !known.has(item.id));
+      this._filteredCount = data.filtered_count;
+      this._appendItems(newItems);
+    } catch (error) {
+      console.error('Failed to load trash page:', error);
+    } finally {
+      this._loadingPage = false;
+    }
+  }
+
+  /**
+   * Debounce filter input and reload the first page with the new filter.
+   */
+  private _handleFilterInput(): void {
+    if (this._filterTimeoutId !== null) {
+      clearTimeout(this._filterTimeoutId);
+    }
+    this._filterTimeoutId = setTimeout(() => {
+      this._filterTimeoutId = null;
+      const filter = this._filterInput.value.trim();
+      if (filter !== this._filter) {
+        this._filter = filter;
+        this._items = [];
+        this._refreshInBackground();
+      }
+    }, FILTER_DEBOUNCE_MS);
+  }
+
   private _renderHeader(data: ITrashListResponse): void {
     this._header.innerHTML = '';
 
@@ -190,6 +610,9 @@ export class TrashWidget extends Widget {
     const sizeInfo = document.createElement('span');
     sizeInfo.className = 'jp-TrashPanel-header-info';
     sizeInfo.textContent = `${data.item_count} items (${data.total_size_formatted})`;
+    if (this._filter) {
+      sizeInfo.textContent = `${data.filtered_count} of ${sizeInfo.textContent}`;
+    }
     this._header.appendChild(sizeInfo);
 
     // Action buttons
@@ -204,8 +627,16 @@ export class TrashWidget extends Widget {
     this._refreshBtn.addEventListener('click', () => this.refresh());
     actions.appendChild(this._refreshBtn);
 
-    // Empty trash button
+    // Reclaim space view
     if (data.item_count > 0) {
+      const reclaimBtn = document.createElement('button');
+      reclaimBtn.className = 'jp-TrashPanel-header-button';
+      reclaimBtn.title = 'Reclaim Space';
+      chartIcon.element({ container: reclaimBtn });
+      reclaimBtn.addEventListener('click', () => this._showReclaimView());
+      actions.appendChild(reclaimBtn);
+
+      // Empty trash button
       const emptyBtn = document.createElement('button');
       emptyBtn.className =
         'jp-TrashPanel-header-button jp-TrashPanel-header-button-danger';
@@ -260,35 +691,39 @@ export class TrashWidget extends Widget {
       this._sortColumn = column;
       this._sortDirection = column === 'name' ? 'asc' : 'desc';
     }
+    // Sorting happens server-side, so restart from the first page
     this._renderColumnHeader();
-    this._renderItems();
+    this._items = [];
+    this._list.scrollTop = 0;
+    this._refreshInBackground();
   }
 
-  private _getSortedItems(): ITrashItem[] {
-    const items = [...this._items];
-    const dir = this._sortDirection === 'asc' ? 1 : -1;
-
-    items.sort((a, b) => {
-      switch (this._sortColumn) {
-        case 'name':
-          return dir * a.name.localeCompare(b.name);
-        case 'modified':
-          return dir * a.deletion_date.localeCompare(b.deletion_date);
-        case 'size':
-          return dir * (a.size - b.size);
-        default:
-          return 0;
+  /**
+   * Rebuild the row model and render the rows in view.
+   *
+   * Rows are keyed by item id (and sub-path for folder contents); rendered
+   * rows whose content did not change are kept, so a refresh only touches
+   * what changed. Selected items that are no longer listed are deselected,
+   * unless `pruneSelection` is false: pass that while items are still
+   * arriving, so selected items not received yet stay selected.
+   */
+  private _renderItems(pruneSelection = true): void {
+    this._itemsById = new Map(this._items.map(item => [item.id, item]));
+    if (pruneSelection) {
+      for (const id of [...this._selectedIds]) {
+        if (!this._itemsById.has(id)) {
+          this._selectedIds.delete(id);
+        }
       }
-    });
-
-    return items;
-  }
-
-  private _renderItems(): void {
-    this._list.innerHTML = '';
-    this._itemElements.clear();
+      this._schedulePreview();
+    }
+    this._rows = this._buildRows();
 
     if (this._items.length === 0) {
+      this._removeRows();
+      this._emptyMessage.textContent = this._filter
+        ? 'No items match the filter'
+        : 'Trash is empty';
       this._emptyMessage.style.display = 'flex';
       this._columnHeader.style.display = 'none';
       this._list.style.display = 'none';
@@ -299,38 +734,441 @@ export class TrashWidget extends Widget {
     this._columnHeader.style.display = 'flex';
     this._list.style.display = 'block';
 
-    this._sortedItems = this._getSortedItems();
-    for (const item of this._sortedItems) {
-      const itemEl = this._createItemElement(item);
-      this._itemElements.set(item, itemEl);
-      this._list.appendChild(itemEl);
+    this._spacer.style.height = `${this._rows.length * ROW_HEIGHT}px`;
+    this._renderVisibleRows();
+  }
+
+  /**
+   * Add items after the current ones, building rows only for those items.
+   */
+  private _appendItems(items: ITrashItem[]): void {
+    if (items.length === 0) {
+      return;
     }
+    if (this._items.length === 0) {
+      this._items = items;
+      this._renderItems(false);
+      return;
+    }
+    const start = this._items.length;
+    this._items.push(...items);
+    items.forEach((item, offset) => {
+      this._itemsById.set(item.id, item);
+      this._rows.push({
+        key: item.id,
+        kind: 'item',
+        item,
+        index: start + offset
+      });
+      this._appendChildRows(this._rows, item, '', 1);
+    });
+    this._spacer.style.height = `${this._rows.length * ROW_HEIGHT}px`;
+    this._renderVisibleRows();
   }
 
-  private _clearSelection(): void {
-    for (const item of this._selectedItems) {
-      const el = this._itemElements.get(item);
-      if (el) {
-        el.classList.remove('jp-mod-selected');
+  private _buildRows(): ListRow[] {
+    const rows: ListRow[] = [];
+    this._items.forEach((item, index) => {
+      rows.push({ key: item.id, kind: 'item', item, index });
+      this._appendChildRows(rows, item, '', 1);
+    });
+    return rows;
+  }
+
+  /**
+   * Append the rows of an expanded folder (and expanded subfolders).
+   */
+  private _appendChildRows(
+    rows: ListRow[],
+    item: ITrashItem,
+    path: string,
+    depth: number
+  ): void {
+    const key = this._expandedKey(item, path);
+    if (!this._expanded.has(key)) {
+      return;
+    }
+    const children = this._expanded.get(key);
+    if (!children) {
+      rows.push({ key: `${key}\0loading`, kind: 'loading', item, depth });
+      return;
+    }
+    for (const child of children) {
+      rows.push({
+        key: this._expandedKey(item, child.path),
+        kind: 'child',
+        item,
+        child,
+        depth
+      });
+      if (child.is_dir && !child.is_symlink) {
+        this._appendChildRows(rows, item, child.path, depth + 1);
       }
     }
-    this._selectedItems.clear();
   }
 
-  private _selectItem(item: ITrashItem): void {
-    this._selectedItems.add(item);
-    const el = this._itemElements.get(item);
-    if (el) {
-      el.classList.add('jp-mod-selected');
+  private _scheduleRender(): void {
+    if (this._renderFrame === null) {
+      this._renderFrame = requestAnimationFrame(() => {
+        this._renderFrame = null;
+        this._renderVisibleRows();
+      });
     }
   }
 
-  private _deselectItem(item: ITrashItem): void {
-    this._selectedItems.delete(item);
-    const el = this._itemElements.get(item);
-    if (el) {
-      el.classList.remove('jp-mod-selected');
+  /**
+   * Render the rows within the scrolled window plus an overscan margin.
+   */
+  private _renderVisibleRows(): void {
+    // A hidden panel has no height yet; render a screenful anyway
+    const height = this._list.clientHeight || ROW_HEIGHT * 50;
+    const first = Math.max(
+      0,
+      Math.floor(this._list.scrollTop / ROW_HEIGHT) - OVERSCAN_ROWS
+    );
+    const last = Math.min(
+      this._rows.length,
+      first + Math.ceil(height / ROW_HEIGHT) + 2 * OVERSCAN_ROWS
+    );
+
+    const rendered = new Map<string, HTMLElement>();
+    for (let i = first; i < last; i++) {
+      const row = this._rows[i];
+      const signature = this._rowSignature(row);
+      let rowEl = this._rowElements.get(row.key);
+      if (!rowEl || rowEl.dataset.signature !== signature) {
+        const fresh = this._createRowElement(row);
+        fresh.dataset.signature = signature;
+        if (rowEl) {
+          rowEl.replaceWith(fresh);
+        } else {
+          this._spacer.appendChild(fresh);
+        }
+        rowEl = fresh;
+      }
+      rowEl.style.transform = `translateY(${i * ROW_HEIGHT}px)`;
+      rowEl.classList.toggle(
+        'jp-mod-selected',
+        row.kind === 'item' && this._selectedIds.has(row.item.id)
+      );
+      rendered.set(row.key, rowEl);
+    }
+    for (const [key, rowEl] of this._rowElements) {
+      if (!rendered.has(key)) {
+        rowEl.remove();
+      }
+    }
+    this._rowElements = rendered;
+  }
+
+  private _removeRows(): void {
+    for (const rowEl of this._rowElements.values()) {
+      rowEl.remove();
+    }
+    this._rowElements.clear();
+    this._spacer.style.height = '0';
+  }
+
+  /**
+   * Everything a row's markup depends on; rows are rebuilt when it changes.
+   */
+  private _rowSignature(row: ListRow): string {
+    const expanded = (path: string) =>
+      this._expanded.has(this._expandedKey(row.item, path));
+    switch (row.kind) {
+      case 'item': {
+        const item = row.item;
+        return [
+          item.name,
+          item.original_path,
+          item.size_formatted,
+          item.deletion_date,
+          this._formatRelativeTime(item.deletion_date),
+          item.is_dir,
+          expanded('')
+        ].join('\0');
+      }
+      case 'child':
+        return [
+          row.child.size_formatted,
+          row.child.is_dir,
+          row.depth,
+          expanded(row.child.path)
+        ].join('\0');
+      case 'loading':
+        return `loading\0${row.depth}`;
+    }
+  }
+
+  private _createRowElement(row: ListRow): HTMLDivElement {
+    switch (row.kind) {
+      case 'item':
+        return this._createItemElement(row.item);
+      case 'child':
+        return this._createChildElement(row.item, row.child, row.depth);
+      case 'loading': {
+        const loading = document.createElement('div');
+        loading.className = 'jp-TrashPanel-item jp-TrashPanel-child';
+        loading.style.paddingLeft = `${8 + row.depth * 16}px`;
+        loading.textContent = 'Loading...';
+        return loading;
+      }
+    }
+  }
+
+  private _selectedItemList(): ITrashItem[] {
+    return this._items.filter(item => this._selectedIds.has(item.id));
+  }
+
+  /**
+   * Apply a change pushed over the events socket.
+   *
+   * Deltas are merged locally when the whole unfiltered trash is loaded;
+   * otherwise only the server knows where changed items belong, so the
+   * loaded range is fetched again.
+   */
+  private _applyDelta(delta: ITrashDelta): void {
+    if (!this._lastData) {
+      return;
+    }
+    if (this._filter || this._items.length < this._filteredCount) {
+      this._refreshInBackground();
+      return;
+    }
+
+    const removed = new Set(delta.removed);
+    const updates = new Map(delta.added.map(item => [item.id, item]));
+    const items = this._items.filter(
+      item => !removed.has(item.id) && !updates.has(item.id)
+    );
+    items.push(...updates.values());
+    items.sort((a, b) => this._compareItems(a, b));
+
+    this._lastClickedIndex = -1;
+
+    this._items = items;
+    this._filteredCount = delta.item_count;
+    this._lastData = {
+      ...this._lastData,
+      version: delta.version,
+      item_count: delta.item_count,
+      total_size: delta.total_size,
+      total_size_formatted: delta.total_size_formatted,
+      filtered_count: delta.item_count,
+      filtered_size: delta.total_size
+    };
+    this._renderHeader(this._lastData);
+    this._renderItems();
+  }
+
+  /**
+   * Compare items the same way the server sorts them.
+   */
+  private _compareItems(a: ITrashItem, b: ITrashItem): number {
+    const compare = (x: string | number, y: string | number) =>
+      x < y ? -1 : x > y ? 1 : 0;
+    const dir = this._sortDirection === 'asc' ? 1 : -1;
+    let result = 0;
+    switch (this._sortColumn) {
+      case 'name':
+        result = compare(a.name.toLowerCase(), b.name.toLowerCase());
+        break;
+      case 'modified':
+        result = compare(
+          a.deletion_timestamp ?? -Infinity,
+          b.deletion_timestamp ?? -Infinity
+        );
+        break;
+      case 'size':
+        result = compare(a.size, b.size);
+        break;
+    }
+    return dir * result || compare(a.name, b.name);
+  }
+
+  private _expandedKey(item: ITrashItem, path: string): string {
+    return `${item.id}\0${path}`;
+  }
+
+  /**
+   * Create the expand/collapse toggle of a folder row.
+   */
+  private _createToggle(item: ITrashItem, path: string): HTMLSpanElement {
+    const toggle = document.createElement('span');
+    toggle.className = 'jp-TrashPanel-item-toggle';
+    const expanded = this._expanded.has(this._expandedKey(item, path));
+    toggle.textContent = expanded ? '\u25BE' : '\u25B8';
+    toggle.title = expanded ? 'Collapse' : 'Show contents';
+    toggle.addEventListener('click', (e: MouseEvent) => {
+      e.stopPropagation();
+      this._toggleExpanded(item, path);
+    });
+    return toggle;
+  }
+
+  /**
+   * Show or hide the contents of a trashed folder, fetching one level lazily.
+   */
+  private async _toggleExpanded(item: ITrashItem, path: string): Promise<void> {
+    const key = this._expandedKey(item, path);
+    if (this._expanded.has(key)) {
+      for (const other of [...this._expanded.keys()]) {
+        if (other === key || other.startsWith(`${key}/`)) {
+          this._expanded.delete(other);
+        }
+      }
+      this._renderItems();
+      return;
+    }
+
+    this._expanded.set(key, null);
+    this._renderItems();
+    try {
+      const params = new URLSearchParams({
+        trash_path: item.trash_path,
+        path,
+        volume: item.volume
+      });
+      const data = await requestAPI<IBrowseResponse>(`browse?${params}`);
+      if (this._expanded.has(key)) {
+        this._expanded.set(key, data.children);
+      }
+    } catch (error: any) {
+      this._expanded.delete(key);
+      showErrorMessage('Cannot Open Folder', error?.message || 'unknown error');
+    }
+    this._renderItems();
+  }
+
+  private _createChildElement(
+    item: ITrashItem,
+    child: IBrowseChild,
+    depth: number
+  ): HTMLDivElement {
+    const rowEl = document.createElement('div');
+    rowEl.className = 'jp-TrashPanel-item jp-TrashPanel-child';
+    rowEl.style.paddingLeft = `${8 + depth * 16}px`;
+    rowEl.title = `${item.original_path}/${child.path}\nSize: ${child.size_formatted}`;
+
+    const nameCol = document.createElement('span');
+    nameCol.className = 'jp-TrashPanel-col-name';
+    if (child.is_dir && !child.is_symlink) {
+      nameCol.appendChild(this._createToggle(item, child.path));
+    }
+    const iconEl = document.createElement('span');
+    iconEl.className = 'jp-TrashPanel-item-icon';
+    (child.is_dir ? folderIcon : fileIcon).element({ container: iconEl });
+    nameCol.appendChild(iconEl);
+    const nameEl = document.createElement('span');
+    nameEl.className = 'jp-TrashPanel-item-name';
+    nameEl.textContent = child.name;
+    nameCol.appendChild(nameEl);
+    rowEl.appendChild(nameCol);
+
+    const actions = document.createElement('span');
+    actions.className = 'jp-TrashPanel-child-actions';
+    const restoreBtn = document.createElement('button');
+    restoreBtn.className = 'jp-TrashPanel-header-button';
+    restoreBtn.title = 'Restore';
+    restoreIcon.element({ container: restoreBtn });
+    restoreBtn.addEventListener('click', () =>
+      this._runSubPathOperation('restore', item, child)
+    );
+    actions.appendChild(restoreBtn);
+    const deleteBtn = document.createElement('button');
+    deleteBtn.className =
+      'jp-TrashPanel-header-button jp-TrashPanel-header-button-danger';
+    deleteBtn.title = 'Delete Permanently';
+    deleteIcon.element({ container: deleteBtn });
+    deleteBtn.addEventListener('click', () =>
+      this._runSubPathOperation('delete', item, child)
+    );
+    actions.appendChild(deleteBtn);
+    rowEl.appendChild(actions);
+
+    const sizeCol = document.createElement('span');
+    sizeCol.className = 'jp-TrashPanel-col-size';
+    sizeCol.textContent = child.size_formatted;
+    rowEl.appendChild(sizeCol);
+    return rowEl;
+  }
+
+  /**
+   * Restore or delete one path inside a trashed folder, then reload its level.
+   */
+  private async _runSubPathOperation(
+    operation: 'restore' | 'delete',
+    item: ITrashItem,
+    child: IBrowseChild
+  ): Promise<void> {
+    if (operation === 'delete') {
+      const result = await showDialog({
+        title: 'Delete Permanently',
+        body: `Are you sure you want to permanently delete "${child.path}" from "${item.name}"? This cannot be undone.`,
+        buttons: [Dialog.cancelButton(), Dialog.warnButton({ label: 'Delete' })]
+      });
+      if (!result.button.accept) {
+        return;
+      }
+    }
+
+    this._spinner.show();
+    try {
+      const response = await requestAPI<{ success: boolean } | IJobStatus>(
+        operation,
+        {
+          method: 'POST',
+          body: JSON.stringify({
+            trash_path: item.trash_path,
+            sub_path: child.path,
+            volume: item.volume
+          })
+        }
+      );
+      if ('job_id' in response) {
+        const job = await this._waitForJob(response);
+        if (job.status === 'failed') {
+          throw new Error(job.error || 'unknown error');
+        }
+      }
+    } catch (error: any) {
+      showErrorMessage(
+        operation === 'restore' ? 'Restore Failed' : 'Delete Failed',
+        `${child.path}: ${error?.message || 'unknown error'}`
+      );
+    } finally {
+      this._hideProgress();
+      this._spinner.hide();
+    }
+
+    // Reload the parent level so sizes and listings reflect the change
+    const parent = child.path.includes('/')
+      ? child.path.slice(0, child.path.lastIndexOf('/'))
+      : '';
+    const key = this._expandedKey(item, parent);
+    for (const other of [...this._expanded.keys()]) {
+      if (other === key || other.startsWith(`${key}/`)) {
+        this._expanded.delete(other);
+      }
     }
+    await this._toggleExpanded(item, parent);
+  }
+
+  private _clearSelection(): void {
+    for (const id of this._selectedIds) {
+      this._rowElements.get(id)?.classList.remove('jp-mod-selected');
+    }
+    this._selectedIds.clear();
+  }
+
+  private _selectItem(item: ITrashItem): void {
+    this._selectedIds.add(item.id);
+    this._rowElements.get(item.id)?.classList.add('jp-mod-selected');
+  }
+
+  private _deselectItem(item: ITrashItem): void {
+    this._selectedIds.delete(item.id);
+    this._rowElements.get(item.id)?.classList.remove('jp-mod-selected');
   }
 
   private _handleItemClick(item: ITrashItem, index: number, e: MouseEvent) {
@@ -344,12 +1182,12 @@ export class TrashWidget extends Widget {
       }
 
       for (let i = start; i <= end; i++) {
-        this._selectItem(this._sortedItems[i]);
+        this._selectItem(this._items[i]);
       }
       // Don't update _lastClickedIndex on shift+click to allow extending range
     } else if (e.ctrlKey || e.metaKey) {
       // Ctrl+click: toggle individual item
-      if (this._selectedItems.has(item)) {
+      if (this._selectedIds.has(item.id)) {
         this._deselectItem(item);
       } else {
         this._selectItem(item);
@@ -361,22 +1199,125 @@ export class TrashWidget extends Widget {
       this._selectItem(item);
       this._lastClickedIndex = index;
     }
+    this._schedulePreview();
+  }
+
+  /**
+   * Preview the selected item shortly after the selection settles, when
+   * exactly one file is selected.
+   */
+  private _schedulePreview(): void {
+    if (this._previewTimeoutId !== null) {
+      clearTimeout(this._previewTimeoutId);
+    }
+    this._previewTimeoutId = setTimeout(() => {
+      this._previewTimeoutId = null;
+      const selected = this._selectedItemList();
+      const item = selected.length === 1 ? selected[0] : null;
+      if (!item || item.is_dir || item.is_symlink) {
+        this._previewItemId = null;
+        this._preview.style.display = 'none';
+        return;
+      }
+      if (item.id !== this._previewItemId) {
+        this._previewItemId = item.id;
+        this._loadPreview(item);
+      }
+    }, PREVIEW_DELAY_MS);
+  }
+
+  private async _loadPreview(item: ITrashItem): Promise<void> {
+    const params = new URLSearchParams({
+      trash_path: item.trash_path,
+      volume: item.volume,
+      format: 'summary',
+      cells: String(PREVIEW_CELLS)
+    });
+    let summary: IPreviewSummary;
+    try {
+      summary = await requestAPI<IPreviewSummary>(`preview?${params}`);
+    } catch (error) {
+      console.warn('Failed to preview trash item:', error);
+      summary = { kind: 'binary', size: item.size, size_formatted: '' };
+    }
+    // Ignore responses for an item that is no longer selected
+    if (this._previewItemId === item.id) {
+      this._renderPreview(item, summary);
+    }
+  }
+
+  private _renderPreview(item: ITrashItem, summary: IPreviewSummary): void {
+    this._preview.innerHTML = '';
+    const title = document.createElement('div');
+    title.className = 'jp-TrashPanel-preview-title';
+    title.textContent = item.name;
+    this._preview.appendChild(title);
+
+    const addBlock = (text: string, label?: string): void => {
+      const block = document.createElement('pre');
+      block.className = 'jp-TrashPanel-preview-content';
+      if (label) {
+        block.dataset.label = label;
+      }
+      block.textContent = text;
+      this._preview.appendChild(block);
+    };
+    const addNote = (text: string): void => {
+      const note = document.createElement('div');
+      note.className = 'jp-TrashPanel-preview-note';
+      note.textContent = text;
+      this._preview.appendChild(note);
+    };
+
+    if (summary.kind === 'notebook') {
+      for (const cell of summary.cells ?? []) {
+        const label =
+          cell.cell_type === 'code'
+            ? `[${cell.execution_count ?? ' '}]`
+            : cell.cell_type;
+        addBlock(cell.source + (cell.truncated ? '\n…' : ''), label);
+      }
+      if (summary.more_cells) {
+        addNote('More cells not shown');
+      }
+    } else if (summary.kind === 'text') {
+      addBlock(summary.text ?? '');
+      if (summary.truncated) {
+        addNote(`Showing the start of ${summary.size_formatted}`);
+      }
+    } else {
+      addNote(
+        summary.size_formatted
+          ? `Binary file (${summary.size_formatted})`
+          : 'No preview available'
+      );
+    }
+    this._preview.style.display = 'block';
   }
 
   private _createItemElement(item: ITrashItem): HTMLDivElement {
     const itemEl = document.createElement('div');
     itemEl.className = 'jp-TrashPanel-item';
-    itemEl.title = [
+    const tooltip = [
       `Original: ${item.original_path}`,
       `Type: ${item.is_dir ? 'Folder' : 'File'}`,
       `Size: ${item.size_formatted}`,
       `Deleted: ${this._formatDate(item.deletion_date)}`
-    ].join('\n');
+    ];
+    const volume = this._lastData?.volumes?.find(v => v.id === item.volume);
+    if (volume?.topdir) {
+      tooltip.push(`Volume: ${volume.topdir}`);
+    }
+    itemEl.title = tooltip.join('\n');
 
     // Icon + Name column
     const nameCol = document.createElement('span');
     nameCol.className = 'jp-TrashPanel-col-name';
 
+    if (item.is_dir && !item.is_symlink) {
+      nameCol.appendChild(this._createToggle(item, ''));
+    }
+
     const iconEl = document.createElement('span');
     iconEl.className = 'jp-TrashPanel-item-icon';
     if (item.is_dir) {
@@ -412,10 +1353,12 @@ export class TrashWidget extends Widget {
         e.preventDefault();
       }
     });
+    // Rows are reused across reloads, so resolve the current record by id
+    const current = () => this._itemsById.get(item.id) ?? item;
     itemEl.addEventListener('click', (e: MouseEvent) => {
       e.stopPropagation();
-      const index = this._sortedItems.indexOf(item);
-      this._handleItemClick(item, index, e);
+      const index = this._items.indexOf(current());
+      this._handleItemClick(current(), index, e);
     });
 
     // Context menu
@@ -424,10 +1367,10 @@ export class TrashWidget extends Widget {
       e.stopPropagation();
 
       // If right-clicked item is not in selection, select only it
-      if (!this._selectedItems.has(item)) {
+      if (!this._selectedIds.has(item.id)) {
         this._clearSelection();
-        this._selectItem(item);
-        this._lastClickedIndex = this._sortedItems.indexOf(item);
+        this._selectItem(current());
+        this._lastClickedIndex = this._items.indexOf(current());
       }
 
       this.node.classList.add('jp-mod-contextMenuOpen');
@@ -485,28 +1428,94 @@ export class TrashWidget extends Widget {
     }
   }
 
-  private async _restoreItems(items: ITrashItem[]): Promise<void> {
-    this._spinner.show();
+  /**
+   * Restore or delete items, each within the trash of its own volume.
+   *
+   * @returns Error messages for the items that failed
+   */
+  private async _runOperation(
+    operation: 'restore' | 'delete',
+    items: ITrashItem[]
+  ): Promise<string[]> {
+    const byVolume = new Map<string, ITrashItem[]>();
+    for (const item of items) {
+      const group = byVolume.get(item.volume) ?? [];
+      group.push(item);
+      byVolume.set(item.volume, group);
+    }
     const errors: string[] = [];
+    for (const [volume, group] of byVolume) {
+      errors.push(...(await this._runVolumeOperation(operation, volume, group)));
+    }
+    return errors;
+  }
+
+  /**
+   * Restore or delete items of one volume, using one batch request for
+   * multiple items.
+   */
+  private async _runVolumeOperation(
+    operation: 'restore' | 'delete',
+    volume: string,
+    items: ITrashItem[]
+  ): Promise<string[]> {
+    const errors: string[] = [];
+    if (items.length === 1) {
+      try {
+        const response = await requestAPI<{ success: boolean } | IJobStatus>(
+          operation,
+          {
+            method: 'POST',
+            body: JSON.stringify({ trash_path: items[0].trash_path, volume })
+          }
+        );
+        // Restores to another filesystem are copied by a background job
+        if ('job_id' in response) {
+          const job = await this._waitForJob(response);
+          if (job.status === 'failed') {
+            errors.push(`${items[0].name}: ${job.error || 'unknown error'}`);
+          }
+        }
+      } catch (error: any) {
+        errors.push(`${items[0].name}: ${error?.message || 'unknown error'}`);
+      }
+      return errors;
+    }
+
     try {
-      for (const item of items) {
-        try {
-          await requestAPI<{ success: boolean; restored_to: string }>(
-            'restore',
-            {
-              method: 'POST',
-              body: JSON.stringify({ trash_path: item.trash_path })
-            }
-          );
-        } catch (error: any) {
-          errors.push(`${item.name}: ${error?.message || 'unknown error'}`);
+      const response = await requestAPI<IBatchResponse>(`batch/${operation}`, {
+        method: 'POST',
+        body: JSON.stringify({
+          trash_paths: items.map(item => item.trash_path),
+          volume
+        })
+      });
+      for (const result of response.results) {
+        if (!result.success) {
+          errors.push(`${result.trash_path}: ${result.error || 'unknown error'}`);
+        } else if (result.job) {
+          const job = await this._waitForJob(result.job);
+          if (job.status === 'failed') {
+            errors.push(`${result.trash_path}: ${job.error || 'unknown error'}`);
+          }
         }
       }
+    } catch (error: any) {
+      errors.push(error?.message || 'unknown error');
+    }
+    return errors;
+  }
+
+  private async _restoreItems(items: ITrashItem[]): Promise<void> {
+    this._spinner.show();
+    try {
+      const errors = await this._runOperation('restore', items);
       await this._loadTrashContents();
       if (errors.length > 0) {
         showErrorMessage('Restore Failed', errors.join('\n'));
       }
     } finally {
+      this._hideProgress();
       this._spinner.hide();
     }
   }
@@ -526,18 +1535,8 @@ export class TrashWidget extends Widget {
 
     if (result.button.accept) {
       this._spinner.show();
-      const errors: string[] = [];
       try {
-        for (const item of items) {
-          try {
-            await requestAPI<{ success: boolean }>('delete', {
-              method: 'POST',
-              body: JSON.stringify({ trash_path: item.trash_path })
-            });
-          } catch (error: any) {
-            errors.push(`${item.name}: ${error?.message || 'unknown error'}`);
-          }
-        }
+        const errors = await this._runOperation('delete', items);
         await this._loadTrashContents();
         if (errors.length > 0) {
           showErrorMessage('Delete Failed', errors.join('\n'));
@@ -548,6 +1547,99 @@ export class TrashWidget extends Widget {
     }
   }
 
+  /**
+   * Show what takes up the most space, offering to delete the largest items.
+   */
+  private async _showReclaimView(): Promise<void> {
+    let data: ITrashAnalytics;
+    try {
+      data = await requestAPI<ITrashAnalytics>(
+        `analytics?top=${RECLAIM_TOP_ITEMS}&groups=${RECLAIM_TOP_GROUPS}`
+      );
+    } catch (error: any) {
+      showErrorMessage('Reclaim Space', error?.message || 'Failed to analyze trash');
+      return;
+    }
+
+    const body = new Widget();
+    body.addClass('jp-TrashPanel-reclaim');
+    const total = data.total_size;
+    this._appendReclaimSection(
+      body.node,
+      'Largest items',
+      data.largest.map(item => ({ label: item.name, count: 1, ...item })),
+      total
+    );
+    this._appendReclaimSection(
+      body.node,
+      'By original folder',
+      data.by_directory.map(group => ({ label: group.directory, ...group })),
+      total
+    );
+    this._appendReclaimSection(
+      body.node,
+      'By type',
+      data.by_extension.map(group => ({ label: group.extension, ...group })),
+      total
+    );
+    this._appendReclaimSection(
+      body.node,
+      'By age',
+      data.age_histogram.filter(bucket => bucket.count > 0),
+      total
+    );
+
+    const result = await showDialog({
+      title: `Reclaim Space (${data.total_size_formatted} in trash)`,
+      body,
+      buttons: [
+        Dialog.cancelButton({ label: 'Close' }),
+        Dialog.warnButton({ label: `Delete ${data.largest.length} Largest` })
+      ]
+    });
+    if (result.button.accept) {
+      await this._deleteItems(data.largest);
+    }
+  }
+
+  private _appendReclaimSection(
+    node: HTMLElement,
+    title: string,
+    rows: (ISizeGroup & { label: string })[],
+    total: number
+  ): void {
+    const heading = document.createElement('h3');
+    heading.className = 'jp-TrashPanel-reclaim-heading';
+    heading.textContent = title;
+    node.appendChild(heading);
+
+    for (const row of rows) {
+      const rowEl = document.createElement('div');
+      rowEl.className = 'jp-TrashPanel-reclaim-row';
+      rowEl.title = `${row.label}\n${row.count} items, ${row.size_formatted}`;
+
+      const label = document.createElement('span');
+      label.className = 'jp-TrashPanel-reclaim-label';
+      label.textContent = row.label;
+      rowEl.appendChild(label);
+
+      const bar = document.createElement('span');
+      bar.className = 'jp-TrashPanel-reclaim-bar';
+      const fill = document.createElement('span');
+      fill.className = 'jp-TrashPanel-reclaim-bar-fill';
+      fill.style.width = `${total > 0 ? (100 * row.size) / total : 0}%`;
+      bar.appendChild(fill);
+      rowEl.appendChild(bar);
+
+      const size = document.createElement('span');
+      size.className = 'jp-TrashPanel-reclaim-size';
+      size.textContent = row.size_formatted;
+      rowEl.appendChild(size);
+
+      node.appendChild(rowEl);
+    }
+  }
+
   private async _emptyTrash(): Promise<void> {
     const result = await showDialog({
       title: 'Empty Trash',
@@ -561,26 +1653,151 @@ export class TrashWidget extends Widget {
     if (result.button.accept) {
       this._spinner.show();
       try {
-        await requestAPI<{ success: boolean; deleted_count: number }>('empty', {
-          method: 'POST'
+        const job = await requestAPI<IJobStatus>('empty', {
+          method: 'POST',
+          body: JSON.stringify({ background: true })
         });
+        const finished = await this._waitForJob(job);
         await this._loadTrashContents();
+        if (finished.status === 'failed') {
+          showErrorMessage(
+            'Empty Trash Failed',
+            finished.error || 'Failed to empty trash'
+          );
+        } else if (finished.errors.length > 0) {
+          showErrorMessage('Empty Trash Failed', finished.errors.join('\n'));
+        }
       } catch (error: any) {
         const message = error?.message || 'Failed to empty trash';
         showErrorMessage('Empty Trash Failed', message);
       } finally {
+        this._hideProgress();
         this._spinner.hide();
       }
     }
   }
 
+  /**
+   * Poll a background job until it finishes, showing its progress.
+   *
+   * Progress pushed on the events socket updates the display in between.
+   */
+  private async _waitForJob(job: IJobStatus): Promise<IJobStatus> {
+    this._activeJob = job;
+    this._showProgress(job);
+    while (job.status === 'pending' || job.status === 'running') {
+      await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+      job = await requestAPI<IJobStatus>(`jobs/${job.job_id}`);
+      this._showProgress(job);
+    }
+    this._activeJob = null;
+    return job;
+  }
+
+  private _showProgress(job: IJobStatus): void {
+    if (!this._activeJob || this._activeJob.job_id !== job.job_id) {
+      return;
+    }
+    this._activeJob = job;
+    if (job.cancel_requested) {
+      this._progressText.textContent = 'Cancelling...';
+    } else if (job.kind === 'restore') {
+      this._progressText.textContent = `Restoring: copied ${job.bytes_done_formatted} of ${job.bytes_total_formatted}`;
+    } else {
+      this._progressText.textContent = `Deleted ${job.items_done} of ${job.items_total} items (freed ${job.bytes_done_formatted})`;
+    }
+    this._progress.style.display = '';
+  }
+
+  private _hideProgress(): void {
+    this._activeJob = null;
+    this._progress.style.display = 'none';
+  }
+
+  /**
+   * Ask the server to stop the running job; items already deleted stay deleted.
+   */
+  private async _cancelJob(): Promise<void> {
+    const job = this._activeJob;
+    if (!job) {
+      return;
+    }
+    try {
+      this._showProgress(
+        await requestAPI<IJobStatus>(`jobs/${job.job_id}`, { method: 'DELETE' })
+      );
+    } catch (error: any) {
+      showErrorMessage('Cancel Failed', error?.message || 'Failed to cancel');
+    }
+  }
+
+  /**
+   * Subscribe to pushed trash changes; polling takes over if the socket fails.
+   */
+  private _connectEvents(): void {
+    this._disconnectEvents();
+    let socket: WebSocket;
+    try {
+      socket = connectTrashEvents<ITrashEvent>(event => {
+        if (event.type === 'job') {
+          this._showProgress(event);
+        } else {
+          this._applyDelta(event);
+        }
+      });
+    } catch (error) {
+      console.warn('Trash events unavailable, polling instead:', error);
+      this._startAutoRefresh();
+      return;
+    }
+
+    socket.onopen = () => {
+      this._stopAutoRefresh();
+      if (this._needsResync) {
+        // Changes may have been missed while disconnected
+        this._needsResync = false;
+        this._refreshInBackground();
+      }
+    };
+    socket.onclose = () => {
+      if (this._socket !== socket) {
+        return;
+      }
+      this._socket = null;
+      this._needsResync = true;
+      if (this.isVisible && !this.isDisposed) {
+        this._startAutoRefresh();
+        this._reconnectTimeoutId = setTimeout(() => {
+          this._reconnectTimeoutId = null;
+          this._connectEvents();
+        }, RECONNECT_DELAY_MS);
+      }
+    };
+    this._socket = socket;
+  }
+
+  /**
+   * Close the events socket and cancel any pending reconnect.
+   */
+  private _disconnectEvents(): void {
+    if (this._reconnectTimeoutId !== null) {
+      clearTimeout(this._reconnectTimeoutId);
+      this._reconnectTimeoutId = null;
+    }
+    if (this._socket) {
+      const socket = this._socket;
+      this._socket = null;
+      socket.close();
+    }
+  }
+
   /**
    * Start auto-refresh interval.
    */
   private _startAutoRefresh(): void {
     this._stopAutoRefresh();
     this._refreshIntervalId = setInterval(() => {
-      this._refreshInBackground();
+      this._pollChanges();
     }, REFRESH_INTERVAL_MS);
   }
 
@@ -595,18 +1812,28 @@ export class TrashWidget extends Widget {
   }
 
   /**
-   * Handle `after-show` messages - refresh and start auto-refresh.
+   * Handle `resize` messages - render the rows that now fit.
+   */
+  protected onResize(msg: Widget.ResizeMessage): void {
+    super.onResize(msg);
+    this._scheduleRender();
+  }
+
+  /**
+   * Handle `after-show` messages - refresh and subscribe to changes.
    */
   protected onAfterShow(msg: Message): void {
     super.onAfterShow(msg);
     this.refresh();
-    this._startAutoRefresh();
+    this._needsResync = false;
+    this._connectEvents();
   }
 
   /**
-   * Handle `before-hide` messages - stop auto-refresh.
+   * Handle `before-hide` messages - stop listening for changes.
    */
   protected onBeforeHide(msg: Message): void {
+    this._disconnectEvents();
     this._stopAutoRefresh();
     super.onBeforeHide(msg);
   }
@@ -615,7 +1842,14 @@ export class TrashWidget extends Widget {
    * Dispose of the widget and clean up resources.
    */
   dispose(): void {
+    this._disconnectEvents();
     this._stopAutoRefresh();
+    if (this._filterTimeoutId !== null) {
+      clearTimeout(this._filterTimeoutId);
+    }
+    if (this._renderFrame !== null) {
+      cancelAnimationFrame(this._renderFrame);
+    }
     this._spinner.dispose();
     super.dispose();
   }